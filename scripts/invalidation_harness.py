@@ -0,0 +1,128 @@
+"""
+Проверка межпроцессной инвалидации кэша (InvalidationBus + result_cache).
+
+Несколько процессов (как воркеры gunicorn) читают название института через
+result_cache с RESULT_CACHE_BACKEND=memory, то есть каждый из своего кэша.
+Главный процесс меняет название и увеличивает версию `institutes` в одной транзакции
+и замеряет, через сколько каждый процесс начинает отдавать новое значение.
+Задержка не должна превышать INVALIDATION_POLL_INTERVAL (плюс небольшой запас
+на планирование процессов). База — временный файл SQLite.
+
+Запуск из корня репозитория:
+    python scripts/invalidation_harness.py --workers 4 --rounds 20 --interval 0.5
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def configure(directory: str, interval: float):
+    # models открывает БД по пути src/<DB_NAME>.db относительно текущего каталога
+    os.makedirs(os.path.join(directory, "src"), exist_ok=True)
+    os.chdir(directory)
+    os.environ.update({
+        "DB_KIND": "sqlite",
+        "DB_NAME": "harness",
+        "SECRET_KEY": "harness",
+        "RESULT_CACHE_BACKEND": "memory",
+        "INVALIDATION_POLL_INTERVAL": str(interval),
+    })
+
+
+def worker(directory: str, interval: float, rounds: int, ready, queue):
+    configure(directory, interval)
+    from sqlalchemy import select
+
+    from src.models import Institutes, session
+    from src.middleware.invalidation import bus
+    from src.middleware.result_cache import result_cache
+
+    def read_name() -> str:
+        return session.execute(select(Institutes.name).where(Institutes.id == 1)).scalar_one()
+
+    bus.start()
+    seen = result_cache.get_or_set("harness_institute", 1, read_name, depends=("institutes",))
+    ready.set()
+    for expected in range(1, rounds + 1):
+        while seen != str(expected):
+            time.sleep(0.001)
+            seen = result_cache.get_or_set("harness_institute", 1, read_name, depends=("institutes",))
+            session.remove()
+        queue.put((expected, time.time()))
+
+
+def run(workers: int, rounds: int, interval: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        configure(directory, interval)
+        from sqlalchemy import update
+
+        from src.models import Institutes, session
+        from src.middleware.versions_middleware import ResourceVersion
+
+        session.merge(Institutes(id=1, name="0"))
+        ResourceVersion.bump("institutes")
+        session.commit()
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        events = [context.Event() for _ in range(workers)]
+        processes = [
+            context.Process(target=worker, args=(directory, interval, rounds, events[i], queue), daemon=True)
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for ready in events:
+            ready.wait(60)
+
+        delays = []
+        for number in range(1, rounds + 1):
+            time.sleep(random.uniform(0, interval))
+            session.execute(update(Institutes).where(Institutes.id == 1).values(name=str(number)))
+            ResourceVersion.bump("institutes")
+            session.commit()
+            written_at = time.time()
+            for _ in processes:
+                _, seen_at = queue.get(timeout=max(30, interval * 10))
+                delays.append(seen_at - written_at)
+        for process in processes:
+            process.join(10)
+        session.remove()
+
+    return {
+        "workers": workers,
+        "rounds": rounds,
+        "interval": interval,
+        "p50": round(statistics.median(delays), 3),
+        "max": round(max(delays), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="INVALIDATION_POLL_INTERVAL, секунды")
+    parser.add_argument("--slack", type=float, default=0.25, help="допустимый запас сверх интервала, секунды")
+    args = parser.parse_args()
+
+    r = run(args.workers, args.rounds, args.interval)
+    bound = args.interval + args.slack
+    print(f"{'workers':>8}{'rounds':>8}{'interval':>10}{'p50':>8}{'max':>8}{'bound':>8}")
+    print(f"{r['workers']:>8}{r['rounds']:>8}{r['interval']:>10}{r['p50']:>8}{r['max']:>8}{bound:>8}")
+    if r["max"] > bound:
+        print("FAIL: staleness exceeded the bound")
+        sys.exit(1)
+    print("OK: every worker saw every write within the bound")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Нагрузочный тест одновременной записи в SQLite несколькими процессами.
+
+Каждый процесс (как воркер gunicorn) открывает свой engine и выполняет транзакции
+«прочитать — записать — commit», как обработчики записи бэкенда. Сравниваются
+режим SQLite по умолчанию (rollback journal без busy_timeout) и профиль
+DBSettings.sqlite_pragmas() (WAL, synchronous=NORMAL, busy_timeout, mmap, cache).
+
+Запуск из корня репозитория:
+    python scripts/sqlite_write_benchmark.py --workers 4 --transactions 500
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.settings import DBSettings  # noqa: E402
+
+
+PROFILES = {
+    "default": {},
+    "production": DBSettings.sqlite_pragmas(),
+}
+
+
+def make_engine(path: str, pragmas: dict):
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def worker(path: str, pragmas: dict, worker_id: int, transactions: int, queue):
+    engine = make_engine(path, pragmas)
+    done = errors = 0
+    for number in range(transactions):
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    text("SELECT count(*) FROM results WHERE worker = :worker"), {"worker": worker_id}
+                ).scalar()
+                connection.execute(
+                    text("INSERT INTO results (worker, number, value) VALUES (:worker, :number, :value)"),
+                    {"worker": worker_id, "number": number, "value": number * 7}
+                )
+            done += 1
+        except OperationalError:
+            errors += 1
+    engine.dispose()
+    queue.put((done, errors))
+
+
+def run(profile: str, workers: int, transactions: int) -> dict:
+    pragmas = PROFILES[profile]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.db")
+        engine = make_engine(path, pragmas)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE results (id INTEGER PRIMARY KEY, worker INTEGER, number INTEGER, value INTEGER)"
+            ))
+            connection.execute(text("CREATE INDEX ix_results_worker ON results (worker)"))
+        engine.dispose()
+
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker, args=(path, pragmas, i, transactions, queue))
+            for i in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+    committed = sum(done for done, _ in results)
+    failed = sum(errors for _, errors in results)
+    return {
+        "profile": profile,
+        "workers": workers,
+        "committed": committed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "tps": round(committed / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--transactions", type=int, default=500, help="транзакций на процесс")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'workers':>8}{'committed':>11}{'failed':>8}{'seconds':>9}{'tps':>9}")
+    for profile in args.profiles:
+        for workers in args.workers:
+            r = run(profile, workers, args.transactions)
+            print(f"{r['profile']:<12}{r['workers']:>8}{r['committed']:>11}{r['failed']:>8}"
+                  f"{r['seconds']:>9}{r['tps']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from os import rename
 
+import click
 from flask import render_template
 
 from .routes.users import *
@@ -9,7 +10,44 @@ from .routes.gto import *
 from .routes.students import *
 from .routes.login import *
 from .routes.standard import *
-from .origin import cross_origin
+from .routes.theory import *
+from .origin import cross_origin, request
+from .models import session, engine, replica_engines
+from .settings import DBSettings
+from .middleware.leaderboard_middleware import LeaderboardWriter
+from .middleware.JWT_processor import TokenStore
+from .middleware.versions_middleware import ResourceVersion
+from .middleware.reference_middleware import reference
+from .middleware.invalidation import bus
+
+
+TokenStore.start_purger(ServerSettings.TOKEN_PURGE_INTERVAL)
+
+# Снимок справочников загружается при старте воркера
+reference.refresh()
+session.remove()
+
+if DBSettings.INVALIDATION_POLL_INTERVAL > 0:
+    bus.start()
+
+
+@app.before_request
+def route_reads():
+    """
+    Разрешает GET/HEAD-запросам читать с реплик (DB_REPLICA_URIS).
+    Остальные запросы работают только с основной БД.
+    """
+    if request.method in ("GET", "HEAD"):
+        session.info["use_replicas"] = True
+
+
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """
+    Закрывает сессию БД текущего запроса: незавершённая транзакция откатывается,
+    соединение возвращается в пул, а следующий запрос начинает с чистой сессии.
+    """
+    session.remove()
 
 
 @app.route(ServerSettings.API_PATH+"/docs", methods=['GET'])
@@ -18,5 +56,62 @@ def hello_world():  # put application's code here
     return render_template("swaggerui.html")
 
 
+@app.cli.command("rebuild-gto-leaderboard")
+def rebuild_gto_leaderboard():
+    """
+    Пересчитывает таблицу gto_leaderboard по данным gto.
+    Запуск: flask --app src.app rebuild-gto-leaderboard
+    """
+    rows = LeaderboardWriter.rebuild()
+    print(f"gto_leaderboard rebuilt: {rows} rows")
+
+
+@app.cli.command("sync-sqlite-replica")
+def sync_sqlite_replica():
+    """
+    Копирует основную БД SQLite во все SQLite-реплики из DB_REPLICA_URIS (sqlite3 backup API).
+    Запуск: flask --app src.app sync-sqlite-replica
+    """
+    if engine.dialect.name != "sqlite":
+        print("primary database is not SQLite")
+        return
+    source = engine.raw_connection()
+    try:
+        for replica in replica_engines:
+            if replica.dialect.name != "sqlite":
+                continue
+            target = replica.raw_connection()
+            try:
+                source.driver_connection.backup(target.driver_connection)
+            finally:
+                target.close()
+            print(f"replica synced: {replica.url}")
+    finally:
+        source.close()
+
+
+@app.cli.command("purge-tokens")
+def purge_tokens():
+    """
+    Удаляет истёкшие и деактивированные токены из auth_tokens.
+    Запуск: flask --app src.app purge-tokens
+    """
+    rows = TokenStore.purge()
+    print(f"auth_tokens purged: {rows} rows")
+
+
+@app.cli.command("bump-versions")
+@click.argument("names", nargs=-1, required=True)
+def bump_versions(names):
+    """
+    Увеличивает версии ресурсов (имена таблиц), например после ручной правки institutes или groups,
+    чтобы клиенты получили новые ETag.
+    Запуск: flask --app src.app bump-versions institutes groups
+    """
+    ResourceVersion.bump(*names)
+    session.commit()
+    print(f"versions bumped: {', '.join(names)}")
+
+
 if __name__ == '__main__':
     app.run(host=ServerSettings.HOST, port=ServerSettings.PORT, debug=True)
@@ -1,7 +1,10 @@
+import logging
+import secrets
+import threading
 from functools import wraps
 from typing import Union
 
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.exc import NoResultFound, IntegrityError
 from sqlalchemy.orm.sync import update
 from werkzeug.exceptions import NotFound
 
@@ -10,10 +13,18 @@ from ..origin import jwt, app, request, jsonify
 from ..settings import ServerSettings
 import datetime
 from ..models import Users, session, Tokens
+from .cache import TTLCache
 from .crypto import crypto
 from .validator import Password
 
 
+# Кэш token_epoch пользователей (AUTH_MODE=epoch): user_id -> token_epoch
+epoch_cache = TTLCache(
+    maxsize=ServerSettings.EPOCH_CACHE_SIZE,
+    ttl=ServerSettings.EPOCH_CACHE_TTL
+)
+
+
 class PasswordManager:
     """
     Класс `PasswordManager` предназначен для управления паролями пользователей,
@@ -35,6 +46,10 @@ class PasswordManager:
         """
         Обновляет пароль пользователя в базе данных.
 
+        Refresh-токены содержат отпечаток хэша пароля, поэтому после смены пароля
+        все ранее выданные refresh-токены перестают обновляться. Кроме того, увеличивается
+        `token_epoch` пользователя, что в режиме AUTH_MODE=epoch отзывает и access-токены.
+
         Параметры:
         ----------
         email : str
@@ -47,16 +62,20 @@ class PasswordManager:
         NoResultFound:
             Вызывается, если пользователь с указанным email не найден в базе данных.
         """
-        upd = session.query(Users).filter_by(Users.email==email).update(
-            {"password_hash":Password(password).get}
-        )
+        user_id = session.query(Users.id).filter(Users.email==email).scalar()
 
-        # Проверяем, была ли обновлена запись
-        if upd == 0:
+        # Проверяем, существует ли пользователь
+        if user_id is None:
             raise NoResultFound("User not found to update password")
 
+        session.query(Users).filter(Users.id==user_id).update({
+            "password_hash":Password(password).get,
+            "token_epoch":Users.token_epoch + 1
+        })
+
         # Выполняем обновление
         session.commit()
+        epoch_cache.pop(user_id)
 
     @classmethod
     def match_password(cls, email, password) -> bool:
@@ -84,24 +103,151 @@ class PasswordManager:
             return 0
 
 
+class TokenStore:
+    """
+    Класс `TokenStore` управляет таблицей `auth_tokens` — списком использованных
+    и отозванных refresh-токенов.
+
+    Access-токены и свежие refresh-токены в БД не хранятся. Строка появляется только
+    при ротации (использованный refresh-токен) или выходе (отозванный refresh-токен),
+    поэтому вход не пишет в БД. Токены хранятся в виде sha256 (`token_digest`)
+    с уникальным индексом: повторное использование refresh-токена, в том числе
+    двумя параллельными запросами, упирается в этот индекс.
+
+    Отзыв всех сессий пользователя не требует записи о каждом токене: `Token.revoke_all`
+    увеличивает `users.token_epoch` одним UPDATE по первичному ключу, а `Token.refresh`
+    отклоняет refresh-токены с прежним epoch.
+
+    Методы:
+    -------
+    find(token) -> Union[Tokens, None]
+        Возвращает запись токена.
+    revoke(token, user_id, expires_at) -> bool
+        Помечает токен использованным/отозванным.
+    purge() -> int
+        Удаляет записи токенов с истёкшим сроком действия.
+    start_purger(interval)
+        Запускает фоновую периодическую очистку.
+    """
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """
+        Возвращает sha256 токена.
+        """
+        return crypto.encrypt(token)
+
+    @classmethod
+    def find(cls, token: str) -> Union[Tokens, None]:
+        return session.query(Tokens).filter(Tokens.token_digest == cls.digest(token)).one_or_none()
+
+    @classmethod
+    def revoke(cls, token: str, user_id: Union[int, None], expires_at: datetime.datetime) -> bool:
+        """
+        Сохраняет токен как неактивный до конца срока его действия.
+
+        Возвращает:
+        -----------
+        bool : False, если токен уже был использован или отозван.
+        """
+        try:
+            session.add(Tokens(
+                token_digest=cls.digest(token),
+                user_id=user_id,
+                expires_at=expires_at,
+                is_active=False
+            ))
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return False
+        return True
+
+    @staticmethod
+    def purge() -> int:
+        """
+        Удаляет записи токенов с истёкшим сроком действия (по индексу `expires_at`):
+        такие токены и так не пройдут проверку подписи.
+
+        Возвращает:
+        -----------
+        int : количество удалённых записей.
+        """
+        try:
+            removed = session.query(Tokens).filter(
+                Tokens.expires_at < datetime.datetime.now()
+            ).delete(synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return removed
+
+    @classmethod
+    def start_purger(cls, interval: int) -> Union[threading.Thread, None]:
+        """
+        Запускает фоновый поток, который раз в `interval` секунд вызывает `purge()`.
+        При `interval <= 0` очистка не запускается.
+        """
+        if interval <= 0:
+            return None
+
+        def run():
+            while True:
+                stop.wait(interval)
+                try:
+                    removed = cls.purge()
+                    logging.info(f"tokens purge: {removed} rows removed")
+                except Exception as e:
+                    logging.error(f"tokens purge failed: {e}")
+                finally:
+                    session.remove()
+
+        stop = threading.Event()
+        thread = threading.Thread(target=run, name="tokens-purge", daemon=True)
+        thread.start()
+        return thread
+
+
 class Token:
     """
     Класс `Token` предназначен для создания, проверки и управления токенами доступа.
-    Реализует создание токена для указанного email, деактивацию токена и валидацию токенов.
+
+    При входе выдаются два JWT:
+    - access-токен (`type="access"`) живёт ACCESS_TOKEN_TTL секунд и проверяется
+      только по подписи и сроку действия, без обращения к БД;
+    - refresh-токен (`type="refresh"`) живёт REFRESH_TOKEN_TTL секунд и обменивается
+      на новую пару токенов (`Token.refresh`). Использованный refresh-токен
+      записывается в `TokenStore` и повторно не принимается.
+
+    Оба токена содержат `token_epoch` пользователя. В режиме AUTH_MODE=epoch
+    токен принимается, только если его epoch совпадает с текущим (`current_epoch`),
+    поэтому `revoke_all` одним UPDATE строки пользователя отзывает все его токены,
+    а таблица `auth_tokens` не используется.
 
     Атрибуты:
     ----------
     email : str
         Email пользователя, связанный с токеном.
+    refresh_token : str
+        Refresh-токен, выданный вместе с access-токеном.
 
     Методы:
     -------
     deactivate():
-        Деактивирует текущий токен в базе данных.
+        Отзывает текущий refresh-токен.
 
     make(email: str) -> str:
-        Создает и сохраняет новый токен JWT для указанного email, сгенерированный с
-        временной меткой истечения срока действия (по умолчанию — через 60 часов).
+        Создает access-токен и refresh-токен для указанного email.
+
+    refresh(refresh_token: str) -> Token:
+        Обменивает refresh-токен на новую пару токенов.
+
+    revoke_all(email: str):
+        Отзывает все токены пользователя (увеличивает `token_epoch`).
+
+    current_epoch(user_id: int) -> int:
+        Возвращает текущий `token_epoch` пользователя из кэша `epoch_cache`.
 
     get_token : str (property)
         Возвращает текущий токен.
@@ -114,9 +260,12 @@ class Token:
 
     Примеры:
     --------
-    - Создание токена по email:
+    - Создание токенов по email:
         >>> token = Token(email="user@example.com")
-        >>> token.get_token
+        >>> token.get_token, token.refresh_token
+
+    - Обновление токенов:
+        >>> Token.refresh(token.refresh_token).get_token
 
     - Проверка токена:
         >>> Token.verify_token(token=token.get_token)
@@ -124,20 +273,21 @@ class Token:
     Исключения:
     -----------
     ValueError:
-        Выбрасывается при некорректном токене в декораторе `token_required`.
+        Выбрасывается при некорректном или отозванном refresh-токене в `refresh`.
     """
     email: str
+    refresh_token: Union[str, None] = None
 
     def __init__(self,
                  email: Union[str, None]=None,
                  token: Union[str, None]=None):
         """
-        Инициализирует объект `Token` с токеном или email, создает новый токен, если указан email.
+        Инициализирует объект `Token` с токеном или email, создает новые токены, если указан email.
 
         Параметры:
         ----------
         email : str, optional
-            Email пользователя, для которого создается новый токен.
+            Email пользователя, для которого создаются новые токены.
 
         token : str, optional
             Существующий токен, который будет инициализирован в объекте.
@@ -154,12 +304,73 @@ class Token:
     def __str__(self):
         return self.token
 
-    def deactivate(self):
+    def deactivate(self, email: Union[str, None] = None):
         """
-        Деактивирует текущий токен в базе данных, устанавливая поле is_active в False.
+        Отзывает текущий токен, если это refresh-токен: он записывается в `TokenStore`
+        и больше не обменивается на новые токены. Access-токен не хранится в БД
+        и перестаёт действовать по истечении ACCESS_TOKEN_TTL секунд.
+
+        Параметры:
+        ----------
+        email : str, optional
+            Email пользователя, который отзывает токен; refresh-токен другого
+            пользователя не отзывается.
+
+        Исключения:
+        -----------
+        PermissionError
+            Если refresh-токен выдан не пользователю `email`.
         """
-        q = session.query(Tokens).filter(token=self.token).update(is_active=False)
+        data = jwt.decode(self.token, ServerSettings.SECRET_KEY, algorithms=['HS256'],
+                          options={"verify_exp": False})
+        if data.get("type") == "refresh" and email is not None:
+            owner_id = session.query(Users.id).filter(Users.email == email).scalar()
+            if owner_id is None or data.get("uid") != owner_id:
+                raise PermissionError("refresh token belongs to another user")
+        if data.get("type") == "refresh":
+            TokenStore.revoke(self.token, data.get("uid"), datetime.datetime.fromtimestamp(data["exp"]))
+
+    @staticmethod
+    def fingerprint(password_hash: Union[str, None]) -> str:
+        """
+        Возвращает отпечаток хэша пароля для refresh-токена.
+        После смены пароля отпечаток меняется, и старые refresh-токены отклоняются.
+        """
+        return crypto.encrypt(str(password_hash))[:16]
+
+    @staticmethod
+    def revoke_all(email: str):
+        """
+        Отзывает все токены пользователя: увеличивает его `token_epoch` одним UPDATE.
+        В режиме AUTH_MODE=epoch после этого не принимается ни один ранее выданный токен
+        (в других процессах — не позже чем через EPOCH_CACHE_TTL секунд).
+
+        Исключения:
+        -----------
+        NoResultFound
+            Если пользователь с указанным email не найден.
+        """
+        user_id = session.query(Users.id).filter(Users.email == email).scalar()
+        if user_id is None:
+            raise NoResultFound("User not found to revoke tokens")
+        session.query(Users).filter(Users.id == user_id).update(
+            {"token_epoch": Users.token_epoch + 1}
+        )
         session.commit()
+        epoch_cache.pop(user_id)
+
+    @staticmethod
+    def current_epoch(user_id: int) -> Union[int, None]:
+        """
+        Возвращает текущий `token_epoch` пользователя.
+        Значение кэшируется в `epoch_cache` на EPOCH_CACHE_TTL секунд.
+        """
+        epoch = epoch_cache.get(user_id)
+        if epoch is None:
+            epoch = session.query(Users.token_epoch).filter(Users.id == user_id).scalar()
+            if epoch is not None:
+                epoch_cache.set(user_id, epoch)
+        return epoch
 
     @property
     def get_token(self):
@@ -170,28 +381,91 @@ class Token:
 
     def make(self, email):
         """
-        Создает новый токен JWT для указанного email с временной меткой истечения.
+        Создает access-токен и refresh-токен для указанного email.
+        Токены не сохраняются в БД.
 
         Параметры:
         ----------
         email : str
-            Email, для которого создается токен.
+            Email, для которого создаются токены.
 
         Возвращает:
         ----------
         str
-            Сгенерированный токен JWT.
+            Access-токен JWT. Refresh-токен сохраняется в `self.refresh_token`.
+
+        Исключения:
+        -----------
+        NoResultFound
+            Если пользователь с указанным email не найден.
         """
-        jwt_token = jwt.encode({
+        user = session.query(
+            Users.id, Users.password_hash, Users.token_epoch
+        ).filter(Users.email == email).one()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.refresh_token = jwt.encode({
+                "type": "refresh",
+                "uid": user.id,
+                "pwd": self.fingerprint(user.password_hash),
+                "epoch": user.token_epoch,
+                "exp": now + datetime.timedelta(seconds=ServerSettings.REFRESH_TOKEN_TTL),
+                # уникальный идентификатор: токены, выданные в одну секунду, не совпадают
+                "jti": secrets.token_hex(8)
+            },
+                ServerSettings.SECRET_KEY, algorithm='HS256')
+        return jwt.encode({
+                "type": "access",
                 "email": email,
-                "expiration":str((datetime.datetime.now()+datetime.timedelta(seconds=60*60*60))
-                                 .strftime("%Y-%m-%d %H:%M:%S"))
+                "uid": user.id,
+                "epoch": user.token_epoch,
+                "exp": now + datetime.timedelta(seconds=ServerSettings.ACCESS_TOKEN_TTL)
             },
                 ServerSettings.SECRET_KEY, algorithm='HS256')
-        q = Tokens(token=jwt_token, is_active=True)
-        session.add(q)
-        session.commit()
-        return jwt_token
+
+    @classmethod
+    def refresh(cls, refresh_token: str) -> "Token":
+        """
+        Обменивает refresh-токен на новую пару токенов (ротация).
+
+        Проверяет подпись и срок действия, активность пользователя, отпечаток пароля
+        и `token_epoch` (выход или смена пароля отзывают все refresh-токены пользователя),
+        после чего записывает использованный токен в `TokenStore`.
+        Это единственная запись в БД за всё время жизни пары токенов.
+
+        В режиме AUTH_MODE=epoch запись в `TokenStore` не выполняется:
+        refresh-токен действует до выхода или смены пароля пользователя.
+
+        Параметры:
+        ----------
+        refresh_token : str
+            Refresh-токен, полученный при входе или предыдущем обновлении.
+
+        Возвращает:
+        ----------
+        Token
+            Объект с новым access-токеном (`get_token`) и refresh-токеном (`refresh_token`).
+
+        Исключения:
+        -----------
+        jwt.InvalidTokenError
+            Если подпись неверна или срок действия токена истёк.
+        ValueError
+            Если токен не является refresh-токеном, пароль был изменён,
+            пользователь неактивен или токен уже использован.
+        """
+        data = jwt.decode(refresh_token, ServerSettings.SECRET_KEY, algorithms=['HS256'])
+        if data.get("type") != "refresh":
+            raise ValueError("not a refresh token")
+        user = session.get(Users, data.get("uid"))
+        if user is None or user.is_active is False or cls.fingerprint(user.password_hash) != data.get("pwd"):
+            raise ValueError("refresh token is revoked")
+        # выход и смена пароля увеличивают token_epoch: это отзывает все refresh-токены
+        # пользователя в обоих режимах (токены без epoch выданы до его появления — эпоха 0)
+        if data.get("epoch", 0) != user.token_epoch:
+            raise ValueError("refresh token is revoked")
+        if ServerSettings.AUTH_MODE != "epoch" and not TokenStore.revoke(refresh_token, user.id, datetime.datetime.fromtimestamp(data["exp"])):
+            raise ValueError("refresh token is already used")
+        return cls(email=user.email)
 
     @staticmethod
     def verify_token(token:str) -> dict:
@@ -206,21 +480,54 @@ class Token:
         Возвращает:
         ----------
         dict
-            Словарь с данными email и статусом ("active"/"inactive").
+            Словарь с данными email, статусом ("active"/"inactive") и временем истечения токена.
         """
-        data = jwt.decode(token, ServerSettings.SECRET_KEY, algorithms=['HS256'])
-        if datetime.datetime.now() < datetime.datetime.strptime(data['expiration'],"%Y-%m-%d %H:%M:%S"):
-            return {"email": data["email"], "status": "active"}
+        data = jwt.decode(token, ServerSettings.SECRET_KEY, algorithms=['HS256'],
+                          options={"verify_exp": False})
+        expiration = datetime.datetime.fromtimestamp(data['exp'])
+        if datetime.datetime.now() < expiration:
+            return {"email": data.get("email"), "status": "active", "expiration": expiration}
         else:
-            return {"status": "inactive"}
+            return {"status": "inactive", "expiration": expiration}
+
+    @staticmethod
+    def check(token: str) -> dict:
+        """
+        Проверяет access-токен по подписи и сроку действия, без обращения к БД.
+        В режиме AUTH_MODE=epoch дополнительно сверяет epoch токена с `current_epoch`.
+
+        Возвращает:
+        ----------
+        dict
+            Словарь {"email", "user_id", "expiration", "is_active"}.
+
+        Исключения:
+        -----------
+        jwt.ExpiredSignatureError
+            Если срок действия токена истёк.
+        jwt.InvalidTokenError
+            Если подпись неверна.
+        """
+        data = jwt.decode(token, ServerSettings.SECRET_KEY, algorithms=['HS256'])
+        is_active = data.get("type") == "access"
+        if is_active and ServerSettings.AUTH_MODE == "epoch":
+            is_active = data.get("epoch") == Token.current_epoch(data.get("uid"))
+        return {
+            "email": data.get("email"),
+            "user_id": data.get("uid"),
+            "expiration": datetime.datetime.fromtimestamp(data["exp"]),
+            "is_active": is_active
+        }
 
     @staticmethod
     def token_required(func):
         """
-         Декоратор, проверяющий токен перед вызовом функции.
+         Декоратор, проверяющий access-токен перед вызовом функции.
 
          Если токен валиден и активен, функция выполняется с переданным email.
-         В противном случае возвращает сообщение об ошибке авторизации.
+         Просроченный токен даёт 401: клиент должен обновить его через refresh-токен.
+         Проверка не обращается к БД, кроме промахов `epoch_cache` в режиме AUTH_MODE=epoch
+         (см. `Token.check`).
 
          Параметры:
          ----------
@@ -237,12 +544,13 @@ class Token:
 
             try:
                 token = request.headers["Authorization"].split()[1]
-                token_status = Token.verify_token(token)
-                query_token = session.query(Tokens).filter_by(token=token).first()
-                if token_status["status"] == "active" and query_token.is_active==True:
-                    return func(_email=token_status["email"], *args, **kwargs)
+                token_state = Token.check(token)
+                if token_state["is_active"]:
+                    return func(_email=token_state["email"], *args, **kwargs)
                 else:
                     return jsonify({"message": "unauthorized"}), 401
+            except jwt.ExpiredSignatureError:
+                return jsonify({"message": "unauthorized", "reason": "token is expired"}), 401
             except Exception as e:
                 return jsonify({"message": "incorrect token", "reason": str(e)}), 422
-        return wrapper
\ No newline at end of file
+        return wrapper
@@ -0,0 +1,134 @@
+import csv
+import io
+from typing import Any, Dict, Iterator, List, Sequence, Type
+
+from sqlalchemy import insert, Select
+from sqlalchemy.exc import IntegrityError
+
+from ..models import Base, session
+
+
+class BulkLoader:
+    """
+    Класс `BulkLoader` вставляет много строк в одну таблицу самым быстрым способом,
+    который поддерживает текущая СУБД:
+
+    - PostgreSQL — `COPY <таблица> (<столбцы>) FROM STDIN` через psycopg;
+    - остальные (SQLite) — один INSERT с `executemany`.
+
+    Строки пишутся в текущую транзакцию сессии, commit выполняет вызывающий код.
+
+    Примеры:
+    --------
+    >>> BulkLoader.load(StandardResults, ["student_id", "standard_id", "semester", "result"],
+    ...                 [{"student_id": 1, "standard_id": 2, "semester": 1, "result": 10}])
+    1
+    >>> session.commit()
+    """
+
+    @staticmethod
+    def load(model: Type[Base], columns: Sequence[str], rows: List[Dict[str, Any]]) -> int:
+        """
+        Вставляет `rows` в таблицу `model`. Отсутствующие в строке столбцы из `columns` получают NULL.
+
+        Возвращает:
+        -----------
+        int : количество вставленных строк.
+
+        Исключения:
+        -----------
+        IntegrityError
+            Если строки нарушают ограничения таблицы (в PostgreSQL ошибка COPY приводится
+            к `sqlalchemy.exc.IntegrityError`, как у INSERT).
+        """
+        if not rows:
+            return 0
+        connection = session.connection()
+        if connection.dialect.name == "postgresql":
+            # psycopg нужен только для PostgreSQL, поэтому импортируется здесь
+            import psycopg
+
+            table = model.__table__.name
+            names = ", ".join(columns)
+            statement = f"COPY {table} ({names}) FROM STDIN"
+            cursor = connection.connection.driver_connection.cursor()
+            try:
+                with cursor.copy(statement) as copy:
+                    for row in rows:
+                        copy.write_row([row.get(column) for column in columns])
+            except psycopg.IntegrityError as e:
+                # COPY идёт мимо SQLAlchemy, поэтому ошибка драйвера не обёрнута
+                raise IntegrityError(statement, None, e) from e
+            finally:
+                cursor.close()
+        else:
+            session.execute(insert(model), [{column: row.get(column) for column in columns} for row in rows])
+        return len(rows)
+
+
+class CSVExporter:
+    """
+    Класс `CSVExporter` выгружает результат SELECT в CSV по частям, не загружая его в память:
+
+    - PostgreSQL — `COPY (<запрос>) TO STDOUT WITH (FORMAT csv, HEADER)`;
+    - остальные (SQLite) — построчное чтение курсора пачками по `chunk_size` строк.
+
+    БД выбирается через `session`, поэтому в GET-запросах запрос читает с реплики (DB_REPLICA_URIS).
+
+    Параметры:
+    ----------
+    statement : Select
+        Запрос; имена столбцов результата становятся заголовком CSV.
+    chunk_size : int
+        Сколько строк собирать в одну часть ответа (SQLite).
+
+    Примеры:
+    --------
+    >>> stmt = select(Students.id, Students.last_name).where(Students.group_id == 1)
+    >>> Response(stream_with_context(CSVExporter(stmt).stream()), mimetype="text/csv")
+    """
+    chunk_size: int = 1000
+
+    def __init__(self, statement: Select, chunk_size: int = None):
+        self.statement = statement
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+    def stream(self) -> Iterator[bytes]:
+        """
+        Возвращает генератор частей CSV (UTF-8, первая строка — заголовок).
+
+        БД (основная или реплика) выбирается сразу, а запрос выполняется на отдельном
+        соединении при чтении ответа: к этому моменту сессия запроса уже закрыта.
+        """
+        return self._stream(session.get_bind(clause=self.statement))
+
+    def _stream(self, bind) -> Iterator[bytes]:
+        with bind.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                yield from self._copy(connection)
+            else:
+                yield from self._fetch(connection)
+
+    def _copy(self, connection) -> Iterator[bytes]:
+        sql = self.statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        cursor = connection.connection.driver_connection.cursor()
+        try:
+            with cursor.copy(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+                for data in copy:
+                    yield bytes(data)
+        finally:
+            cursor.close()
+
+    def _fetch(self, connection) -> Iterator[bytes]:
+        result = connection.execution_options(stream_results=True).execute(self.statement)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.keys())
+        for rows in result.partitions(self.chunk_size):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Union
+
+
+class TTLCache:
+    """
+    Класс `TTLCache` — потокобезопасный кэш в памяти процесса с ограниченным размером (LRU)
+    и временем жизни записей (TTL).
+
+    При превышении `maxsize` вытесняется запись, к которой дольше всего не обращались.
+    Запись с истёкшим сроком жизни считается отсутствующей и удаляется при обращении.
+
+    Параметры:
+    ----------
+    maxsize : int
+        Максимальное количество записей.
+    ttl : float
+        Время жизни записи в секундах по умолчанию.
+
+    Примеры:
+    --------
+    >>> cache = TTLCache(maxsize=1000, ttl=60)
+    >>> cache.set("key", {"email": "user@example.com"})
+    >>> cache.get("key")
+    {'email': 'user@example.com'}
+    >>> cache.pop("key")
+    """
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу или `default`, если записи нет или её срок истёк.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Union[float, None] = None):
+        """
+        Сохраняет значение на `ttl` секунд (по умолчанию — `self.ttl`).
+        Значения с неположительным `ttl` не сохраняются.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """
+        Удаляет запись по ключу, если она есть.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Удаляет все записи, значения которых удовлетворяют `predicate`.
+
+        Возвращает:
+        -----------
+        int : количество удалённых записей.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        """
+        Очищает кэш.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
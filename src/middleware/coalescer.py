@@ -0,0 +1,190 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, List, Tuple, Union
+
+from ..models import session
+from ..settings import DBSettings
+
+
+class WriteCoalescer:
+    """
+    Класс `WriteCoalescer` объединяет записи, пришедшие из разных потоков в течение
+    `window` секунд, в одну транзакцию (group commit): вместо commit (и fsync) на каждый
+    запрос выполняется один commit на пачку.
+
+    Запись передаётся функцией `job`, которая только готовит изменения в `session`
+    (add/update/flush) и возвращает ответ, но не делает commit. Все функции пачки
+    выполняются в фоновом потоке коалесера. Если функция падает, транзакция пачки откатывается,
+    эта функция получает свою ошибку, а остальные выполняются заново без неё.
+    Если падает сам commit (например, конфликт уникального индекса обнаружен только при нём),
+    записи пачки выполняются повторно по одной, каждая своей транзакцией, и ошибку
+    получает только та, из-за которой commit не прошёл.
+    Результат каждой записи выдаётся только после успешного commit, поэтому
+    надёжность не снижается.
+
+    Параметры:
+    ----------
+    window : float
+        Сколько секунд собирать пачку после первой записи.
+    max_batch : int
+        Максимальное количество записей в пачке.
+
+    Примеры:
+    --------
+    >>> coalescer = WriteCoalescer(window=0.005, max_batch=100)
+    >>> coalescer.submit(lambda: StandardWriter(...).stage_result()).result()
+    {'id': 1, 'student_id': 1, ...}
+    """
+    timeout: float = 30
+
+    def __init__(self, *, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.jobs: "queue.Queue[Tuple[Callable[[], Any], Future]]" = queue.Queue()
+        self._thread: Union[threading.Thread, None] = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: Callable[[], Any]) -> Future:
+        """
+        Ставит запись в очередь и возвращает `Future` с её результатом.
+        """
+        self._start()
+        future: Future = Future()
+        self.jobs.put((job, future))
+        return future
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[Tuple[Callable[[], Any], Future]]:
+        batch = [self.jobs.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # записи, отменённые в run_write по таймауту, не выполняются
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as e:
+                logging.error(f"write coalescer failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                session.remove()
+
+    def _commit(self, batch: List[Tuple[Callable[[], Any], Future]]):
+        """
+        Выполняет пачку одной транзакцией. Упавшая запись исключается из пачки,
+        остальные выполняются повторно с начала новой транзакции.
+        Если не прошёл commit, записи выполняются по одной (см. `_commit_each`).
+        """
+        pending = batch
+        while pending:
+            results = []
+            failed = None
+            for job, future in pending:
+                try:
+                    results.append((future, job()))
+                except Exception as e:
+                    failed = (job, future, e)
+                    break
+            if failed is None:
+                break
+            session.rollback()
+            job, future, error = failed
+            future.set_exception(error)
+            pending = [item for item in pending if item[1] is not future]
+        else:
+            return
+        try:
+            session.commit()
+        except Exception as e:
+            # объекты, на которых упал flush внутри commit, остаются в сессии: начинаем с новой
+            session.remove()
+            logging.warning(f"write coalescer batch commit failed, committing jobs one by one: {e}")
+            self._commit_each(pending)
+            return
+        for future, result in results:
+            future.set_result(result)
+
+    @staticmethod
+    def _commit_each(batch: List[Tuple[Callable[[], Any], Future]]):
+        """
+        Выполняет каждую запись пачки отдельной транзакцией: ошибка записи или её commit
+        достаётся только этой записи.
+        """
+        for job, future in batch:
+            try:
+                result = job()
+                session.commit()
+            except Exception as e:
+                session.remove()
+                future.set_exception(e)
+                continue
+            future.set_result(result)
+
+
+# Коалесер создаётся только при WRITE_COALESCING=true
+coalescer: Union[WriteCoalescer, None] = WriteCoalescer(
+    window=DBSettings.WRITE_COALESCING_WINDOW / 1000,
+    max_batch=DBSettings.WRITE_COALESCING_MAX_BATCH
+) if DBSettings.WRITE_COALESCING else None
+
+
+def run_write(job: Callable[[], Any]) -> Any:
+    """
+    Выполняет запись `job` (подготовка изменений без commit) и фиксирует её.
+
+    При WRITE_COALESCING=true запись отправляется в `coalescer` и фиксируется вместе
+    с записями других потоков; иначе — commit в текущей сессии.
+    Ошибка `job` или commit пробрасывается вызывающему.
+
+    После записи через коалесер сессия вызывающего помечается как писавшая,
+    поэтому дальнейшие чтения запроса идут в основную БД, а не в реплику.
+
+    Исключения:
+    -----------
+    TimeoutError
+        Если запись не начала выполняться за `coalescer.timeout` секунд; она отменена
+        и не будет зафиксирована. Начавшаяся запись ожидается до конца, чтобы не сообщить
+        об ошибке записи, которая ещё может пройти.
+    """
+    if coalescer is not None:
+        future = coalescer.submit(job)
+        try:
+            result = future.result(timeout=coalescer.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+            result = future.result()
+        # запись сделана в сессии коалесера: реплики ещё могут её не видеть
+        session.info["wrote"] = True
+        return result
+    try:
+        result = job()
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return result
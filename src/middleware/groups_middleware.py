@@ -1,52 +1,68 @@
 import logging
 from typing import Union, Dict, List
 
+from sqlalchemy.orm import joinedload
 
-
-from src.middleware.institute_middleware import InstitutesReader
+from src.middleware.reference_middleware import reference
 from src.models import Groups, NoResultFound, session
 
 
 class GroupsReader:
     """
-    Данный класс работает предназначе
+    Данный класс возвращает данные группы по её ID вместе с институтом.
+    Группа берётся из снимка справочников (`reference`) без запросов к БД;
+    если её там нет (например, она добавлена после загрузки снимка),
+    группа и институт загружаются одним запросом (JOIN).
     """
     def __init__(self, *, _id:int):
         self._id = _id
-        try:
-            self.group = session.query(Groups).filter(Groups.id == self._id).one_or_none()
-            self.institute = InstitutesReader(self.group.institute_id).get
-        except NoResultFound:
-            self.group = None
-
+        self.group = reference.current.groups.get(self._id)
+        if self.group is None:
+            try:
+                self.group = session.query(Groups).options(
+                    joinedload(Groups.institute)
+                ).filter(Groups.id == self._id).one_or_none()
+            except NoResultFound:
+                self.group = None
 
 
     @property
     def get(self) -> Union[Dict, None]:
         if self.group:
-            return {
-                "id": self.group.id,
-                "name": self.group.name,
-                "course": self.group.course,
-                "institute_id": self.institute["id"],
-                "institute":
-                    {
-                    "name": self.institute["name"],
-                    "id":self.institute["id"]
-                    }
-                }
+            return self.to_dict(self.group)
         return None
 
+    @staticmethod
+    def to_dict(group: Groups) -> Dict:
+        """
+        Преобразует объект `Groups` с загруженным институтом (или `GroupRecord` из снимка)
+        в словарь ответа API.
+        """
+        return {
+            "id": group.id,
+            "name": group.name,
+            "course": group.course,
+            "institute_id": group.institute_id,
+            "institute":
+                {
+                "name": group.institute.name if group.institute else None,
+                "id": group.institute_id
+                }
+            }
+
 class GroupsList:
     """
     класс реализует поиск групп по айди института
     и курса.
+    Выборка выполняется одним запросом по составному индексу (institute_id, course),
+    институт подгружается в том же запросе, пагинация — через OFFSET/LIMIT.
     пример использования:
     GroupsList(
                 institute_id=1,
-                course_id=1,
+                course=1,
                 skip=0,
                 limit=100
+    )
     """
     def __init__(self,*,
                  institute_id: int,
@@ -58,23 +74,20 @@ class GroupsList:
         self.skip: int = skip
         self.limit: int = limit
         self.groups : List[Dict] = []
-        self.count = session.query(Groups).count()
+        self.query = session.query(Groups).filter(
+            (Groups.institute_id == self.institute_id) &
+            (Groups.course == self.course)
+        )
+        self.count = self.query.count()
 
     def _make_list(self):
-        for i in range(1, self.count+1):
-            group = GroupsReader(_id=i).get
-            if group:
-                self.groups.append(group)
-                #print(group)
-        self.groups = list(
-            filter(
-                (lambda group: group["institute_id"] == self.institute_id and \
-                    group["course"] == self.course), self.groups
-            )
-        )
+        groups = self.query.options(
+            joinedload(Groups.institute)
+        ).order_by(Groups.id).offset(self.skip).limit(self.limit).all()
+        self.groups = [GroupsReader.to_dict(group) for group in groups]
 
 
     @property
     def get(self) -> List[Dict]:
         self._make_list()
-        return self.groups[self.skip:self.skip+self.limit]
+        return self.groups
@@ -1,19 +1,152 @@
 
+from sqlalchemy import func
 from werkzeug.exceptions import NotFound
 
-from src.middleware.institute_middleware import InstitutesReader
-from .groups_middleware import GroupsList
-from .students_middleware import StudentsReader
+from .coalescer import run_write
+from .leaderboard_middleware import LeaderboardReader, LeaderboardWriter
 from .validator import LevelGTO
+from .versions_middleware import ResourceVersion
+from .result_cache import result_cache
+from .institute_middleware import InstitutesReader
 from ..origin import *
 from ..models import *
 
+# Таблицы, от которых зависят отчёты ГТО: их версии входят в ключи `result_cache`
+GTO_REPORT_TABLES: Tuple[str, ...] = ("gto", "gto_leaderboard", "students", "groups", "institutes")
+
+class GTOAggregator:
+    """
+    Агрегирующий движок для подсчёта достижений ГТО.
+
+    Вместо обхода студентов по одному и отдельного запроса к `BaseGTO` на каждого студента
+    считает количество золотых, серебряных и бронзовых знаков одним сгруппированным запросом
+    по цепочке `gto -> students -> groups -> institutes`.
+
+    Атрибуты:
+    ----------
+    year : int
+        Год, за который считаются достижения (по умолчанию — текущий).
+
+    Методы:
+    -------
+    count_by_institutes : property
+        Возвращает количество достижений по уровням для каждого института.
+    count_by_group(group_id: int) -> Dict[str, int]
+        Возвращает количество достижений по уровням для студентов одной группы.
+    count_by_student(student_id: int) -> Dict[str, int]
+        Возвращает достижения конкретного студента.
+    count_members : property
+        Возвращает общее количество записей ГТО по уровням за все годы.
+
+    Примеры:
+    --------
+    >>> positions = GTOAggregator().count_by_institutes
+    >>> positions[1]  # {'gold': 3, 'silver': 5, 'bronze': 1}
+    """
+    levels: Tuple[str, ...] = ("gold", "silver", "bronze")
+
+    def __init__(self, *, year: Union[int, None] = None):
+        """
+        Параметры:
+        ----------
+        year : Union[int, None]
+            Год, за который считаются достижения. Если не указан, используется текущий год.
+        """
+        self.year = year if year else datetime.now().year
+
+    def zero_counts(self) -> Dict[str, int]:
+        """
+        Возвращает словарь с нулевым количеством достижений по каждому уровню.
+        """
+        return {level: 0 for level in self.levels}
+
+    def _fold(self, rows) -> Dict[str, int]:
+        """
+        Сворачивает строки вида (level, count) в словарь по уровням.
+        """
+        res = self.zero_counts()
+        for level, count in rows:
+            if level in res:
+                res[level] += count
+        return res
+
+    @property
+    def count_by_institutes(self) -> Dict[int, Dict[str, int]]:
+        """
+        Считает достижения всех институтов за `year` одним запросом.
+
+        Институты соединяются с группами, студентами и записями ГТО внешними соединениями,
+        поэтому институты без достижений тоже попадают в результат (с нулевыми значениями).
+
+        Возвращает:
+        -----------
+        Dict[int, Dict[str, int]] : {institute_id: {level: count}}, упорядоченный по id института.
+        """
+        rows = session.query(
+            Institutes.id, BaseGTO.level, func.count(BaseGTO.student_id)
+        ).outerjoin(
+            Groups, Groups.institute_id == Institutes.id
+        ).outerjoin(
+            Students, Students.group_id == Groups.id
+        ).outerjoin(
+            BaseGTO, (BaseGTO.student_id == Students.id) & (BaseGTO.year == self.year)
+        ).group_by(
+            Institutes.id, BaseGTO.level
+        ).order_by(
+            Institutes.id
+        ).all()
+
+        positions: Dict[int, Dict[str, int]] = {}
+        for institute_id, level, count in rows:
+            counts = positions.setdefault(institute_id, self.zero_counts())
+            if level in counts:
+                counts[level] += count
+        return positions
+
+    def count_by_group(self, group_id: int) -> Dict[str, int]:
+        """
+        Считает достижения студентов группы `group_id` за `year` одним запросом.
+        """
+        rows = session.query(
+            BaseGTO.level, func.count(BaseGTO.student_id)
+        ).join(
+            Students, Students.id == BaseGTO.student_id
+        ).filter(
+            (Students.group_id == group_id) &
+            (BaseGTO.year == self.year)
+        ).group_by(BaseGTO.level).all()
+        return self._fold(rows)
+
+    def count_by_student(self, student_id: int) -> Dict[str, int]:
+        """
+        Возвращает достижения студента `student_id` за `year`.
+        """
+        rows = session.query(
+            BaseGTO.level, func.count(BaseGTO.student_id)
+        ).filter(
+            (BaseGTO.student_id == student_id) &
+            (BaseGTO.year == self.year)
+        ).group_by(BaseGTO.level).all()
+        return self._fold(rows)
+
+    @property
+    def count_members(self) -> Dict[str, int]:
+        """
+        Возвращает общее количество записей ГТО по уровням (за все годы) одним запросом.
+        """
+        rows = session.query(
+            BaseGTO.level, func.count(BaseGTO.student_id)
+        ).group_by(BaseGTO.level).all()
+        return self._fold(rows)
+
+
 class GTOReader:
     """
     Класс для работы с данными по результатам ГТО (Готов к труду и обороне) студентов и групп в разрезе институтов.
 
     Этот класс позволяет получать результаты ГТО для отдельного студента, группы или всего института, а также
     предоставляет данные о количестве студентов с достижениями (золотой, серебряный и бронзовый уровни).
+    Все подсчёты выполняются через `GTOAggregator` агрегирующими запросами.
 
     Атрибуты:
     ----------
@@ -23,32 +156,16 @@ class GTOReader:
         Идентификатор группы, к которой относятся студенты (если требуется).
     student_id : Union[int, None]
         Идентификатор студента для выборки индивидуальных данных.
-    institute : dict
-        Данные об институте, полученные из `InstitutesReader`.
-    groups : List[Dict]
-        Список словарей с информацией о группах, принадлежащих институту.
-    students : List[Dict]
-        Список словарей с данными о студентах, относящихся к выбранным группам или группе.
-    gto_results : Dict[str, int]
-        Словарь для хранения количества золотых, серебряных и бронзовых достижений.
+    aggregator : GTOAggregator
+        Движок подсчёта достижений за текущий год.
 
     Методы:
     -------
-    compare_groups()
-        Формирует список групп, относящихся к указанному `institute_id`.
-
-    compare_students()
-        Формирует список студентов, состоящих в указанных группах. Если задан `group_id`, отбирает студентов
-        только из этой группы.
-
-    compare_results()
-        Формирует данные о результатах ГТО для студентов на текущий год по их уровню достижений.
-
     get_by_one_institute : property
-        Выполняет операции для получения достижений всех студентов института.
+        Возвращает достижения всех студентов института.
 
     get_by_group : property
-        Выполняет операции для получения достижений всех студентов указанной группы.
+        Возвращает достижения всех студентов указанной группы.
 
     get_by_student : property
         Возвращает данные о достижениях для конкретного студента.
@@ -74,207 +191,76 @@ class GTOReader:
         self.institute_id = institute_id
         self.group_id = group_id
         self.student_id = student_id
-        self.institute = InstitutesReader(self.institute_id).get
-        self.groups: List[Dict] = []
-        self.students: List[Dict] = []
-        self.gto_results: Dict[str, int] = {"gold":0, "silver":0, "bronze":0}
-
-
-    def compare_groups(self):
-        """
-        Формирует список групп, относящихся к указанному институту.
-
-        Метод выполняет запрос для получения информации о всех группах, относящихся к `institute_id`,
-        и сохраняет их в `self.groups`.
-        """
-        #count = Groups.select().count()
-        count = session.query(Groups).count()
-        #print("count=",count)
-        for i in range(1, 7):
-            self.groups.extend(
-                GroupsList(institute_id=self.institute_id,
-                           course=i, skip=1,limit=count
-                           ).get
-            )
-        #print("groups=",self.groups)
-
-    def compare_students(self):
-        """
-        Формирует список студентов, относящихся к указанным группам или одной группе.
-
-        Если задан `group_id`, выбирает только студентов данной группы, иначе — студентов всех групп из `self.groups`.
-        """
-        #count = Students.select().count()
-        count = session.query(Students).count()
-        #print(self.groups)
-        for i in range(1,count+1):
-            student = StudentsReader(_id=i).get
-            #print("student=",student)
-            if student:
-                #print("is stud")
-                if self.group_id:
-                    if student["group_id"] == self.group_id:
-                        self.students.append(student)
-                else:
-                    for k in self.groups:
-                        if student["group_id"] == int(k["id"]):
-                            self.students.append(student)
-
-    def compare_results(self):
-        """
-        Формирует данные о результатах ГТО для студентов за текущий год
-        Если задан `student_id`, возвращает результаты для конкретного студента. В противном случае формирует данные
-        о достижениях всех студентов из `self.students`.
-        """
-        if self.student_id:
-            res = session.query(BaseGTO).filter(
-                (BaseGTO.student_id == self.student_id) &
-                (BaseGTO.year == datetime.now().year)
-            ).one_or_none()
-            self.gto_results[res.level] += 1
-        for i in self.students:
-            res = session.query(BaseGTO).filter(
-                (BaseGTO.student_id == i['id']) &
-                (BaseGTO.year == datetime.now().year)
-            ).one_or_none()
-            self.gto_results[res.level] += 1
+        self.aggregator = GTOAggregator()
 
     @property
-    def get_by_one_institute(self):
+    def get_by_one_institute(self) -> Dict[str, int]:
         """
-        Возвращает достижения студентов института
-        Метод вызывает `compare_groups()`, `compare_students()` и `compare_results()` для получения
-        всех достижений по `institute_id`.
+        Возвращает достижения студентов института за текущий год.
         """
-        self.compare_groups()
-        self.compare_students()
-        self.compare_results()
-        return self.gto_results
+        positions = self.aggregator.count_by_institutes
+        return positions.get(self.institute_id, self.aggregator.zero_counts())
 
     @property
-    def get_by_group(self):
+    def get_by_group(self) -> Dict[str, int]:
         """
-        Возвращает достижения студентов указанной группы
-        Метод вызывает `compare_students()` и `compare_results()` для получения всех достижений по `group_id`.
+        Возвращает достижения студентов указанной группы за текущий год.
         """
-        self.compare_students()
-        self.compare_results()
-        return self.gto_results
+        return self.aggregator.count_by_group(self.group_id)
 
     @property
-    def get_by_student(self):
+    def get_by_student(self) -> Dict[str, int]:
         """
-        Возвращает достижения конкретного студента
-        Метод вызывает `compare_results()` для получения достижений по `student_id`.
+        Возвращает достижения конкретного студента за текущий год.
         """
-        self.compare_results()
-        return self.gto_results
+        return self.aggregator.count_by_student(self.student_id)
 
     @property
-    def get_all_members(self):
+    def get_all_members(self) -> Dict[str, int]:
         """
-        Возвращает общее количество достижений всех студентов
-        Метод выполняет запросы для получения числа студентов с золотым, серебряным и бронзовым уровнями ГТО
+        Возвращает общее количество достижений всех студентов (через `result_cache`)
         Возвращает:
         -----------
         Dict[str, int] : Словарь с количеством студентов по уровням достижений.
         """
-        gold = session.query(BaseGTO).filter(
-            BaseGTO.level == "gold"
-        ).count()
-        silver = session.query(BaseGTO).filter(
-            BaseGTO.level == "silver"
-        ).count()
-        bronze = session.query(BaseGTO).filter(
-            BaseGTO.level == "bronze"
-        ).count()
-        return {
-            "gold": gold,
-            "silver": silver,
-            "bronze": bronze
-        }
+        return result_cache.get_or_set(
+            "gto_members", None, lambda: self.aggregator.count_members, depends=GTO_REPORT_TABLES
+        )
 
 class RatingByInstitute:
+    """
+    Класс для определения места института в рейтинге ГТО по каждому уровню достижений.
+
+    Место читается одним индексированным запросом из таблицы `gto_leaderboard`
+    (см. `LeaderboardReader`). Институты с одинаковым количеством знаков делят место.
+
+    Пример:
+    --------
+    >>> RatingByInstitute(institute_id=1).get  # {'gold': 1, 'silver': 3, 'bronze': 2}
+    """
     def __init__(self, *,
-                 institute_id:int):
+                 institute_id:int,
+                 year: Union[int, None] = None):
+        """
+        Параметры:
+        ----------
+        institute_id : int
+            Идентификатор института, место которого определяется.
+        year : Union[int, None]
+            Год рейтинга (по умолчанию — текущий).
+        """
         self.institute_id = institute_id
-        self.positions: Dict[int,Dict[str,int]] = {} #institute_id: {level: count}
-        self.count = session.query(Institutes).count()
-        self.rating: Dict[str,List[Dict[int,int]]] = {
-            "gold":[],
-            "silver":[],
-            "bronze":[]
-        }
-        self.institute_rating = {}
-        # level: [{institute_id: institute_rating}]
-
-    def compare_positions(self):
-        for i in range(1,self.count+1):
-            self.positions[i] = GTOReader(institute_id=i).get_by_one_institute
-
-    def compare_rating(self):
-        """
-        Метод compare_rating в классе RatingByInstitute строит рейтинг институтов
-        на основе уровней их достижений (золотой, серебряный и бронзовый) и
-        определяет место конкретного института (self.institute_id) для каждого уровня,
-        сохраняя позиции в словаре self.institute_rating.
-
-        Создаются три списка (gold, silver, bronze) для каждого уровня достижений.
-        Они будут содержать словари, в которых ключ — ID института,
-        а значение — количество достижений (например, количество золотых медалей)
-        для каждого института.
-
-        Здесь метод перебирает все институты и, в зависимости от уровня (gold, silver, bronze),
-        добавляет количество достижений каждого уровня в соответствующий список.
-        Используется match для распределения данных по уровням.
-
-        Каждый список (gold, silver, bronze) сортируется по убыванию количества достижений.
-        Это позволяет определить рейтинг: институт с наибольшим количеством достижений
-        окажется на первом месте.
-        Для каждого уровня (аналогично для silver и bronze) метод проходит по отсортированному списку,
-        и как только находит self.institute_id, записывает позицию в self.institute_rating.
-
-        Таким образом, self.institute_rating в конце работы метода содержит позиции конкретного института
-        в общем рейтинге по каждому уровню достижений.
-        """
-        gold: List[Dict[int, int]] = []
-        silver: List[Dict[int, int]] = []
-        bronze: List[Dict[int, int]] = []
-        for institute_id, data in self.positions.items():
-            for level, _count in self.positions[institute_id].items():
-                match level:
-                    case "gold":
-                        gold.append({
-                            institute_id: self.positions[institute_id]["gold"]
-                        })
-                    case "silver":
-                        silver.append({
-                            institute_id: self.positions[institute_id]["silver"]
-                        })
-                    case "bronze":
-                        bronze.append({
-                            institute_id: self.positions[institute_id]["bronze"]
-                        })
-        gold.sort(key=lambda x: int(*x.values()), reverse=True)
-        silver.sort(key=lambda x: int(*x.values()), reverse=True)
-        bronze.sort(key=lambda x: int(*x.values()), reverse=True)
-        for place, elem in enumerate(gold, start=1):
-            for institute_id, count_res in elem.items():
-                if institute_id == self.institute_id:
-                    self.institute_rating["gold"] = place
-        for place, elem in enumerate(silver, start=1):
-            for institute_id, count_res in elem.items():
-                if institute_id == self.institute_id:
-                    self.institute_rating["silver"] = place
-        for place, elem in enumerate(bronze, start=1):
-            for institute_id, count_res in elem.items():
-                if institute_id == self.institute_id:
-                    self.institute_rating["bronze"] = place
+        self.year = year
+        self.institute_rating: Dict[str, int] = {}
 
     @property
-    def get(self):
-        self.compare_positions()
-        self.compare_rating()
+    def get(self) -> Dict[str, int]:
+        self.institute_rating = result_cache.get_or_set(
+            "gto_rating",
+            (self.institute_id, self.year or datetime.now().year),
+            lambda: LeaderboardReader(institute_id=self.institute_id, year=self.year).get["rating"],
+            depends=GTO_REPORT_TABLES
+        )
         return self.institute_rating
 
 
@@ -302,13 +288,15 @@ class AssemblerGTO:
         Инициализирует объект `AssemblerGTO` для заданного `institute_id`, запрашивает данные о достижениях, участниках и
         рейтинге, формирует базовую структуру данных.
     get(self) -> Dict
-        Свойство, возвращающее готовый словарь с обработанными данными. Если общее количество достижений не равно нулю,
-        рассчитывает процентное соотношение для каждого уровня достижений (золото, серебро, бронза).
+        Свойство, возвращающее готовый словарь с обработанными данными, включая процентное соотношение
+        для каждого уровня достижений (золото, серебро, бронза).
     """
     def __init__(self, *,institute_id:int):
         """
         Инициализирует объект `AssemblerGTO` с заданным идентификатором института, собирает данные о достижениях,
-        участниках и рейтинге
+        участниках и рейтинге. Достижения и место института читаются одним запросом из `gto_leaderboard`,
+        поэтому сборка не зависит ни от числа студентов, ни от числа институтов.
+        Собранный словарь хранится в `result_cache` до изменения таблиц `GTO_REPORT_TABLES`.
         Параметры:
         ----------
         institute_id : int
@@ -321,28 +309,45 @@ class AssemblerGTO:
         - self.data : основной словарь, включающий собранные данные и их процентное распределение.
         """
         self.institute_id = institute_id
-        self.gto_results: Dict[str, int] = GTOReader(
-            institute_id=self.institute_id,
-        ).get_by_one_institute
-        self.rating = RatingByInstitute(institute_id=institute_id).get
-        self.all_members = GTOReader(
-            institute_id=self.institute_id,
-        ).get_all_members
-        self.data = {
+        self.data = result_cache.get_or_set(
+            "gto_assembler",
+            (self.institute_id, datetime.now().year),
+            self._assemble,
+            depends=GTO_REPORT_TABLES
+        )
+        self.gto_results: Dict[str, int] = self.data["count_by_institute"]
+        self.rating = self.data["rating"]
+        self.all_members = self.data["members_count"]
+
+    def _assemble(self) -> Dict:
+        """
+        Собирает словарь `data` запросами к БД и считает процентное соотношение.
+
+        Исключения:
+        -----------
+        NoResultFound : Если институт не найден.
+        """
+        if InstitutesReader(self.institute_id).get is None:
+            raise NoResultFound(f"institute {self.institute_id} not found")
+        leaderboard = LeaderboardReader(institute_id=self.institute_id).get
+        gto_results: Dict[str, int] = leaderboard["count"]
+        rating = leaderboard["rating"]
+        all_members = GTOAggregator().count_members
+        data = {
             "count_by_institute": {
-                "gold": self.gto_results["gold"],
-                "silver": self.gto_results["silver"],
-                "bronze": self.gto_results["bronze"]
+                "gold": gto_results["gold"],
+                "silver": gto_results["silver"],
+                "bronze": gto_results["bronze"]
             },
             "members_count":{
-                "gold":self.all_members["gold"],
-                "silver":self.all_members["silver"],
-                "bronze":self.all_members["bronze"]
+                "gold":all_members["gold"],
+                "silver":all_members["silver"],
+                "bronze":all_members["bronze"]
             },
             "rating":{
-                "gold":self.rating["gold"],
-                "silver":self.rating["silver"],
-                "bronze":self.rating["bronze"]
+                "gold":rating["gold"],
+                "silver":rating["silver"],
+                "bronze":rating["bronze"]
             },
             "percent_by_common":{
                 "gold":0 ,
@@ -350,13 +355,18 @@ class AssemblerGTO:
                 "bronze":0
             }
         }
+        if gto_results["gold"]+gto_results["silver"]+gto_results["bronze"]!=0:
+            for i in ["gold","silver","bronze"]:
+                data["percent_by_common"][i] = gto_results[i]/(
+                    gto_results["gold"]+gto_results["silver"]+gto_results["bronze"]
+                )*100
+        return data
 
     @property
     def get(self):
         """
-        Возвращает основной словарь `data`, содержащий собранные данные о результатах и рейтинге института
-        Если общее количество достижений (золотые, серебряные и бронзовые медали) не равно нулю, рассчитывает процентное
-        соотношение для каждого уровня
+        Возвращает основной словарь `data`, содержащий собранные данные о результатах и рейтинге института.
+        Процентное соотношение для каждого уровня рассчитывается при сборке (`_assemble`)
         Возвращает:
         -----------
         Dict : Словарь `data`, включающий следующие ключи:
@@ -365,11 +375,6 @@ class AssemblerGTO:
             - "rating" : Позиция института в рейтинге для каждого уровня.
             - "percent_by_common" : Процентное соотношение достижений по каждому уровню.
         """
-        if self.gto_results["gold"]+self.gto_results["silver"]+self.gto_results["bronze"]!=0:
-            for i in ["gold","silver","bronze"]:
-                self.data["percent_by_common"][i] = self.gto_results[i]/(
-                    self.gto_results["gold"]+self.gto_results["silver"]+self.gto_results["bronze"]
-                )*100
         return self.data
 
 class GTOWriter:
@@ -417,7 +422,8 @@ class GTOWriter:
         """
         Добавляет новую запись о результатах ГТО в базу данных для указанного студента и текущего года.
 
-        Метод создает объект `BaseGTO`, устанавливает текущий год, добавляет объект в сессию и сохраняет изменения.
+        Метод создает объект `BaseGTO`, устанавливает текущий год, добавляет объект в сессию,
+        увеличивает счётчик института в `gto_leaderboard` и сохраняет изменения одной транзакцией.
         В случае ошибки откатывает изменения и вызывает исключение.
 
         Возвращает:
@@ -428,6 +434,12 @@ class GTOWriter:
         -----------
         ValueError : Если данные некорректны или добавление записи невозможно.
         """
+        return run_write(self.stage_write)
+
+    def stage_write(self) -> Dict:
+        """
+        Добавляет запись ГТО и изменение счётчика в текущую транзакцию (без commit).
+        """
         gto = BaseGTO(
             student_id=self.student_id,
             level=self.level,
@@ -435,10 +447,11 @@ class GTOWriter:
         )
         try:
             session.add(gto)  # Добавляем объект в сессию
-            session.commit()  # Сохраняем изменения в базе данных
+            LeaderboardWriter.add_result(self.student_id, gto.year, self.level)
+            session.flush()
         except Exception as e:
-            session.rollback()
             raise ValueError("incorrect data")
+        ResourceVersion.bump(BaseGTO.__tablename__)
         return {"student_id":self.student_id, "level":self.level}
 
     def update(self):
@@ -446,7 +459,8 @@ class GTOWriter:
         Обновляет существующую запись о результате ГТО для текущего года.
 
         Метод проверяет наличие записи о достижениях студента в текущем году.
-        Если запись найдена, обновляет уровень, сохраняет изменения в базе данных. В случае ошибки откатывает изменения.
+        Если запись найдена, обновляет уровень и переносит знак между счётчиками `gto_leaderboard`,
+        сохраняет изменения в базе данных. В случае ошибки откатывает изменения.
 
         Возвращает:
         -----------
@@ -457,18 +471,27 @@ class GTOWriter:
         ValueError : Если данные некорректны или обновление невозможно.
         NoResultFound : Если запись о результате ГТО для текущего года не найдена.
         """
+        return run_write(self.stage_update)
+
+    def stage_update(self) -> Dict:
+        """
+        Изменяет уровень ГТО и счётчики в текущей транзакции (без commit).
+        """
         gto = session.query(BaseGTO).filter(
             (BaseGTO.student_id == self.student_id) &
             (BaseGTO.year == int(datetime.now().year))
         ).one_or_none()
 
         if gto:
-            gto.level = self.level
             try:                # Обновляем уровень
-                session.commit()  # Сохраняем изменения
+                if gto.level != self.level:
+                    LeaderboardWriter.add_result(self.student_id, gto.year, gto.level, -1)
+                    LeaderboardWriter.add_result(self.student_id, gto.year, self.level, 1)
+                gto.level = self.level
+                session.flush()
             except Exception as e:
-                session.rollback()
                 raise ValueError("incorrect data")
+            ResourceVersion.bump(BaseGTO.__tablename__)
             return {"student_id": self.student_id, "level": self.level}
         else:
             raise NoResultFound(f"{self.student_id} not found.")
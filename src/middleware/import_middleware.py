@@ -0,0 +1,283 @@
+import csv
+import io
+import itertools
+from datetime import date, datetime
+from typing import Union, Dict, List, Tuple, Iterator, IO, Any, Type
+
+from sqlalchemy.exc import IntegrityError
+
+from .bulk_middleware import BulkLoader
+from .versions_middleware import ResourceVersion
+from .validator import STUDENT_SCHEMA, STANDARD_RESULT_SCHEMA, THEORY_RESULT_SCHEMA, Schema, SchemaError
+from ..models import Base, Students, Groups, StandardResults, TheoryResults, session
+
+
+class SpreadsheetImporter:
+    """
+    Базовый класс импорта строк таблицы из файла CSV или XLSX.
+
+    Файл читается построчно (CSV — через `csv.DictReader`, XLSX — через openpyxl в режиме
+    `read_only`), поэтому память не зависит от размера файла. Каждая строка проверяется
+    схемой `schema`, корректные строки вставляются пачками по `chunk_size` через
+    `BulkLoader` (COPY в PostgreSQL, executemany в SQLite) с commit на пачку. Если пачка не
+    вставилась (например, повторяющийся email), её строки вставляются по одной, чтобы
+    найти и описать конкретные ошибки.
+
+    Наследники задают `model` и `schema` и при необходимости переопределяют `_prepare`.
+    """
+    model: Type[Base]
+    schema: Schema
+    chunk_size: int = 500
+    max_errors: int = 1000
+    integer_fields = frozenset()
+
+    def __init__(self, *,
+                 file: IO[bytes],
+                 filename: str,
+                 chunk_size: Union[int, None] = None):
+        self.file = file
+        self.filename = filename or ""
+        if chunk_size:
+            self.chunk_size = chunk_size
+        self.columns = list(self.schema.fields)
+        self.total = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Возвращает строки файла в виде словарей {заголовок: значение}.
+        """
+        name = self.filename.lower()
+        if name.endswith(".csv"):
+            return self._csv_rows()
+        if name.endswith(".xlsx"):
+            return self._xlsx_rows()
+        raise ValueError(f"unsupported file format: {self.filename}, expected .csv or .xlsx")
+
+    def _csv_rows(self) -> Iterator[Dict[str, Any]]:
+        text = io.TextIOWrapper(self.file, encoding="utf-8-sig", newline="")
+        header = text.readline()
+        if not header:
+            raise ValueError("file is empty")
+        # Excel в русской локали сохраняет CSV с разделителем ";"
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        yield from csv.DictReader(itertools.chain([header], text), delimiter=delimiter)
+
+    def _xlsx_rows(self) -> Iterator[Dict[str, Any]]:
+        # openpyxl нужен только для импорта, поэтому импортируется здесь
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("file is empty")
+            header = [str(cell).strip() if cell is not None else "" for cell in header]
+            for row in rows:
+                yield dict(zip(header, row))
+        finally:
+            workbook.close()
+
+    def _prepare(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Приводит значения строки к типам, которые ожидает схема:
+        пустые ячейки пропускаются, числа и даты из текста преобразуются.
+
+        Возвращает:
+        -----------
+        tuple : (запись, ошибки подготовки строки).
+        """
+        record: Dict[str, Any] = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            key = key.strip()
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "" or key == "":
+                continue
+            if key in self.integer_fields:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    pass
+            elif isinstance(value, (datetime, date)):
+                value = value.strftime("%Y-%m-%d")
+            elif not isinstance(value, str):
+                value = str(value)
+            record[key] = value
+        return record, {}
+
+    def _error(self, row: int, errors: Dict[str, str]):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "errors": errors})
+
+    def _flush(self, chunk: List[Tuple[int, Dict[str, Any]]]):
+        """
+        Вставляет пачку строк одной командой `BulkLoader`. При ошибке целостности вставляет строки по одной.
+        """
+        if not chunk:
+            return
+        try:
+            BulkLoader.load(self.model, self.columns, [record for _, record in chunk])
+            ResourceVersion.bump(self.model.__tablename__)
+            session.commit()
+            self.inserted += len(chunk)
+            return
+        except IntegrityError:
+            session.rollback()
+        for row, record in chunk:
+            try:
+                BulkLoader.load(self.model, self.columns, [record])
+                ResourceVersion.bump(self.model.__tablename__)
+                session.commit()
+                self.inserted += 1
+            except IntegrityError as e:
+                session.rollback()
+                self._error(row, {"row": f"row already exists or violates constraints: {getattr(e, 'orig', e)}"})
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Выполняет импорт и возвращает отчёт.
+
+        Возвращает:
+        -----------
+        dict : {"total", "inserted", "failed", "errors": [{"row": номер строки файла, "errors": {поле: ошибка}}]}.
+        Список ошибок ограничен `max_errors` записями, `failed` считает все строки с ошибками.
+        """
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        # номер строки файла: 1 — заголовок
+        for row, values in enumerate(self._rows(), start=2):
+            self.total += 1
+            record, errors = self._prepare(values)
+            try:
+                record = self.schema.validate(record, partial=False)
+            except SchemaError as e:
+                for key in errors:
+                    e.errors.pop(f"{key}_id", None)
+                errors = {**e.errors, **errors}
+            if errors:
+                self._error(row, errors)
+                continue
+            chunk.append((row, record))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+        self._flush(chunk)
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors
+        }
+
+    @property
+    def get(self) -> Dict[str, Any]:
+        return self.run()
+
+
+class StudentsImporter(SpreadsheetImporter):
+    """
+    Класс `StudentsImporter` загружает студентов из файла CSV или XLSX
+    (см. `SpreadsheetImporter`). Строки проверяются схемой `STUDENT_SCHEMA` —
+    теми же правилами, что у `StudentWriter`.
+
+    Первая строка файла — заголовок с именами полей студента (`first_name`, `last_name`, ...).
+    Вместо `group_id` можно передать столбец `group` с названием группы: названия
+    переводятся в id по словарю, построенному одним запросом.
+
+    Параметры:
+    ----------
+    file : IO[bytes]
+        Двоичный поток с содержимым файла.
+    filename : str
+        Имя файла; по расширению (.csv или .xlsx) выбирается формат.
+    institute_id : int, optional
+        Институт, группы которого используются при поиске по названию.
+    chunk_size : int
+        Количество строк в одном INSERT.
+
+    Исключения:
+    -----------
+    ValueError
+        Если формат файла не поддерживается или в файле нет заголовка.
+
+    Примеры:
+    --------
+    >>> with open("students.csv", "rb") as f:
+    ...     StudentsImporter(file=f, filename="students.csv", institute_id=1).get
+    {'total': 2, 'inserted': 1, 'failed': 1, 'errors': [{'row': 3, 'errors': {'email': 'Invalid email: x'}}]}
+    """
+    model = Students
+    schema = STUDENT_SCHEMA
+    integer_fields = frozenset(["height", "weight", "admission_year", "group_id", "course"])
+
+    def __init__(self, *,
+                 file: IO[bytes],
+                 filename: str,
+                 institute_id: Union[int, None] = None,
+                 chunk_size: Union[int, None] = None):
+        super().__init__(file=file, filename=filename, chunk_size=chunk_size)
+        self.institute_id = institute_id
+        self.groups = self._group_map()
+
+    def _group_map(self) -> Dict[str, Union[int, None]]:
+        """
+        Возвращает словарь {название группы: id} одним запросом.
+        Названия, которые встречаются в нескольких группах, отображаются в None.
+        """
+        query = session.query(Groups.name, Groups.id)
+        if self.institute_id is not None:
+            query = query.filter(Groups.institute_id == self.institute_id)
+        groups: Dict[str, Union[int, None]] = {}
+        for name, group_id in query:
+            key = str(name).strip().lower()
+            groups[key] = None if key in groups else group_id
+        return groups
+
+    def _prepare(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Дополнительно к базовой подготовке заменяет название группы (`group`) её id.
+        """
+        record, errors = super()._prepare(row)
+        group = record.pop("group", None)
+        if group is not None and "group_id" not in record:
+            group_id = self.groups.get(group.lower(), 0)
+            if group_id:
+                record["group_id"] = group_id
+            elif group_id is None:
+                errors["group"] = f"ambiguous group name: {group}, pass institute_id"
+            else:
+                errors["group"] = f"unknown group: {group}"
+        return record, errors
+
+
+class StandardResultsImporter(SpreadsheetImporter):
+    """
+    Класс `StandardResultsImporter` загружает результаты нормативов из файла CSV или XLSX
+    со столбцами `student_id`, `standard_id`, `semester`, `result` (см. `SpreadsheetImporter`).
+    Повторный результат студента за тот же норматив и семестр попадает в отчёт об ошибках.
+
+    Примеры:
+    --------
+    >>> with open("results.csv", "rb") as f:
+    ...     StandardResultsImporter(file=f, filename="results.csv").get
+    {'total': 30, 'inserted': 30, 'failed': 0, 'errors': []}
+    """
+    model = StandardResults
+    schema = STANDARD_RESULT_SCHEMA
+    integer_fields = frozenset(["student_id", "standard_id", "semester", "result"])
+
+
+class TheoryResultsImporter(SpreadsheetImporter):
+    """
+    Класс `TheoryResultsImporter` загружает результаты по теории из файла CSV или XLSX
+    со столбцами `student_id`, `theory_id`, `semester`, `result` (см. `StandardResultsImporter`).
+    """
+    model = TheoryResults
+    schema = THEORY_RESULT_SCHEMA
+    integer_fields = frozenset(["student_id", "theory_id", "semester", "result"])
@@ -3,6 +3,7 @@ from typing import *
 
 from peewee import DoesNotExist
 
+from src.middleware.reference_middleware import reference
 from src.models import Institutes, NoResultFound, session
 
 
@@ -10,6 +11,8 @@ class InstitutesReader:
     """
     Класс `InstitutesReader` предназначен для чтения данных из таблицы институтов по идентификатору.
     Он позволяет получать информацию об институте, используя его ID.
+    Институт берётся из снимка справочников (`reference`); к базе данных выполняется запрос,
+    только если в снимке его нет.
 
     Параметры:
     ----------
@@ -38,8 +41,8 @@ class InstitutesReader:
     def __init__(self,
                  _id: int):
         """
-        Инициализирует экземпляр класса `InstitutesReader` и выполняет запрос к базе данных
-        для получения информации о институте по его ID.
+        Инициализирует экземпляр класса `InstitutesReader` и находит институт по его ID
+        в снимке справочников или, если его там нет, в базе данных.
 
         Параметры:
         ----------
@@ -51,10 +54,12 @@ class InstitutesReader:
         NoResultFound
             Вызывается, если нет записей, соответствующих заданному идентификатору.
         """
-        try:
-            self.institute = session.query(Institutes).filter(Institutes.id == _id).one_or_none()
-        except NoResultFound:
-            self.institute = None
+        self.institute = reference.current.institutes.get(_id)
+        if self.institute is None:
+            try:
+                self.institute = session.query(Institutes).filter(Institutes.id == _id).one_or_none()
+            except NoResultFound:
+                self.institute = None
 
 
     @property
@@ -70,14 +75,22 @@ class InstitutesReader:
         """
         if not self.institute:
             return None
-        return {"name":self.institute.name,
-                "id":self.institute.id,
+        return self.to_dict(self.institute)
+
+    @staticmethod
+    def to_dict(institute: Institutes) -> dict:
+        """
+        Преобразует объект `Institutes` в словарь ответа API.
+        """
+        return {"name":institute.name,
+                "id":institute.id,
                 }
-    
+
+
 class InstitutesList:
     """
-    Класс `InstitutesList` предназначен для получения списка институтов по заданному диапазону их идентификаторов.
-    Он позволяет извлекать информацию об институтах, пропуская определённое количество записей и ограничивая общее число выводимых записей.
+    Класс `InstitutesList` предназначен для получения страницы институтов, упорядоченных по ID.
+    Выборка, фильтрация по началу названия и пагинация выполняются одним запросом к базе данных.
 
     Параметры:
     ----------
@@ -87,25 +100,35 @@ class InstitutesList:
     limit : int
         Максимальное количество записей, которые будут возвращены в результате.
 
+    name : str, optional
+        Начало названия института; если указано, возвращаются только институты,
+        название которых начинается с этой строки.
+
+    Атрибуты:
+    ----------
+    count : int
+        Общее количество институтов, подходящих под фильтр.
+
     Методы:
     -------
     _make_list()
-        Заполняет список институтов, основываясь на диапазоне ID.
+        Заполняет список институтов одним запросом с LIMIT/OFFSET.
 
     get
-        Возвращает список институтов, соответствующих заданному диапазону.
+        Возвращает список институтов выбранной страницы.
 
     Примеры:
     --------
-    >>> institutes_list = InstitutesList(skip=0, limit=10)
+    >>> institutes_list = InstitutesList(skip=0, limit=10, name="Институт")
     >>> institute_data = institutes_list.get
     >>> print(institute_data)  # [{'name': 'Институт технологий', 'id': 1}, ...]
     """
     def __init__(self,
-                 skip:int,
-                 limit:int):
+                 skip:int = 0,
+                 limit:int = 100,
+                 name:Union[str, None] = None):
         """
-        Инициализирует экземпляр класса `InstitutesList` с заданными параметрами `skip` и `limit`.
+        Инициализирует экземпляр класса `InstitutesList` с заданными параметрами `skip`, `limit` и `name`.
 
         Параметры:
         ----------
@@ -114,25 +137,31 @@ class InstitutesList:
 
         limit : int
             Максимальное количество институтов, которые будут возвращены.
+
+        name : str, optional
+            Начало названия института для фильтрации.
         """
         self.skip = skip
         self.limit = limit
+        self.name = name
         self.institutes_list: List[Dict] = []
+        self.query = session.query(Institutes)
+        if self.name:
+            # autoescape экранирует % и _, чтобы фильтр был именно по префиксу
+            self.query = self.query.filter(Institutes.name.startswith(self.name, autoescape=True))
+        self.count = self.query.count()
 
     def _make_list(self):
         """
-        Заполняет `institutes_list` данными институтов на основе диапазона их ID.
-        Если института с данным ID не существует, он не добавляется в список.
+        Заполняет `institutes_list` страницей институтов, выбранной одним упорядоченным запросом.
         """
-        for i in range(self.skip+1, self.limit+self.limit+2):
-            institute = InstitutesReader(_id=i).get
-            if institute:
-                self.institutes_list.append(institute)
+        institutes = self.query.order_by(Institutes.id).offset(self.skip).limit(self.limit).all()
+        self.institutes_list = [InstitutesReader.to_dict(institute) for institute in institutes]
 
     @property
     def get(self)->List[Dict]:
         """
-        Возвращает список институтов, соответствующих заданному диапазону.
+        Возвращает список институтов выбранной страницы.
         Вызывает метод `_make_list()` для заполнения списка.
 
         Возвращает:
@@ -141,4 +170,4 @@ class InstitutesList:
             Список институтов, каждый из которых представлен в виде словаря с данными.
         """
         self._make_list()
-        return self.institutes_list
\ No newline at end of file
+        return self.institutes_list
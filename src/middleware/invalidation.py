@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set, Union
+
+from sqlalchemy import select
+
+from ..models import ResourceVersions, engine
+from ..settings import DBSettings
+
+
+class InvalidationBus:
+    """
+    Класс `InvalidationBus` держит в памяти процесса версии всех ресурсов из `resource_versions`
+    и сообщает подписчикам, какие ресурсы изменились.
+
+    Фоновый поток раз в `interval` секунд читает таблицу одним запросом к основной БД
+    (реплики могут отставать). В PostgreSQL (`listen=True`) поток дополнительно слушает
+    канал `channel`: `ResourceVersion.write` вызывает pg_notify в транзакции, увеличивающей версии,
+    уведомление приходит после её commit, и версии перечитываются сразу, а опрос остаётся
+    страховкой. После commit в своём процессе версии перечитываются синхронно
+    (см. `note_commit`), поэтому воркер сразу видит свои записи.
+
+    Кэши (`result_cache`, `reference`) сверяют ключи с `versions` без запросов к БД;
+    запись в любом воркере становится видна остальным не позже чем через `interval` секунд.
+
+    Параметры:
+    ----------
+    interval : float
+        Период опроса в секундах.
+    listen : bool
+        Слушать ли LISTEN/NOTIFY (только PostgreSQL).
+
+    Примеры:
+    --------
+    >>> bus.start()
+    >>> bus.subscribe(lambda changed: print(changed))
+    >>> bus.versions(["gto", "students"])
+    {'gto': 12, 'students': 40}
+    """
+    channel: str = "resource_versions"
+
+    def __init__(self, *, interval: float, listen: bool):
+        self.interval = interval
+        self.listen = listen
+        self.generations: Dict[str, int] = {}
+        self.polled_at = 0.0
+        self._subscribers: List[Callable[[Set[str]], None]] = []
+        self._thread: Union[threading.Thread, None] = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """
+        Читает версии и запускает фоновый поток (один раз на процесс).
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.poll()
+            target = self._listen if self.listen and engine.dialect.name == "postgresql" else self._poll_forever
+            self._thread = threading.Thread(target=target, name="invalidation-bus", daemon=True)
+            self._thread.start()
+
+    def subscribe(self, callback: Callable[[Set[str]], None]):
+        """
+        Добавляет функцию, которая вызывается с множеством изменившихся ресурсов.
+        """
+        self._subscribers.append(callback)
+
+    def versions(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Возвращает последние прочитанные версии ресурсов (0 — ресурс ещё не менялся).
+        """
+        generations = self.generations
+        return {name: generations.get(name, 0) for name in names}
+
+    def poll(self) -> Set[str]:
+        """
+        Перечитывает `resource_versions` и уведомляет подписчиков об изменившихся ресурсах.
+
+        `poll` вызывается и фоновым потоком, и потоками запросов (`note_commit`), поэтому
+        более медленный опрос может закончиться позже более нового. Версии только растут:
+        для каждого ресурса сохраняется максимум из прочитанной и уже известной.
+        """
+        with engine.connect() as connection:
+            rows = connection.execute(select(ResourceVersions.name, ResourceVersions.version)).all()
+        with self._poll_lock:
+            previous = self.generations
+            started = self.polled_at > 0
+            generations = dict(previous)
+            changed = set()
+            for name, version in rows:
+                if version > previous.get(name, 0):
+                    generations[name] = version
+                    changed.add(name)
+            self.generations = generations
+            self.polled_at = time.monotonic()
+        if changed and started:
+            for callback in self._subscribers:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    logging.error(f"invalidation subscriber failed: {e}")
+        return changed
+
+    def note_commit(self):
+        """
+        Вызывается после commit транзакции, которая увеличила версии, в этом процессе.
+        """
+        if self.running:
+            self.poll()
+
+    def _poll_forever(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"invalidation bus poll failed: {e}")
+
+    def _listen(self):
+        # psycopg нужен только для PostgreSQL, поэтому импортируется здесь
+        import psycopg
+
+        url = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                with psycopg.connect(url, autocommit=True) as connection:
+                    connection.execute(f"LISTEN {self.channel}")
+                    self.poll()
+                    while True:
+                        for _ in connection.notifies(timeout=self.interval):
+                            self.poll()
+                        self.poll()
+            except Exception as e:
+                logging.error(f"invalidation bus listener failed, reconnecting: {e}")
+                time.sleep(self.interval)
+
+
+bus = InvalidationBus(
+    interval=DBSettings.INVALIDATION_POLL_INTERVAL,
+    listen=DBSettings.INVALIDATION_LISTEN
+)
@@ -0,0 +1,220 @@
+from datetime import datetime
+from typing import Union, Dict, List, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+from .upsert import upsert
+from .versions_middleware import ResourceVersion
+from ..models import (
+    GTOLeaderboard, BaseGTO, Students, Groups, session
+)
+
+
+LEVELS: Tuple[str, ...] = ("gold", "silver", "bronze")
+
+
+class LeaderboardWriter:
+    """
+    Класс `LeaderboardWriter` поддерживает таблицу `gto_leaderboard` —
+    счётчики знаков ГТО каждого уровня по институтам и годам.
+
+    Методы не делают commit: они вызываются писателями (`GTOWriter`, `StudentWriter`)
+    внутри их транзакции, поэтому счётчики меняются атомарно вместе с основной записью.
+
+    Методы:
+    -------
+    shift(institute_id, year, level, delta)
+        Изменяет счётчик на `delta`.
+    add_result(student_id, year, level, delta=1)
+        Изменяет счётчик института, в котором учится студент.
+    remove_student(student_id)
+        Вычитает все результаты студента из счётчиков его института (удаление студента).
+    move_student(student_id, group_id)
+        Переносит результаты студента в счётчики института новой группы (перевод студента).
+    rebuild()
+        Полностью пересчитывает таблицу по данным `gto`.
+
+    Примеры:
+    --------
+    >>> LeaderboardWriter.add_result(student_id=1, year=2024, level="gold")
+    >>> session.commit()
+    """
+
+    @staticmethod
+    def institute_of_student(student_id: int) -> Union[int, None]:
+        """
+        Возвращает идентификатор института, в котором учится студент.
+        """
+        return session.query(Groups.institute_id).join(
+            Students, Students.group_id == Groups.id
+        ).filter(Students.id == student_id).scalar()
+
+    @staticmethod
+    def institute_of_group(group_id: int) -> Union[int, None]:
+        """
+        Возвращает идентификатор института группы.
+        """
+        return session.query(Groups.institute_id).filter(Groups.id == group_id).scalar()
+
+    @staticmethod
+    def student_results(student_id: int) -> List[Tuple[int, str]]:
+        """
+        Возвращает все записи ГТО студента в виде пар (year, level).
+        """
+        return session.query(BaseGTO.year, BaseGTO.level).filter(
+            BaseGTO.student_id == student_id
+        ).all()
+
+    @classmethod
+    def shift(cls, institute_id: Union[int, None], year: int, level: str, delta: int):
+        """
+        Изменяет счётчик (institute_id, year, level) на `delta` одним
+        INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count:
+        одновременные первые результаты одного института не конфликтуют по первичному ключу.
+
+        Отрицательный `delta` для отсутствующей строки сохраняется как есть (счётчик
+        становится отрицательным), чтобы расхождение было видно и исправлялось `rebuild`.
+
+        Студенты без группы или института в рейтинге не участвуют,
+        поэтому при `institute_id=None` ничего не делается.
+        """
+        if institute_id is None or delta == 0:
+            return
+        upsert(
+            GTOLeaderboard,
+            [{"institute_id": institute_id, "year": year, "level": level, "count": delta}],
+            index_elements=("institute_id", "year", "level"),
+            update_columns=(),
+            increment_columns=("count",)
+        )
+
+    @classmethod
+    def add_result(cls, student_id: int, year: int, level: str, delta: int = 1):
+        """
+        Изменяет на `delta` счётчик института, в котором учится студент `student_id`.
+        """
+        cls.shift(cls.institute_of_student(student_id), year, level, delta)
+
+    @classmethod
+    def remove_student(cls, student_id: int):
+        """
+        Вычитает все результаты ГТО студента из счётчиков его института.
+        Вызывается перед удалением студента.
+        """
+        institute_id = cls.institute_of_student(student_id)
+        for year, level in cls.student_results(student_id):
+            cls.shift(institute_id, year, level, -1)
+
+    @classmethod
+    def move_student(cls, student_id: int, group_id: int):
+        """
+        Переносит результаты ГТО студента в счётчики института группы `group_id`.
+        Вызывается перед сменой группы студента; если институт не меняется, ничего не делает.
+        """
+        old_institute_id = cls.institute_of_student(student_id)
+        new_institute_id = cls.institute_of_group(group_id)
+        if old_institute_id == new_institute_id:
+            return
+        for year, level in cls.student_results(student_id):
+            cls.shift(old_institute_id, year, level, -1)
+            cls.shift(new_institute_id, year, level, 1)
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Полностью пересчитывает `gto_leaderboard` одним агрегирующим запросом
+        по `gto -> students -> groups` и сохраняет результат.
+
+        Возвращает:
+        -----------
+        int : количество записанных строк.
+        """
+        rows = session.query(
+            Groups.institute_id, BaseGTO.year, BaseGTO.level, func.count(BaseGTO.student_id)
+        ).join(
+            Students, Students.id == BaseGTO.student_id
+        ).join(
+            Groups, Groups.id == Students.group_id
+        ).filter(
+            Groups.institute_id.isnot(None)
+        ).group_by(
+            Groups.institute_id, BaseGTO.year, BaseGTO.level
+        ).all()
+        try:
+            session.query(GTOLeaderboard).delete()
+            session.add_all([
+                GTOLeaderboard(institute_id=institute_id, year=year, level=level, count=count)
+                for institute_id, year, level, count in rows
+            ])
+            ResourceVersion.bump(GTOLeaderboard.__tablename__)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return len(rows)
+
+
+class LeaderboardReader:
+    """
+    Класс `LeaderboardReader` читает счётчики и место института в рейтинге ГТО
+    из таблицы `gto_leaderboard` одним запросом.
+
+    Место считается по правилам спортивного рейтинга: институты с одинаковым количеством
+    знаков делят одно место, следующее место пропускается (1, 2, 2, 4).
+
+    Параметры:
+    ----------
+    institute_id : int
+        Идентификатор института.
+    year : int, optional
+        Год рейтинга (по умолчанию — текущий).
+
+    Примеры:
+    --------
+    >>> LeaderboardReader(institute_id=1).get
+    {'count': {'gold': 3, 'silver': 1, 'bronze': 0}, 'rating': {'gold': 1, 'silver': 2, 'bronze': 1}}
+    """
+    def __init__(self, *,
+                 institute_id: int,
+                 year: Union[int, None] = None):
+        self.institute_id = institute_id
+        self.year = year if year else datetime.now().year
+
+    @property
+    def get(self) -> Dict[str, Dict[str, int]]:
+        """
+        Возвращает количество знаков института по уровням и его место по каждому уровню.
+
+        Для каждого уровня запрос берёт счётчик института (0, если строки нет) и считает
+        по индексу (year, level, count) институты, у которых счётчик строго больше.
+        """
+        levels = union_all(*[
+            select(literal(level).label("level")) for level in LEVELS
+        ]).subquery("levels")
+        mine = aliased(GTOLeaderboard)
+        other = aliased(GTOLeaderboard)
+        my_count = func.coalesce(mine.count, 0)
+        rows = session.query(
+            levels.c.level, my_count, func.count(other.institute_id)
+        ).select_from(
+            levels
+        ).outerjoin(
+            mine,
+            (mine.level == levels.c.level) &
+            (mine.institute_id == self.institute_id) &
+            (mine.year == self.year)
+        ).outerjoin(
+            other,
+            (other.level == levels.c.level) &
+            (other.year == self.year) &
+            (other.count > my_count)
+        ).group_by(
+            levels.c.level, mine.count
+        ).all()
+
+        res: Dict[str, Dict[str, int]] = {"count": {}, "rating": {}}
+        for level, count, better in rows:
+            res["count"][level] = count
+            res["rating"][level] = better + 1
+        return res
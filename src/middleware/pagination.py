@@ -0,0 +1,85 @@
+import base64
+import json
+from typing import Mapping, Tuple, Union
+
+
+# Наибольший размер страницы: больший `limit` уменьшается до него
+MAX_LIMIT: int = 500
+
+
+class Cursor:
+    """
+    Класс `Cursor` кодирует и раскодирует непрозрачный курсор для постраничной
+    выборки по ключу (keyset pagination).
+
+    Курсор хранит id последней выданной записи; следующая страница выбирается условием
+    `id > last_id` по первичному ключу, поэтому её стоимость не зависит от номера страницы,
+    а удалённые записи не сдвигают окно.
+
+    Примеры:
+    --------
+    >>> cursor = Cursor.encode(42)
+    >>> Cursor.decode(cursor)
+    42
+    """
+
+    @staticmethod
+    def encode(last_id: int) -> str:
+        """
+        Возвращает курсор для записи с id `last_id`.
+        """
+        raw = json.dumps({"id": int(last_id)}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode(cursor: Union[str, None]) -> Union[int, None]:
+        """
+        Возвращает id, сохранённый в курсоре, или None, если курсор не передан.
+
+        Исключения:
+        -----------
+        ValueError
+            Если курсор повреждён.
+        """
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            last_id = int(json.loads(raw)["id"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"invalid cursor: {cursor}")
+        if last_id < 0:
+            raise ValueError(f"invalid cursor: {cursor}")
+        return last_id
+
+
+def page_args(args: Mapping[str, str], default_limit: int = 100) -> Tuple[int, int]:
+    """
+    Читает `skip` и `limit` из параметров запроса.
+
+    `limit` приводится к диапазону 1..MAX_LIMIT, чтобы один запрос не выгружал всю таблицу
+    (в SQLite отрицательный LIMIT означает «без ограничения»).
+
+    Возвращает:
+    -----------
+    tuple : (skip, limit).
+
+    Исключения:
+    -----------
+    ValueError
+        Если `skip` или `limit` не целые числа или `skip` отрицательный
+        (в PostgreSQL отрицательный OFFSET — ошибка запроса).
+
+    Примеры:
+    --------
+    >>> page_args({"skip": "20", "limit": "10000"})
+    (20, 500)
+    """
+    try:
+        skip = int(args.get("skip", 0))
+        limit = int(args.get("limit", default_limit))
+    except (ValueError, TypeError):
+        raise ValueError("skip and limit must be integers")
+    if skip < 0:
+        raise ValueError("skip must not be negative")
+    return skip, min(max(limit, 1), MAX_LIMIT)
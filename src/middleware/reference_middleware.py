@@ -0,0 +1,148 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple, Union
+
+from .versions_middleware import ResourceVersion
+from .invalidation import bus
+from ..models import Institutes, Groups, Standard, Theory, session
+from ..settings import ServerSettings
+
+
+class InstituteRecord(NamedTuple):
+    id: int
+    name: str
+
+
+class GroupRecord(NamedTuple):
+    id: int
+    name: str
+    course: int
+    institute_id: int
+    institute: Union[InstituteRecord, None]
+
+
+class ReferenceSnapshot(NamedTuple):
+    """
+    Неизменяемый снимок справочников: институты, группы, нормативы и разделы теории.
+
+    Записи институтов и групп имеют те же атрибуты, что и модели (`GroupsReader.to_dict`
+    и `InstitutesReader.to_dict` принимают их без изменений), нормативы и теория хранятся
+    словарями по столбцам таблицы (только для чтения). Все словари упорядочены по id.
+
+    Атрибуты:
+    ----------
+    versions : tuple
+        Версии таблиц `ReferenceData.tables` из `resource_versions`, с которыми загружен снимок.
+    """
+    versions: Tuple[int, ...]
+    institutes: Mapping[int, InstituteRecord]
+    groups: Mapping[int, GroupRecord]
+    standard: Mapping[int, Mapping]
+    theory: Mapping[int, Mapping]
+
+    @classmethod
+    def load(cls, versions: Tuple[int, ...]) -> "ReferenceSnapshot":
+        """
+        Загружает снимок четырьмя запросами (по одному на таблицу).
+        """
+        institutes = {
+            institute.id: InstituteRecord(id=institute.id, name=institute.name)
+            for institute in session.query(Institutes).order_by(Institutes.id)
+        }
+        groups = {
+            group.id: GroupRecord(
+                id=group.id,
+                name=group.name,
+                course=group.course,
+                institute_id=group.institute_id,
+                institute=institutes.get(group.institute_id)
+            )
+            for group in session.query(Groups).order_by(Groups.id)
+        }
+
+        def rows(model) -> Mapping[int, Mapping]:
+            columns = [column.key for column in model.__table__.columns]
+            return MappingProxyType({
+                row.id: MappingProxyType({column: getattr(row, column) for column in columns})
+                for row in session.query(model).order_by(model.id)
+            })
+
+        return cls(
+            versions=versions,
+            institutes=MappingProxyType(institutes),
+            groups=MappingProxyType(groups),
+            standard=rows(Standard),
+            theory=rows(Theory)
+        )
+
+
+class ReferenceData:
+    """
+    Класс `ReferenceData` хранит текущий `ReferenceSnapshot` процесса.
+
+    Снимок загружается при старте воркера (`refresh`) и затем отдаётся читателям без запросов к БД.
+    Не чаще раза в `interval` секунд версии справочников сверяются с `resource_versions`
+    (один запрос), а если запущен `bus`, сверка выполняется сразу, как только он заметит
+    изменение справочника; если версии изменились, загружается новый снимок и заменяет старый одним
+    присваиванием, поэтому читатели всегда видят целый снимок. Пока один поток загружает
+    снимок, остальные продолжают читать предыдущий.
+
+    Параметры:
+    ----------
+    interval : float
+        Как часто (в секундах) сверять версии; 0 — при каждом обращении.
+
+    Примеры:
+    --------
+    >>> reference.current.groups[3].name
+    'ИВТ-21'
+    """
+    tables: Tuple[str, ...] = ("institutes", "groups", "standard", "theory")
+
+    def __init__(self, *, interval: float):
+        self.interval = interval
+        self.snapshot: Union[ReferenceSnapshot, None] = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> ReferenceSnapshot:
+        """
+        Возвращает текущий снимок, при необходимости сверив версии.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None and time.monotonic() - self.checked_at < self.interval:
+            return snapshot
+        return self.refresh()
+
+    def refresh(self) -> ReferenceSnapshot:
+        """
+        Сверяет версии справочников и при их изменении загружает новый снимок.
+        """
+        snapshot = self.snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self.snapshot
+            if snapshot is not None and time.monotonic() - self.checked_at < self.interval:
+                return snapshot
+            versions = ResourceVersion.read(self.tables)
+            versions = tuple(versions[table][0] for table in self.tables)
+            if snapshot is None or snapshot.versions != versions:
+                snapshot = self.snapshot = ReferenceSnapshot.load(versions)
+            self.checked_at = time.monotonic()
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def expire(self):
+        """
+        Заставляет следующее обращение сверить версии (после записи справочника в этом процессе
+        или когда `bus` заметил изменение справочника).
+        """
+        self.checked_at = 0.0
+
+
+reference = ReferenceData(interval=ServerSettings.REFERENCE_CHECK_INTERVAL)
+bus.subscribe(lambda changed: reference.expire() if changed.intersection(reference.tables) else None)
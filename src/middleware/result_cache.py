@@ -0,0 +1,213 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable, Union
+
+from .cache import TTLCache
+from .singleflight import flights
+from .versions_middleware import ResourceVersion
+from .invalidation import bus
+from ..models import session
+from ..settings import ServerSettings
+
+
+class FileCache:
+    """
+    Класс `FileCache` — кэш в отдельном файле SQLite, общий для всех воркеров gunicorn на одной машине.
+
+    Интерфейс совпадает с `TTLCache` (get, set, pop, clear). Значения сериализуются pickle,
+    поэтому файл должен быть доступен только приложению. Истёкшие записи и записи сверх
+    `maxsize` (с самым ранним сроком жизни) удаляются раз в `purge_every` вызовов `set`.
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу кэша.
+    maxsize : int
+        Максимальное количество записей.
+    ttl : float
+        Время жизни записи в секундах по умолчанию.
+
+    Примеры:
+    --------
+    >>> cache = FileCache(path="/tmp/herzen-cache.db", maxsize=10000, ttl=300)
+    >>> cache.set("gto:1", {"rating": {"gold": 1}})
+    >>> cache.get("gto:1")
+    {'rating': {'gold': 1}}
+    """
+    purge_every: int = 100
+
+    def __init__(self, *, path: str, maxsize: int, ttl: float):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_expires_at ON cache (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3.Connection нельзя использовать из разных потоков: у каждого потока своё соединение
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу или `default`, если записи нет или её срок истёк.
+        """
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (str(key), time.time())
+        ).fetchone()
+        if row is None:
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key: Hashable, value: Any, ttl: Union[float, None] = None):
+        """
+        Сохраняет значение на `ttl` секунд (по умолчанию — `self.ttl`).
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (str(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+            )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge()
+
+    def purge(self):
+        """
+        Удаляет истёкшие записи и самые старые записи сверх `maxsize`.
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,)
+            )
+
+    def pop(self, key: Hashable):
+        """
+        Удаляет запись по ключу, если она есть.
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (str(key),))
+
+    def clear(self):
+        """
+        Очищает кэш.
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+
+
+class ResultCache:
+    """
+    Класс `ResultCache` кэширует результаты отчётных читателей (`AssemblerGTO`, `RatingByInstitute`, ...).
+
+    Ключ записи включает версии таблиц `depends` из `resource_versions`. Писатели
+    (`GTOWriter`, `StudentWriter`, `LeaderboardWriter.rebuild`, команда bump-versions для групп)
+    увеличивают версии в своей транзакции, поэтому после commit ключ меняется во всех воркерах
+    сразу, а старые записи просто вытесняются. TTL — только страховка от бесконечного хранения.
+    Если запущен `bus` (`InvalidationBus`), версии берутся из его памяти без запросов к БД
+    (отставание — не больше его интервала опроса), иначе читаются одним запросом по первичному ключу.
+
+    При промахе значение вычисляется через `flights` (`SingleFlight`): одновременные промахи
+    по одному ключу в процессе ждут одного вычисления, а не нагружают БД все сразу.
+    Вычисление всегда читает с основной БД: версии в ключе не новее, чем на ней, а реплика
+    может отставать и от версий `bus`, и тогда устаревшее значение легло бы под новый ключ.
+
+    Хранилище (`backend`) — `TTLCache` в памяти процесса или `FileCache`, общий для воркеров;
+    None отключает кэш. Значения из памяти процесса возвращаются без копирования
+    и не должны изменяться вызывающим кодом.
+
+    Примеры:
+    --------
+    >>> result_cache.get_or_set("gto_assembler", 1, lambda: {"rating": {...}},
+    ...                         depends=("gto", "students"))
+    {'rating': {...}}
+    """
+    missing = object()
+
+    def __init__(self, backend: Union[TTLCache, FileCache, None]):
+        self.backend = backend
+
+    def get_or_set(self,
+                   name: str,
+                   key: Hashable,
+                   compute: Callable[[], Any],
+                   depends: Iterable[str]) -> Any:
+        """
+        Возвращает значение из кэша или вычисляет его функцией `compute` и сохраняет.
+
+        Параметры:
+        ----------
+        name : str
+            Имя отчёта (пространство ключей).
+        key : Hashable
+            Параметры отчёта, например id института.
+        compute : callable
+            Функция без аргументов, вычисляющая значение.
+        depends : iterable
+            Таблицы, от которых зависит значение.
+        """
+        if self.backend is None:
+            return compute()
+        if bus.running:
+            versions = bus.versions(depends)
+        else:
+            versions = {table: version for table, (version, _) in ResourceVersion.read(depends).items()}
+        stamp = ",".join(f"{table}:{version}" for table, version in sorted(versions.items()))
+        cache_key = f"{name}|{key!r}|{stamp}"
+        value = self.backend.get(cache_key, self.missing)
+        if value is self.missing:
+            value = flights.do(cache_key, lambda: self._fill(cache_key, compute))
+        return value
+
+    def _fill(self, cache_key: str, compute: Callable[[], Any]) -> Any:
+        # запись могла появиться между проверкой в get_or_set и входом в flights
+        value = self.backend.get(cache_key, self.missing)
+        if value is self.missing:
+            use_replicas = session.info.pop("use_replicas", False)
+            try:
+                value = compute()
+            finally:
+                session.info["use_replicas"] = use_replicas
+            self.backend.set(cache_key, value)
+        return value
+
+
+def make_backend() -> Union[TTLCache, FileCache, None]:
+    """
+    Создаёт хранилище по RESULT_CACHE_BACKEND: memory, file или none.
+    """
+    kind = ServerSettings.RESULT_CACHE_BACKEND
+    if kind == "memory":
+        return TTLCache(maxsize=ServerSettings.RESULT_CACHE_SIZE, ttl=ServerSettings.RESULT_CACHE_TTL)
+    if kind == "file":
+        return FileCache(
+            path=ServerSettings.RESULT_CACHE_PATH,
+            maxsize=ServerSettings.RESULT_CACHE_SIZE,
+            ttl=ServerSettings.RESULT_CACHE_TTL
+        )
+    if kind == "none":
+        return None
+    raise ValueError(f"unknown RESULT_CACHE_BACKEND: {kind}, expected memory, file or none")
+
+
+result_cache = ResultCache(make_backend())
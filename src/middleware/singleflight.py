@@ -0,0 +1,93 @@
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable
+
+from flask import request, make_response, Response
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Класс `SingleFlight` объединяет одновременные одинаковые вычисления в процессе:
+    пока функция с ключом `key` выполняется в одном потоке, остальные потоки с тем же ключом
+    ждут и получают её результат (или её исключение), а не запускают вычисление ещё раз.
+    Результат не запоминается: после завершения следующий вызов выполняет функцию заново.
+
+    Если ожидание длится дольше `timeout` секунд, поток выполняет функцию сам.
+
+    Примеры:
+    --------
+    >>> flights = SingleFlight()
+    >>> flights.do(("gto_assembler", 1), lambda: AssemblerGTO(institute_id=1).get)
+    {'count_by_institute': {...}, ...}
+    """
+    timeout: float = 30
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Выполняет `fn` или дожидается результата такого же выполнения в другом потоке.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(self.timeout):
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+flights = SingleFlight()
+
+
+def single_flight(fn: Callable) -> Callable:
+    """
+    Декоратор дорогого GET-эндпоинта, ответ которого зависит только от URL.
+
+    Одновременные запросы с одинаковым путём и параметрами (порядок параметров не важен)
+    выполняют эндпоинт один раз; остальные получают копию его ответа (тело, статус, заголовки).
+    Ставится под `Token.token_required` и `conditional`, чтобы авторизация и 304
+    проверялись для каждого запроса отдельно. Не подходит для потоковых ответов.
+
+    Примеры:
+    --------
+    >>> @app.route(ServerSettings.API_PATH+'/gto', methods=['GET'])
+    ... @cross_origin()
+    ... @Token.token_required
+    ... @single_flight
+    ... def get_gto(*, _email): ...
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__module__, fn.__qualname__, request.path, tuple(sorted(request.args.items(multi=True))))
+
+        def execute():
+            response = make_response(fn(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers.items())
+
+        body, status, headers = flights.do(key, execute)
+        return Response(body, status=status, headers=headers)
+    return wrapper
@@ -1,5 +1,13 @@
 from ..models  import *
 from ..origin import *
+from .upsert import upsert
+from .coalescer import run_write
+from .bulk_middleware import CSVExporter
+from .versions_middleware import ResourceVersion
+from .reference_middleware import reference
+
+from sqlalchemy import update, select
+from sqlalchemy.exc import IntegrityError
 
 
 class StandardReader:
@@ -13,12 +21,9 @@ class StandardReader:
 
     @property
     def get_standard(self):
-        res: Dict = {"data": list(dict()), "count": 0}
-        for i in session.query(self.source["standard"]).all():
-            res["data"].append({
-                "id":i.id,
-                "name":i.name
-            })
+        # нормативы и разделы теории читаются из снимка справочников без запросов к БД
+        rows = getattr(reference.current, self.source["standard"].__tablename__)
+        res: Dict = {"data": [dict(row) for row in rows.values()], "count": 0}
         res["count"] = len(res["data"])
 
         return res
@@ -30,14 +35,32 @@ class StandardReader:
         q = session.query(self.source["result"]).filter_by(student_id=self.student_id).all()
         res: Dict[str, Union[List[Dict], int]] = {"data": [], "count": 0}
         for i in q:
-            i_dict = i.__dict__
-            i_dict.pop("_sa_instance_state")
-            res["data"].append(i_dict)
+            res["data"].append(self.to_dict(i))
         res["count"] = len(res["data"])
         return res
 
+    @staticmethod
+    def to_dict(row) -> Dict:
+        """
+        Преобразует строку норматива, теории или результата в словарь по столбцам её таблицы.
+        """
+        return {column.key: getattr(row, column.key) for column in row.__table__.columns}
+
 
 class StandardWriter:
+    """
+    Класс `StandardWriter` записывает нормативы и результаты студентов по ним.
+
+    Ответы строятся из сохранённых объектов: id новой строки приходит из INSERT ... RETURNING
+    при flush, изменённая строка — из UPDATE ... RETURNING, поэтому запись стоит
+    один запрос и один commit без повторного чтения всех результатов студента.
+
+    Запись результатов разделена на подготовку (`stage_result`, `stage_update`) и фиксацию
+    через `run_write`, поэтому при WRITE_COALESCING=true результаты из разных запросов
+    фиксируются общими транзакциями.
+    """
+    source = {"standard": Standard, "result": StandardResults, "key": "standard_id"}
+
     def __init__(self, *,
                  student_id:Union[int, None]=None,
                  standard_id:Union[int, None]=None,
@@ -54,65 +77,227 @@ class StandardWriter:
         self.result_id=result_id
 
     def write_result(self):
+        key = self.source["key"]
         for i in [self.student_id, self.standard_id, self.result, self.semester]:
             if not i:
-                raise ValueError("student_id or standard_id or result or semester cannot be None")
-        q = StandardResults(
+                raise ValueError(f"student_id or {key} or result or semester cannot be None")
+        return run_write(self.stage_result)
+
+    def stage_result(self) -> Dict:
+        """
+        Добавляет результат в текущую транзакцию (без commit) и возвращает его.
+        """
+        key = self.source["key"]
+        q = self.source["result"](
             student_id=self.student_id,
-            standard_id=self.standard_id,
             result=self.result,
             semester=self.semester,
+            **{key: self.standard_id}
         )
-        session.add_all(q)
-        session.commit()
-        result = StandardReader(student_id=self.student_id).get_res
-        for i in result["data"]:
-            if i["standard_id"]==self.standard_id and i["semester"]==self.semester:
-                return i
-        else:
-            raise NoResultFound("not found")
+        try:
+            session.add(q)
+            session.flush()
+        except IntegrityError:
+            raise ValueError(f"result for this student, {key} and semester already exists")
+        ResourceVersion.bump(self.source["result"].__tablename__)
+        return StandardReader.to_dict(q)
 
     def write_standard(self):
         if not self.name:
             raise ValueError("self.name cannot be None")
-        q = Standard(name=self.name)
-        session.add_all(q)
+        q = self.source["standard"](name=self.name)
+        session.add(q)
+        session.flush()
+        res = StandardReader.to_dict(q)
+        ResourceVersion.bump(self.source["standard"].__tablename__)
         session.commit()
-        result = StandardReader(name=self.name).get_standard
-        for i in result["data"]:
-            if i["name"]==self.name:
-                return i
-        else:
-            raise NoResultFound("standard not found")
+        reference.expire()
+        return res
 
     def update_result(self):
         if not self.result_id or not self.student_id:
             raise ValueError("self.student_id and self.result_id cannot be None")
+        return run_write(self.stage_update)
 
-        # Attempt to update the record directly
-        q = session.query(StandardResults).filter(
-            StandardResults.student_id == self.student_id,
-            StandardResults.id == self.result_id
-        )
+    def stage_update(self) -> Dict:
+        """
+        Изменяет результат в текущей транзакции (без commit) и возвращает его.
+        """
+        model = self.source["result"]
 
-        # Check if the record exists and update
-        if q.update({"result":self.result   }) == 0:
-            raise NoResultFound("student_id or result_id is incorrect")
+        # Обновляем запись и сразу получаем её (UPDATE ... RETURNING)
+        row = session.execute(
+            update(model).where(
+                (model.student_id == self.student_id) &
+                (model.id == self.result_id)
+            ).values(result=self.result).returning(model)
+        ).scalar_one_or_none()
 
-        # Commit the session after updates
-        session.commit()
+        # Check if the record exists
+        if row is None:
+            raise NoResultFound("student_id or result_id is incorrect")
 
-        # Fetch updated result to confirm changes
-        res = StandardReader(student_id=self.student_id).get_res
-        for i in res["data"]:
-            if i["id"] == self.result_id:
-                return i
-        else:
-            raise NoResultFound("The result was not found after update")
+        ResourceVersion.bump(model.__tablename__)
+        return StandardReader.to_dict(row)
 
     def delete_result(self):
         if not self.result_id:
             raise ValueError("self.result_id cannot be None")
-        q = session.query(StandardResults).filter(StandardResults.id==self.result_id).delete()
+        model = self.source["result"]
+        q = session.query(model).filter(model.id==self.result_id).delete()
+        if q == 0:
+            session.rollback()
+            raise NoResultFound("result_id is incorrect")
+        ResourceVersion.bump(model.__tablename__)
         session.commit()
 
+
+class StandardGridWriter:
+    """
+    Класс `StandardGridWriter` записывает результаты всей группы по одному нормативу
+    за семестр («таблица» преподавателя) одной транзакцией.
+
+    Строки вставляются или обновляются запросом INSERT ... ON CONFLICT DO UPDATE
+    по уникальному индексу (student_id, standard_id, semester), после чего
+    записанные результаты читаются одним запросом.
+
+    Параметры:
+    ----------
+    group_id : int
+        Идентификатор группы.
+    standard_id : int
+        Идентификатор норматива.
+    semester : int
+        Семестр.
+    results : dict
+        Словарь {student_id: результат}.
+
+    Исключения:
+    -----------
+    ValueError
+        Если не переданы обязательные параметры, результат не является целым числом
+        или студент не состоит в группе.
+    NoResultFound
+        Если норматив не найден.
+
+    Примеры:
+    --------
+    >>> StandardGridWriter(group_id=1, standard_id=2, semester=1, results={10: 42, 11: 37}).write()
+    {'group_id': 1, 'standard_id': 2, 'semester': 1, 'data': [...], 'count': 2}
+    """
+    source = {"standard": Standard, "result": StandardResults, "key": "standard_id"}
+
+    def __init__(self, *,
+                 group_id: int,
+                 standard_id: int,
+                 semester: int,
+                 results: Dict[Union[int, str], int]):
+        self.group_id = group_id
+        self.standard_id = standard_id
+        self.semester = semester
+        self.results = results
+
+    def _validate(self) -> Dict[int, int]:
+        for i in [self.group_id, self.standard_id, self.semester]:
+            if not i:
+                raise ValueError(f"group_id or {self.source['key']} or semester cannot be None")
+        if not isinstance(self.results, dict) or not self.results:
+            raise ValueError("results must be a non-empty object {student_id: result}")
+        try:
+            results = {int(student_id): value for student_id, value in self.results.items()}
+        except (TypeError, ValueError):
+            raise ValueError("student_id in results must be integer")
+        invalid = [student_id for student_id, value in results.items()
+                   if not isinstance(value, int) or isinstance(value, bool)]
+        if invalid:
+            raise ValueError(f"results must be integers, invalid for students: {invalid}")
+        if session.get(self.source["standard"], self.standard_id) is None:
+            raise NoResultFound(f"{self.source['key']} {self.standard_id} not found")
+        members = {student_id for (student_id,) in session.query(Students.id).filter(
+            (Students.group_id == self.group_id) &
+            (Students.id.in_(list(results)))
+        )}
+        foreign = sorted(set(results) - members)
+        if foreign:
+            raise ValueError(f"students {foreign} are not in group {self.group_id}")
+        return results
+
+    def write(self) -> Dict:
+        """
+        Записывает результаты группы и возвращает их.
+
+        Возвращает:
+        -----------
+        dict : {"group_id", <key>, "semester", "data": [результаты], "count"}.
+        """
+        results = self._validate()
+        return run_write(lambda: self.stage(results))
+
+    def stage(self, results: Dict[int, int]) -> Dict:
+        """
+        Записывает проверенные результаты в текущую транзакцию (без commit) и возвращает их.
+        """
+        model, key = self.source["result"], self.source["key"]
+        rows = [{
+            "student_id": student_id,
+            key: self.standard_id,
+            "semester": self.semester,
+            "result": value
+        } for student_id, value in results.items()]
+        upsert(model, rows,
+               index_elements=("student_id", key, "semester"),
+               update_columns=("result",))
+        ResourceVersion.bump(model.__tablename__)
+        saved = session.query(model).filter(
+            (getattr(model, key) == self.standard_id) &
+            (model.semester == self.semester) &
+            (model.student_id.in_(list(results)))
+        ).order_by(model.student_id).all()
+        data = [StandardReader.to_dict(i) for i in saved]
+        return {
+            "group_id": self.group_id,
+            key: self.standard_id,
+            "semester": self.semester,
+            "data": data,
+            "count": len(data)
+        }
+
+
+class StandardResultsExporter(CSVExporter):
+    """
+    Класс `StandardResultsExporter` выгружает результаты нормативов в CSV потоком
+    (COPY TO STDOUT в PostgreSQL, см. `CSVExporter`).
+
+    Параметры:
+    ----------
+    group_id : int, optional
+        Только студенты группы.
+    standard_id : int, optional
+        Только результаты норматива.
+    semester : int, optional
+        Только результаты семестра.
+
+    Примеры:
+    --------
+    >>> StandardResultsExporter(group_id=1, semester=1).stream()
+    <generator object ...>
+    """
+    source = {"standard": Standard, "result": StandardResults, "key": "standard_id"}
+
+    def __init__(self, *,
+                 group_id: Union[int, None] = None,
+                 standard_id: Union[int, None] = None,
+                 semester: Union[int, None] = None):
+        model = self.source["result"]
+        key = getattr(model, self.source["key"])
+        statement = select(
+            model.id, model.student_id, Students.last_name, Students.first_name,
+            Students.group_id, key, model.semester, model.result
+        ).join(Students, Students.id == model.student_id).order_by(model.id)
+        if group_id:
+            statement = statement.where(Students.group_id == group_id)
+        if standard_id:
+            statement = statement.where(key == standard_id)
+        if semester:
+            statement = statement.where(model.semester == semester)
+        super().__init__(statement)
@@ -1,19 +1,21 @@
 from typing import Union
 from unittest import case
 
-from .validator import (
-    Validator, FullName, Patronymic,
-    Date, Sex, MedicalGroup, Height,
-    Weight, Email, Phone, Year,
-    BirthPlace, Address, Id
-)
+from .validator import STUDENT_SCHEMA
 from ..origin import *
 
 from peewee import DoesNotExist, IntegrityError
+from sqlalchemy.exc import IntegrityError as DBIntegrityError
+
+from sqlalchemy import update, select
 
 from .groups_middleware import GroupsReader
+from .pagination import Cursor
+from .bulk_middleware import CSVExporter
+from .versions_middleware import ResourceVersion
+from .leaderboard_middleware import LeaderboardWriter
 #from .institute_middleware import InstitutesReader
-from ..models import Students, Groups, session, NoResultFound
+from ..models import Students, Groups, Institutes, session, NoResultFound
 
 
 class StudentsReader:
@@ -76,33 +78,30 @@ class StudentsReader:
         self._id = _id
         self._name = name
         self._group_id = group_id
+        self.group: Union[Dict, None] = None
+        # Группа и институт берутся из снимка справочников (см. GroupsReader)
+        query = session.query(Students)
         if self._id:
             """
             Если указали айди в аргументах,
             то возвращаются данные по нему.
             """
-            try:
-                self.student = session.query(Students).filter(Students.id == _id).one()
-                self.group = GroupsReader(_id=self.student.group_id).get
-            except DoesNotExist:
-                self.student = None
+            self.student = query.filter(Students.id == _id).one_or_none()
         elif self._name and self._group_id:
             """
             Если были указаны имя и айди группы, то мы возвращаем
             данные по ним
             """
             self.first_name, self.last_name = self._name.split()
-            try:
-                self.student = session.query(Students).filter(
-                    (Students.first_name == self.first_name) &
-                    (Students.last_name == self.last_name) &
-                    (Students.group_id == self._group_id)
-                ).one()
-                self.group = GroupsReader(_id=self.student.group_id).get  # Важно добавить скобки для вызова метода
-            except NoResultFound:
-                self.student = None
+            self.student = query.filter(
+                (Students.first_name == self.first_name) &
+                (Students.last_name == self.last_name) &
+                (Students.group_id == self._group_id)
+            ).one_or_none()
         else:
             self.student = None
+        if self.student and self.student.group_id:
+            self.group = GroupsReader(_id=self.student.group_id).get
 
     @property
     def get(self)-> Union[Dict, None]:
@@ -122,135 +121,230 @@ class StudentsReader:
             Вызывается, если ID студента не найден.
         """
         if self.student:
-            return {
-                "first_name": self.student.first_name,
-                "last_name": self.student.last_name,
-                "patronymic": self.student.patronymic,
-                "birth_date": self.student.birth_date,
-                "sex": self.student.sex,
-                "medical_group": self.student.medical_group,
-                "height": self.student.height,
-                "weight": self.student.weight,
-                "email": self.student.email,
-                "phone_number": self.student.phone_number,
-                "admission_year": self.student.admission_year,
-                "birth_place": self.student.birth_place,
-                "address": self.student.address,
-                "id":self.student.id,
-                "group_id":self.group["id"],
-                "group": self.group
-                }
+            return self.to_dict(self.student, self.group)
         raise NoResultFound("incorrect id of user")
 
+    @staticmethod
+    def to_dict(student: Students, group: Union[Dict, None]) -> Dict:
+        """
+        Преобразует объект `Students` и словарь его группы (см. `GroupsReader.to_dict`)
+        в словарь ответа API.
+        """
+        return {
+            "first_name": student.first_name,
+            "last_name": student.last_name,
+            "patronymic": student.patronymic,
+            "birth_date": str(student.birth_date) if student.birth_date is not None else None,
+            "sex": student.sex,
+            "medical_group": student.medical_group,
+            "height": student.height,
+            "weight": student.weight,
+            "email": student.email,
+            "phone_number": student.phone_number,
+            "admission_year": student.admission_year,
+            "birth_place": student.birth_place,
+            "address": student.address,
+            "id":student.id,
+            "group_id":group["id"] if group else student.group_id,
+            "group": group
+            }
+
+
+class StudentsBulkReader:
+    """
+    Класс `StudentsBulkReader` читает данные сразу многих студентов по списку ID.
+    Студенты загружаются запросами `IN (...)` пачками по `chunk_size`, группы и институты берутся
+    из снимка справочников, поэтому число запросов не зависит от числа студентов в пачке.
+
+    Параметры:
+    ----------
+    ids : Iterable[int]
+        ID студентов.
+
+    Методы:
+    -------
+    get -> List[Dict]:
+        Возвращает словари студентов (в формате `StudentsReader.get`) в порядке переданных ID.
+        Несуществующие ID пропускаются.
+
+    Примеры:
+    --------
+    >>> StudentsBulkReader(ids=[1, 2, 3]).get
+    """
+    chunk_size: int = 500
+
+    def __init__(self, *, ids: Iterable[int]):
+        self.ids: List[int] = list(dict.fromkeys(int(i) for i in ids))
+        self.students: Dict[int, Dict] = {}
+
+    def _load(self):
+        for start in range(0, len(self.ids), self.chunk_size):
+            chunk = self.ids[start:start + self.chunk_size]
+            students = session.query(Students).filter(Students.id.in_(chunk)).all()
+            for student in students:
+                self.students[student.id] = StudentsReader.to_dict(
+                    student,
+                    GroupsReader(_id=student.group_id).get if student.group_id else None
+                )
+
+    @property
+    def get(self) -> List[Dict]:
+        self._load()
+        return [self.students[i] for i in self.ids if i in self.students]
+
 
 class StudentsList:
     def __init__(self, *,
                  institute_id: Union[int, None]=None,
-                 group_id: Union[int, str]=None,
+                 group_id: Union[int, None]=None,
+                 course: Union[int, None]=None,
                  name:Union[str,None]=None,
                  skip=0,
-                 limit=100
+                 limit=100,
+                 after_id: Union[str, None]=None
                  ):
         """
-        Класс `StudentsList` предоставляет возможность формирования списка студентов по различным критериям,
-        включая ID института, ID группы или имя студента с указанием ID группы.
+        Класс `StudentsList` формирует страницу списка студентов по различным критериям:
+        ID института, ID группы, курсу и имени. Все фильтры передаются в один запрос
+        `students JOIN groups JOIN institutes`, группа и институт берутся из снимка справочников.
+        Студенты упорядочены по ID, страницы выбираются по курсору `after_id` (keyset)
+        или, если курсор не передан, через OFFSET.
 
         Параметры:
         ----------
         institute_id : int, optional
-            ID института для фильтрации студентов, связанных с указанным институтом.
+            ID института, студенты групп которого попадают в список.
 
-        group_id : int или str, optional
+        group_id : int, optional
             ID группы для фильтрации студентов, входящих в эту группу.
 
+        course : int, optional
+            Курс группы.
+
         name : str, optional
-            Полное имя студента (формат: "Имя Фамилия"), используется в сочетании с group_id для точного поиска студента.
+            Имя студента. Одно слово ищется как начало имени или фамилии,
+            два слова — как начало имени и фамилии ("Имя Фамилия").
 
         skip : int, default=0
-            Количество записей, которые нужно пропустить в начале списка.
+            Количество записей, которые нужно пропустить (если не передан `after_id`).
 
         limit : int, default=100
             Максимальное количество записей, которые будут возвращены.
 
+        after_id : str, optional
+            Курсор следующей страницы (`next_after_id` предыдущего ответа).
+
         Атрибуты:
         ----------
-        students : Union[None, List[Dict]]
-            Список словарей с данными студентов, которые соответствуют критериям фильтрации.
-            Если критерии не указаны, будет `None`.
+        students : List[Dict]
+            Список словарей с данными студентов (в формате `StudentsReader.get`).
 
         count : int
-            Общее количество студентов, доступное в базе данных.
+            Общее количество студентов, подходящих под фильтры.
 
-        Методы:
-        -------
-        _make_list()
-            Формирует список студентов, соответствующих заданным критериям.
-            В зависимости от указанных параметров фильтрации, возвращает студентов по институту,
-            по группе или по имени и группе.
+        next_after_id : Union[str, None]
+            Курсор следующей страницы или None, если страница последняя.
 
         Примеры:
         --------
-        Создание списка студентов по ID института:
-            >>> students_list = StudentsList(institute_id=5)
-            >>> students_list._make_list()
+        Первая страница студентов института:
+            >>> students_list = StudentsList(institute_id=5, limit=50)
+            >>> students_list.get
 
-        Создание списка студентов по ID группы:
-            >>> students_list = StudentsList(group_id=3)
-            >>> students_list._make_list()
+        Следующая страница:
+            >>> StudentsList(institute_id=5, limit=50, after_id=students_list.next_after_id).get
 
-        Создание списка студентов по имени и ID группы:
-            >>> students_list = StudentsList(name="Иван Иванов", group_id=2)
-            >>> students_list._make_list()
+        Поиск по имени в группе:
+            >>> StudentsList(name="Иван Иванов", group_id=2).get
         """
-        self.students: Union[None, List[Dict]]
-        self.count = session.query(Students).count()
+        self.students: List[Dict] = []
+        self.skip = skip if skip else 0
+        self.limit = limit if limit else 100
+        self.after_id = Cursor.decode(after_id)
+        self.next_after_id: Union[str, None] = None
+
+        self.query = session.query(Students).outerjoin(
+            Groups, Students.group_id == Groups.id
+        ).outerjoin(
+            Institutes, Groups.institute_id == Institutes.id
+        )
         if institute_id:
-            self.institute_id = institute_id
-        elif group_id:
-            self.group_id = group_id
-        elif name:
-            self.first_name, self.last_name = name.split()
-            self.group_id = group_id
-        else:
-            self.students = None
-        self.skip = skip
-        self.limit = limit
+            self.query = self.query.filter(Groups.institute_id == institute_id)
+        if group_id:
+            self.query = self.query.filter(Students.group_id == group_id)
+        if course:
+            self.query = self.query.filter(Groups.course == course)
+        if name:
+            words = name.split()
+            if len(words) >= 2:
+                self.query = self.query.filter(
+                    Students.first_name.startswith(words[0], autoescape=True) &
+                    Students.last_name.startswith(words[1], autoescape=True)
+                )
+            elif words:
+                self.query = self.query.filter(
+                    Students.first_name.startswith(words[0], autoescape=True) |
+                    Students.last_name.startswith(words[0], autoescape=True)
+                )
+        self.count = self.query.count()
 
     def _make_list(self):
         """
-        Формирует список студентов, соответствующих заданным критериям фильтрации.
-
-        В зависимости от указанных параметров (institute_id, group_id, имя и фамилия с group_id),
-        список студентов будет включать только тех, кто соответствует условиям фильтрации.
-
-        Если указан ID института, включаются студенты, связанные с этим институтом.
-        Если указан ID группы, включаются только студенты из данной группы.
-        Если указаны имя, фамилия и ID группы, включаются только студенты, соответствующие этим данным.
+        Выбирает страницу студентов одним запросом.
+        Запрашивается на одну запись больше `limit`, чтобы понять, есть ли следующая страница.
         """
-        if self.institute_id:
-            for i in range(1, self.count+1):
-                student = StudentsReader(_id=i).get
-                if student["institute_id"] == self.institute_id:
-                    self.students.append(student)
-        elif self.group_id:
-            for i in range(1, self.count+1):
-                student = StudentsReader(_id=i).get
-                if student["group_id"] == self.group_id:
-                    self.students.append(student)
-        elif self.first_name and self.last_name:
-            for i in range(1, self.count+1):
-                student = StudentsReader(_id=i).get
-                if student["first_name"] == self.first_name \
-                    and student["last_name"] == self.last_name\
-                        and student["group_id"] == self.group_id:
-                    self.students.append(student)
+        query = self.query.order_by(Students.id)
+        if self.after_id is not None:
+            query = query.filter(Students.id > self.after_id)
+        else:
+            query = query.offset(self.skip)
+        students = query.limit(self.limit + 1).all()
+        if len(students) > self.limit:
+            students = students[:self.limit]
+            self.next_after_id = Cursor.encode(students[-1].id)
+        self.students = [
+            StudentsReader.to_dict(
+                student,
+                GroupsReader(_id=student.group_id).get if student.group_id else None
+            )
+            for student in students
+        ]
 
 
     @property
-    def get(self):
+    def get(self) -> List[Dict]:
         self._make_list()
-        if self.students:
-            return list(set(self.students))[self.skip: self.skip+self.limit]
+        return self.students
+
+
+class StudentsExporter(CSVExporter):
+    """
+    Класс `StudentsExporter` выгружает студентов в CSV потоком: в PostgreSQL через
+    COPY TO STDOUT, в SQLite — чтением курсора по частям (см. `CSVExporter`).
+    В отличие от `StudentsList` строки не превращаются в объекты ORM и словари.
+
+    Параметры:
+    ----------
+    institute_id : int, optional
+        Только студенты института.
+    group_id : int, optional
+        Только студенты группы.
+
+    Примеры:
+    --------
+    >>> Response(stream_with_context(StudentsExporter(group_id=3).stream()), mimetype="text/csv")
+    """
+    def __init__(self, *,
+                 institute_id: Union[int, None] = None,
+                 group_id: Union[int, None] = None):
+        statement = select(*Students.__table__.columns).order_by(Students.id)
+        if institute_id:
+            statement = statement.join(Groups, Groups.id == Students.group_id).where(
+                Groups.institute_id == institute_id
+            )
+        if group_id:
+            statement = statement.where(Students.group_id == group_id)
+        super().__init__(statement)
 
 
 class StudentWriter:
@@ -326,7 +420,8 @@ class StudentWriter:
 
     def validate_data(self, data:Dict[str,Union[int,str]]):
         """
-        Проверяет и валидирует входные данные студента. Поддерживаемые ключи данных:
+        Проверяет и валидирует входные данные студента по схеме `STUDENT_SCHEMA`.
+        Поддерживаемые ключи данных:
         `first_name`, `last_name`, `patronymic`, `birth_date`, `sex`, `medical_group`, `height`, `weight`,
         `email`, `phone_number`, `admission_year`, `birth_place`, `address`, `group_id`, `course`.
 
@@ -338,47 +433,17 @@ class StudentWriter:
 
         Исключения:
         -----------
-        ValueError
-            Если передан некорректный ключ в `data`.
+        SchemaError
+            Если переданы неизвестные ключи или некорректные значения;
+            содержит ошибки всех полей записи.
         """
-        for key, value in data.items():
-            match key:
-                case "first_name":
-                    self.data_to_update["first_name"] = FullName(value).get
-                case "last_name":
-                    self.data_to_update["last_name"] = FullName(value).get
-                case "patronymic":
-                    self.data_to_update["patronymic"] = Patronymic(value).get
-                case "birth_date":
-                    self.data_to_update["birth_date"] = Date(value).get
-                case "sex":
-                    self.data_to_update["sex"] = Sex(value).get
-                case "medical_group":
-                    self.data_to_update["medical_group"] = MedicalGroup(value).get
-                case "height":
-                    self.data_to_update["height"] = Height(value).get
-                case "weight":
-                    self.data_to_update["weight"] = Weight(value).get
-                case "email":
-                    self.data_to_update["email"] = Email(value).get
-                case "phone_number":
-                    self.data_to_update["phone_number"] = Phone(value).get
-                case "admission_year":
-                    self.data_to_update["admission_year"] = Year(value).get
-                case "birth_place":
-                    self.data_to_update["birth_place"] = BirthPlace(value).get
-                case "address":
-                    self.data_to_update["address"] = Address(value).get
-                case "group_id":
-                    self.data_to_update["group_id"] = Id(value).get
-                case "course":
-                    self.data_to_update["course"] = Id(value).get
-                case _:
-                    raise ValueError("invalid data")
+        self.data_to_update = STUDENT_SCHEMA.validate(data)
 
     def write(self):
         """
         Добавляет нового студента в базу данных на основе валидированных данных из `data_to_update`.
+        Ответ строится из сохранённого объекта (id приходит из INSERT ... RETURNING),
+        без повторного чтения студента.
 
         Возвращает:
         ----------
@@ -390,22 +455,23 @@ class StudentWriter:
         IntegrityError
             Если студент уже существует.
         """
+        group_id = self.data_to_update.get("group_id")
+        group = GroupsReader(_id=group_id).get if group_id else None
         student = Students(**self.data_to_update) # Создание экземпляра студента
         try:
             session.add(student)  # Добавляем объект в сессию
+            session.flush()
+            user = StudentsReader.to_dict(student, group)
+            ResourceVersion.bump(Students.__tablename__)
             session.commit()
         except Exception as e:
             session.rollback()
             raise IntegrityError("student already exists")
-        user = StudentsReader(
-            name=f"{self.data_to_update["first_name"]} {self.data_to_update['last_name']}",
-            group_id=self.data_to_update['group_id']
-        ).get
         return user
 
     def update(self):
         """
-        Обновляет данные студента, найденного по `_id`.
+        Обновляет данные студента, найденного по `_id`, одним UPDATE ... RETURNING.
 
         Возвращает:
         ----------
@@ -420,39 +486,49 @@ class StudentWriter:
         KeyError
             Если студент с заданным `_id` не найден.
         """
-        result = session.query(Students).filter(Students.id == self._id).update(
-            {key: value for key, value in self.data_to_update.items()},
-            synchronize_session='fetch'  # Указываем, чтобы обновленная сессия синхронизировалась
-        )
-
-        # Сохраняем изменения в базе данных
+        if not self.data_to_update:
+            return StudentsReader(_id=self._id).get
+        if "group_id" in self.data_to_update:
+            # Перевод в другую группу переносит знаки ГТО студента в рейтинг нового института
+            LeaderboardWriter.move_student(self._id, self.data_to_update["group_id"])
         try:
+            student = session.execute(
+                update(Students).where(Students.id == self._id).values(
+                    **self.data_to_update
+                ).returning(Students)
+            ).scalar_one_or_none()
+            if student is None:
+                session.rollback()
+                raise KeyError("user not found")
+            group = GroupsReader(_id=student.group_id).get if student.group_id else None
+            user = StudentsReader.to_dict(student, group)
+            ResourceVersion.bump(Students.__tablename__)
+            # Сохраняем изменения в базе данных
             session.commit()
-        except IntegrityError:
+        except DBIntegrityError:
             session.rollback()
             raise ValueError("student already exists")
-
-        if result == 0:
-            raise KeyError("user not found")
-
-        user = StudentsReader(_id=self._id).get
         return user
 
     def delete(self):
         """
         Удаляет студента, найденного по `_id`, из базы данных.
+        Знаки ГТО студента вычитаются из `gto_leaderboard` в той же транзакции.
 
         Исключения:
         -----------
         KeyError
             Если студент с заданным `_id` не найден.
         """
+        LeaderboardWriter.remove_student(self._id)
         result = session.query(Students).filter(Students.id == self._id).delete()
+        if result == 0:
+            session.rollback()
+            raise KeyError("user not found")
+        ResourceVersion.bump(Students.__tablename__)
         try:
             session.commit()
         except IntegrityError:
             session.rollback()
             raise KeyError("user not found")
-        if result == 0:
-            raise KeyError("user not found")
 
@@ -1,8 +1,8 @@
 from typing import Union, Dict
 
-from .standard_middleware import StandardReader
+from .standard_middleware import StandardReader, StandardWriter, StandardGridWriter, StandardResultsExporter
 from ..models import (
-    Theory, TheoryResults, NoResultFound, session
+    Theory, TheoryResults
 )
 
 class TheoryReader(StandardReader):
@@ -12,7 +12,13 @@ class TheoryReader(StandardReader):
         self.student_id = student_id
 
 
-class TheoryWriter:
+class TheoryWriter(StandardWriter):
+    """
+    Класс `TheoryWriter` записывает разделы теории и результаты студентов по ним
+    (см. `StandardWriter`).
+    """
+    source = {"standard": Theory, "result": TheoryResults, "key": "theory_id"}
+
     def __init__(self, *,
                  student_id:Union[int, None]=None,
                  theory_id:Union[int, None]=None,
@@ -20,73 +26,39 @@ class TheoryWriter:
                  semester:Union[int, None]=None,
                  name:Union[int, None]=None,
                  result_id:Union[int, None]=None,):
-
-        self.name=name
-        self.student_id=student_id
-        self.theory_id=theory_id
-        self.result=result
-        self.semester=semester
-        self.result_id=result_id
-
-    def write_result(self):
-        for i in [self.student_id, self.theory_id, self.result, self.semester]:
-            if not i:
-                raise ValueError("student_id or theory_id or result or semester cannot be None")
-        q = TheoryResults(
-            student_id=self.student_id,
-            theory_id=self.theory_id,
-            result=self.result,
-            semester=self.semester,
+        super().__init__(
+            student_id=student_id,
+            standard_id=theory_id,
+            result=result,
+            semester=semester,
+            name=name,
+            result_id=result_id
         )
-        session.add_all(q)
-        session.commit()
-        result = StandardReader(student_id=self.student_id).get_res
-        for i in result["data"]:
-            if i["theory_id"]==self.theory_id and i["semester"]==self.semester:
-                return i
-        else:
-            raise NoResultFound("not found")
-
-    def write_standard(self):
-        if not self.name:
-            raise ValueError("self.name cannot be None")
-        q = Theory(name=self.name)
-        session.add_all(q)
-        session.commit()
-        result = TheoryReader(name=self.name).get_standard
-        for i in result["data"]:
-            if i["name"]==self.name:
-                return i
-        else:
-            raise NoResultFound("standard not found")
+        self.theory_id=theory_id
 
-    def update_result(self):
-        if not self.result_id or not self.student_id:
-            raise ValueError("self.student_id and self.result_id cannot be None")
 
-        # Attempt to update the record directly
-        q = session.query(StandardResults).filter(
-            StandardResults.student_id == self.student_id,
-            StandardResults.id == self.result_id
-        )
+class TheoryGridWriter(StandardGridWriter):
+    """
+    Класс `TheoryGridWriter` записывает результаты всей группы по одному разделу теории
+    за семестр одной транзакцией (см. `StandardGridWriter`).
 
-        # Check if the record exists and update
-        if q.update({"result":self.result   }) == 0:
-            raise NoResultFound("student_id or result_id is incorrect")
+    Примеры:
+    --------
+    >>> TheoryGridWriter(group_id=1, standard_id=3, semester=1, results={10: 5, 11: 4}).write()
+    {'group_id': 1, 'theory_id': 3, 'semester': 1, 'data': [...], 'count': 2}
+    """
+    source = {"standard": Theory, "result": TheoryResults, "key": "theory_id"}
 
-        # Commit the session after updates
-        session.commit()
 
-        # Fetch updated result to confirm changes
-        res = StandardReader(student_id=self.student_id).get_res
-        for i in res["data"]:
-            if i["id"] == self.result_id:
-                return i
-        else:
-            raise NoResultFound("The result was not found after update")
+class TheoryResultsExporter(StandardResultsExporter):
+    """
+    Класс `TheoryResultsExporter` выгружает результаты по теории в CSV потоком
+    (см. `StandardResultsExporter`).
+    """
+    source = {"standard": Theory, "result": TheoryResults, "key": "theory_id"}
 
-    def delete_result(self):
-        if not self.result_id:
-            raise ValueError("self.result_id cannot be None")
-        q = session.query(StandardResults).filter(StandardResults.id==self.result_id).delete()
-        session.commit()
\ No newline at end of file
+    def __init__(self, *,
+                 group_id: Union[int, None] = None,
+                 theory_id: Union[int, None] = None,
+                 semester: Union[int, None] = None):
+        super().__init__(group_id=group_id, standard_id=theory_id, semester=semester)
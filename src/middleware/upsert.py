@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Type
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import Base, session
+
+
+def upsert(model: Type[Base],
+           rows: List[Dict[str, Any]],
+           index_elements: Iterable[str],
+           update_columns: Iterable[str],
+           chunk_size: int = 500,
+           increment_columns: Iterable[str] = ()) -> int:
+    """
+    Вставляет строки или обновляет существующие одним INSERT ... ON CONFLICT DO UPDATE
+    на пачку строк. Commit не выполняется: вызывающий код фиксирует транзакцию сам.
+
+    Параметры:
+    ----------
+    model : Base
+        Модель таблицы.
+    rows : list
+        Список словарей {столбец: значение}.
+    index_elements : iterable
+        Столбцы уникального индекса, по которому определяется конфликт.
+    update_columns : iterable
+        Столбцы, обновляемые при конфликте.
+    chunk_size : int
+        Количество строк в одном запросе.
+    increment_columns : iterable
+        Столбцы-счётчики: при конфликте к текущему значению прибавляется новое.
+
+    Возвращает:
+    -----------
+    int : количество переданных строк.
+
+    Исключения:
+    -----------
+    NotImplementedError
+        Если СУБД не поддерживает ON CONFLICT (поддерживаются PostgreSQL и SQLite).
+
+    Примеры:
+    --------
+    >>> upsert(StandardResults,
+    ...        [{"student_id": 1, "standard_id": 2, "semester": 1, "result": 10}],
+    ...        index_elements=("student_id", "standard_id", "semester"),
+    ...        update_columns=("result",))
+    1
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"upsert is not supported for {dialect}")
+    index_elements = list(index_elements)
+    update_columns = list(update_columns)
+    increment_columns = list(increment_columns)
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(model).values(rows[start:start + chunk_size])
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_.update({
+            column: getattr(model, column) + stmt.excluded[column] for column in increment_columns
+        })
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_=set_
+        )
+        session.execute(stmt)
+    return len(rows)
@@ -2,9 +2,11 @@ import json
 
 from typing import *
 
+from sqlalchemy import func
 from werkzeug.exceptions import NotFound
 
-from ..middleware.validator import Email, FullName, Password, Id
+from .pagination import Cursor
+from ..middleware.validator import Id, USER_SCHEMA
 from ..models import Users, session, NoResultFound
 
 
@@ -69,11 +71,18 @@ class UserReader:
         """
         if not self.user:
             return None
-        return {"email":self.user.email,
-                "id":self.user.id,
-                "is_active":self.user.is_active,
-                "is_superuser":self.user.is_superuser,
-                "full_name":self.user.full_name
+        return self.to_dict(self.user)
+
+    @staticmethod
+    def to_dict(user: Users) -> dict:
+        """
+        Преобразует объект `Users` в словарь ответа API.
+        """
+        return {"email":user.email,
+                "id":user.id,
+                "is_active":user.is_active,
+                "is_superuser":user.is_superuser,
+                "full_name":user.full_name
                 }
 
 
@@ -154,19 +163,18 @@ class UserWriter:
         """
         if _id:
             self.id = Id(_id).get
-        if email:
-            self.email = Email(email).get
-        if full_name:
-            self.full_name = FullName(full_name).get
         self.error: list = []
+        # Все поля проверяются за один проход, SchemaError содержит ошибки каждого поля
+        self.data = USER_SCHEMA.validate({
+            "email":email,
+            "full_name":full_name,
+            "password":password
+        }, partial=False)
+        self.data["is_active"] = is_active
+        self.data["is_superuser"] = is_superuser
         self.email = email
-        self.data = {
-            "email":Email(email).get,
-            "is_active":is_active,
-            "is_superuser":is_superuser,
-            "full_name":FullName(full_name).get,
-            "password":Password(password).get
-        }
+        if full_name:
+            self.full_name = self.data["full_name"]
 
     def write(self)->Dict:
         """
@@ -190,9 +198,12 @@ class UserWriter:
             password_hash=self.data["password"]
         )
 
-        # Добавляем пользователя в сессию и фиксируем изменения
+        # Добавляем пользователя в сессию и фиксируем изменения;
+        # id приходит из INSERT ... RETURNING при flush, повторное чтение не нужно
         try:
             session.add(user)
+            session.flush()
+            user_id = user.id
             session.commit()
         except Exception:
             session.rollback()
@@ -202,7 +213,7 @@ class UserWriter:
             "is_active":bool(self.data["is_active"]),
             "is_superuser":bool(self.data["is_superuser"]),
             "full_name":self.data["full_name"],
-            "id":UserReader(email=self.data["email"]).get["id"]}
+            "id":user_id}
 
     def update(self):
         """
@@ -270,35 +281,46 @@ class UserWriter:
 
 class UsersList:
     """
-    Возвращает список пользователей по диапазону их ID
-    Образец использования: UsersList(skip=skip, limit=limit).get
-    или UsersList(institute_id=institute_id).get
+    Возвращает страницу пользователей, упорядоченных по ID.
+    Выборка выполняется одним запросом с LIMIT/OFFSET либо, если передан курсор `after_id`,
+    условием `id > after_id` (keyset), поэтому стоимость страницы не зависит от размера таблицы.
+
+    Образец использования:
+    >>> users = UsersList(skip=0, limit=100)
+    >>> users.get            # [{'email': ..., 'id': 1, ...}, ...]
+    >>> users.count          # общее количество пользователей
+    >>> users.next_after_id  # курсор следующей страницы или None
+    >>> UsersList(limit=100, after_id=users.next_after_id).get
     """
     def __init__(self,*,
-                 skip:Union[int, None],
-                 limit:Union[int,None],
+                 skip:Union[int, None] = 0,
+                 limit:Union[int,None] = 100,
+                 after_id:Union[str, None] = None
                  ):
-        self.skip = skip
-        self.limit = limit
-        self.count = session.query(Users).count()
+        self.skip = skip if skip else 0
+        self.limit = limit if limit else 100
+        self.after_id = Cursor.decode(after_id)
+        self.count = session.query(func.count(Users.id)).scalar()
         self.users_list: List[Dict] = []
+        self.next_after_id: Union[str, None] = None
 
     def _make_list(self):
         """
-        Если пользователя с таким ID не сущесвтует,
-        он просто не заносит его в список
+        Выбирает страницу пользователей одним запросом.
+        Запрашивается на одну запись больше `limit`, чтобы понять, есть ли следующая страница.
         """
-        for i in range(1, self.count + 1):
-            try:
-                user = UserReader(_id=i).get
-                if user:
-                    self.users_list.append(user)
-            except NoResultFound:
-                break
+        query = session.query(Users).order_by(Users.id)
+        if self.after_id is not None:
+            query = query.filter(Users.id > self.after_id)
+        else:
+            query = query.offset(self.skip)
+        users = query.limit(self.limit + 1).all()
+        if len(users) > self.limit:
+            users = users[:self.limit]
+            self.next_after_id = Cursor.encode(users[-1].id)
+        self.users_list = [UserReader.to_dict(user) for user in users]
 
     @property
     def get(self)->List[Dict]:
         self._make_list()
-        return self.users_list[self.skip: self.skip+self.limit]
-
-
+        return self.users_list
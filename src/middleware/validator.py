@@ -1,7 +1,7 @@
 import hashlib
 import re
 from datetime import datetime
-from typing import Union, Any, override
+from typing import Union, Any, Dict, Iterable, List, Tuple, override
 
 from werkzeug.routing import ValidationError
 
@@ -11,8 +11,12 @@ class Validator:
     Родительский класс для всех валидаторов данных
     Как результат работы выводит либо заданное значние,
     либо строку 'invalid'
+
+    Регулярные выражения и допустимые значения задаются атрибутами класса
+    и компилируются один раз при импорте. `validate` не зависит от состояния объекта,
+    поэтому один экземпляр (например, `Email()`) можно переиспользовать для любого числа значений.
     """
-    def __init__(self, arg:Any):
+    def __init__(self, arg:Any=None):
         self.data = arg
 
     def validate(self, data: Any) -> str:
@@ -24,25 +28,27 @@ class Validator:
 
 
 class Email(Validator):
-    def __init__(self, email:str):
+    pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+    def __init__(self, email:str=None):
         super().__init__(email)
 
     @override
     def validate(self, data: str) -> str:
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if 1 <= len(data) <= 30 and re.match(pattern, data):
+        if 1 <= len(data) <= 30 and self.pattern.match(data):
             return data
         else:
             raise ValidationError(f'Invalid email: {data}')
 
 
 class FullName(Validator):
-    def __init__(self, name:str):
+    pattern = re.compile(r'^[А-Яа-яЁё\s-]+$')
+
+    def __init__(self, name:str=None):
         super().__init__(name)
 
     def _filter(self, data: str) -> str:
-        pattern = r'^[А-Яа-яЁё\s-]+$'
-        if 1 <= len(data) <= 40 and re.match(pattern, data):
+        if 1 <= len(data) <= 40 and self.pattern.match(data):
             return data
         else:
             raise ValidationError(f'Invalid full name: {data}')
@@ -57,76 +63,81 @@ class FullName(Validator):
 
 
 class Patronymic(Validator):
-    def __init__(self, patronymic:str):
+    pattern = re.compile(r'^[А-Яа-яЁё\s-]+$')
+
+    def __init__(self, patronymic:str=None):
         super().__init__(patronymic)
 
     @override
     def validate(self, data: str) -> str:
-        pattern = r'^[А-Яа-яЁё\s-]+$'
-        if data.isspace() or re.match(pattern, data):
+        if data.isspace() or self.pattern.match(data):
             return data
         else:
             raise ValidationError(f'Invalid full name: {data}')
 
 
 class Date(Validator):
-    def __init__(self, date: str):
+    pattern = re.compile(r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])$')
+
+    def __init__(self, date: str=None):
         super().__init__(date)
 
     @override
     def validate(self, data: str) -> str:
-        date_pattern = r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])$'
-        if re.match(date_pattern, data):
+        if self.pattern.match(data):
             return datetime.strptime(data, '%Y-%m-%d').date()  # Исправлено
         else:
             raise ValidationError(f'Invalid date: {data} date must be in format YYYY-MM-DD')
 
 
 class Sex(Validator):
-    def __init__(self, sex:str):
+    allowed = frozenset(["Мужской", "Женский"])
+
+    def __init__(self, sex:str=None):
         super().__init__(sex)
 
     @override
     def validate(self, data: str) -> str:
-        if data in ["Мужской", "Женский"]:
+        if data in self.allowed:
             return data
         else:
             raise ValidationError("sex must be 'Мужской' or 'Женский'")
 
 
 class Phone(Validator):
-    def __init__(self, phone:str):
-        if phone.startswith("8"):
-            phone = phone.replace("8", "+7", 1)
+    pattern = re.compile(r'^\+\d{1,20}$')
+
+    def __init__(self, phone:str=None):
         super().__init__(phone)
 
     @override
     def validate(self, data: str) -> str:
-        pattern = r'^\+\d{1,20}$'
-        if re.match(pattern, data):
+        if data.startswith("8"):
+            data = data.replace("8", "+7", 1)
+        if self.pattern.match(data):
             return data
         else:
             raise ValidationError(f'Invalid phone: {data}')
 
 
 class Password(Validator):
-    def __init__(self, password:str):
+    def __init__(self, password:str=None):
         super().__init__(password)
 
     @override
     def validate(self, data: str) -> str:
-        self.cryptor = hashlib.sha256()
-        self.cryptor.update(bytearray(data.encode()))
-        return str(self.cryptor.hexdigest())
+        return hashlib.sha256(data.encode()).hexdigest()
 
 
 class LevelGTO(Validator):
-    def __init__(self, level_gto:str):
+    allowed = frozenset(["gold", "silver", "bronze"])
+
+    def __init__(self, level_gto:str=None):
         super().__init__(level_gto)
 
     @override
     def validate(self, data: str) -> str:
-        if data in ["gold", "silver", "bronze"]:
+        if data in self.allowed:
             return data
         else:
             raise ValidationError(f'Invalid level_gto: {data}. It must be in'
@@ -134,21 +145,23 @@ class LevelGTO(Validator):
 
 
 class MedicalGroup(Validator):
-    def __init__(self, medical_group:str):
+    groups = ["Основная", "Подготовительная",
+              "Специальная \"А\" (оздоровительная)", "Специальная \"Б\" (реабилитационная)"]
+    allowed = frozenset(groups)
+
+    def __init__(self, medical_group:str=None):
         super().__init__(medical_group)
 
     @override
     def validate(self, data: str) -> str:
-        groups = ["Основная", "Подготовительная",
-                    "Специальная \"А\" (оздоровительная)", "Специальная \"Б\" (реабилитационная)"]
-        if data in groups:
+        if data in self.allowed:
             return data
         else:
-            raise ValidationError(f'Invalid medical group: {data}, must be in {str(groups)}')
+            raise ValidationError(f'Invalid medical group: {data}, must be in {str(self.groups)}')
 
 
 class Height(Validator):
-    def __init__(self, height: int):
+    def __init__(self, height: int=None):
         super().__init__(height)
 
     @override
@@ -168,7 +181,7 @@ class Year(Height):
 
 
 class BirthPlace(Validator):
-    def __init__(self, birth_place:str):
+    def __init__(self, birth_place:str=None):
         super().__init__(birth_place)
 
     @override
@@ -180,9 +193,160 @@ class BirthPlace(Validator):
 
 
 class Address(BirthPlace):
-    def __init__(self, address:str):
+    def __init__(self, address:str=None):
         super().__init__(address)
 
 
 class Id(Height):
-    ...
\ No newline at end of file
+    ...
+
+
+class Result(Validator):
+    def __init__(self, result: int=None):
+        super().__init__(result)
+
+    @override
+    def validate(self, data: int) -> int:
+        if isinstance(data, int) and not isinstance(data, bool):
+            return data
+        else:
+            raise ValidationError(f'Invalid result: {data}, must be an integer')
+
+
+class SchemaError(ValidationError):
+    """
+    Ошибка валидации записи по схеме `Schema`.
+    В отличие от ошибок отдельных валидаторов содержит ошибки всех полей записи.
+
+    Атрибуты:
+    ----------
+    errors : dict
+        Словарь {поле: текст ошибки}.
+    """
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__("; ".join(f"{key}: {msg}" for key, msg in errors.items()))
+
+
+class Schema:
+    """
+    Класс `Schema` — декларативное описание полей записи и их валидаторов.
+
+    Валидаторы создаются один раз при создании схемы, а `validate` проверяет всю запись
+    за один проход по её полям и собирает ошибки всех полей, а не только первого.
+
+    Параметры:
+    ----------
+    fields : dict
+        Словарь {поле: экземпляр валидатора}.
+    required : iterable, optional
+        Поля, обязательные при `partial=False`.
+
+    Примеры:
+    --------
+    >>> schema = Schema({"email": Email(), "phone_number": Phone()})
+    >>> schema.validate({"email": "user@example.com", "phone_number": "89990001122"})
+    {'email': 'user@example.com', 'phone_number': '+79990001122'}
+    >>> schema.validate({"email": "bad", "phone": "1"})
+    Traceback (most recent call last):
+    ...
+    SchemaError: email: Invalid email: bad; phone: unknown field
+    """
+    def __init__(self, fields: Dict[str, Validator], required: Iterable[str] = ()):
+        self.fields = {key: validator.validate for key, validator in fields.items()}
+        self.required = frozenset(required)
+
+    def validate(self, data: Dict[str, Any], partial: bool = True) -> Dict[str, Any]:
+        """
+        Проверяет запись и возвращает словарь преобразованных значений.
+
+        Параметры:
+        ----------
+        data : dict
+            Проверяемая запись.
+        partial : bool
+            Если False, отсутствие полей из `required` считается ошибкой.
+
+        Исключения:
+        -----------
+        SchemaError
+            Если хотя бы одно поле неизвестно или не прошло проверку.
+        """
+        fields = self.fields
+        result: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for key, value in data.items():
+            validate = fields.get(key)
+            if validate is None:
+                errors[key] = "unknown field"
+                continue
+            try:
+                result[key] = validate(value)
+            except (ValueError, TypeError, AttributeError) as e:
+                errors[key] = str(e)
+        if not partial:
+            for key in self.required.difference(data):
+                errors[key] = "field required"
+        if errors:
+            raise SchemaError(errors)
+        return result
+
+    def validate_many(self,
+                      rows: Iterable[Dict[str, Any]],
+                      partial: bool = True
+                      ) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, Dict[str, str]]]:
+        """
+        Проверяет список записей.
+
+        Возвращает:
+        -----------
+        tuple : (список пар (номер записи, преобразованная запись) для корректных записей,
+                 словарь {номер записи: ошибки полей} для некорректных).
+        """
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        errors: Dict[int, Dict[str, str]] = {}
+        for number, row in enumerate(rows):
+            try:
+                valid.append((number, self.validate(row, partial)))
+            except SchemaError as e:
+                errors[number] = e.errors
+        return valid, errors
+
+
+STUDENT_SCHEMA = Schema({
+    "first_name": FullName(),
+    "last_name": FullName(),
+    "patronymic": Patronymic(),
+    "birth_date": Date(),
+    "sex": Sex(),
+    "medical_group": MedicalGroup(),
+    "height": Height(),
+    "weight": Weight(),
+    "email": Email(),
+    "phone_number": Phone(),
+    "admission_year": Year(),
+    "birth_place": BirthPlace(),
+    "address": Address(),
+    "group_id": Id(),
+    "course": Id(),
+}, required=("first_name", "last_name", "group_id"))
+
+USER_SCHEMA = Schema({
+    "email": Email(),
+    "full_name": FullName(),
+    "password": Password(),
+}, required=("email", "full_name", "password"))
+
+STANDARD_RESULT_SCHEMA = Schema({
+    "student_id": Id(),
+    "standard_id": Id(),
+    "semester": Id(),
+    "result": Result(),
+}, required=("student_id", "standard_id", "semester", "result"))
+
+THEORY_RESULT_SCHEMA = Schema({
+    "student_id": Id(),
+    "theory_id": Id(),
+    "semester": Id(),
+    "result": Result(),
+}, required=("student_id", "theory_id", "semester", "result"))
@@ -0,0 +1,167 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Iterable, Tuple, Union
+
+from flask import request, make_response, Response
+from sqlalchemy import event, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .invalidation import bus
+from ..models import ResourceVersions, Session, engine, session
+
+
+class ResourceVersion:
+    """
+    Класс `ResourceVersion` хранит номера версий ресурсов (таблиц) в `resource_versions`.
+
+    Писатели вызывают `bump` в своей транзакции, но версии увеличиваются отдельной короткой
+    транзакцией сразу после её commit (см. `write`), а при откате не меняются. Так строка
+    часто изменяемого ресурса в `resource_versions` не блокируется на всё время бизнес-транзакции,
+    и записи разных таблиц и разных запросов не выстраиваются за ней в очередь.
+    Новые данные становятся видны чуть раньше новой версии: читатель в этот промежуток
+    получит свежие данные со старым ETag или ключом кэша и при следующем запросе
+    просто загрузит их ещё раз; старые данные с новой версией прочитать нельзя.
+    Читатели по версиям строят ETag и Last-Modified (см. `conditional`).
+
+    Примеры:
+    --------
+    >>> ResourceVersion.bump("students")
+    >>> session.commit()
+    >>> ResourceVersion.read(["students", "groups"])
+    {'students': (3, datetime.datetime(2024, 9, 1, 10, 0, 5)), 'groups': (0, None)}
+    """
+
+    @staticmethod
+    def bump(*names: str):
+        """
+        Отмечает, что текущая транзакция изменила ресурсы `names`.
+        Версии увеличиваются после её commit (см. `write`), при откате отметка сбрасывается.
+        """
+        if not names:
+            return
+        db_session = session()
+        if not db_session.in_transaction():
+            # отметка живёт до конца транзакции, поэтому транзакция начинается здесь
+            db_session.begin()
+        db_session.info.setdefault("bumped", set()).update(names)
+
+    @staticmethod
+    def write(names: Iterable[str]):
+        """
+        Увеличивает версии ресурсов `names` отдельной транзакцией на основной БД
+        одним INSERT ... ON CONFLICT DO UPDATE. В PostgreSQL в той же транзакции
+        отправляется NOTIFY для `InvalidationBus`.
+        """
+        names = sorted(set(names))
+        if not names:
+            return
+        insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        stmt = insert(ResourceVersions).values([
+            {"name": name, "version": 1, "updated_at": now} for name in names
+        ])
+        with engine.begin() as connection:
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": ResourceVersions.version + 1, "updated_at": stmt.excluded.updated_at}
+            ))
+            if engine.dialect.name == "postgresql":
+                connection.execute(
+                    text("SELECT pg_notify('resource_versions', :names)"), {"names": ",".join(names)}
+                )
+
+    @staticmethod
+    def read(names: Iterable[str]) -> Dict[str, Tuple[int, Union[datetime, None]]]:
+        """
+        Возвращает {ресурс: (версия, время изменения)} одним запросом.
+        Ресурсы, которые ещё не менялись, имеют версию 0 и время None.
+        """
+        names = list(names)
+        versions = {name: (0, None) for name in names}
+        rows = session.execute(
+            select(ResourceVersions.name, ResourceVersions.version, ResourceVersions.updated_at)
+            .where(ResourceVersions.name.in_(names))
+        )
+        for name, version, updated_at in rows:
+            versions[name] = (version, updated_at)
+        return versions
+
+
+def conditional(*resources: str) -> Callable:
+    """
+    Декоратор GET-эндпоинта, ответ которого зависит только от таблиц `resources`
+    и от URL запроса.
+
+    ETag ответа строится из URL и версий ресурсов, Last-Modified — время последнего
+    изменения ресурсов. Если заголовок `If-None-Match` содержит текущий ETag
+    (или, без него, `If-Modified-Since` не раньше Last-Modified), возвращается 304
+    без вызова эндпоинта. Версии читаются до вызова эндпоинта: если запись произошла
+    между ними, клиент получит свежие данные со старым ETag и при следующем запросе
+    просто загрузит их ещё раз.
+
+    Декоратор ставится под `Token.token_required`, чтобы 304 получали только
+    авторизованные клиенты.
+
+    Примеры:
+    --------
+    >>> @app.route(ServerSettings.API_PATH+'/standard', methods=['GET'])
+    ... @cross_origin()
+    ... @Token.token_required
+    ... @conditional("standard")
+    ... def get_standard(*, _email): ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = ResourceVersion.read(resources)
+            tag = ";".join(f"{name}:{version}" for name, (version, _) in sorted(versions.items()))
+            etag = hashlib.sha256(f"{request.full_path}|{tag}".encode()).hexdigest()[:32]
+            changed = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+            last_modified = max(changed).replace(microsecond=0, tzinfo=timezone.utc) if changed else None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (last_modified is not None
+                                and request.if_modified_since is not None
+                                and last_modified <= request.if_modified_since)
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # ответы зависят от токена: кэшировать только в клиенте и всегда перепроверять
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(db_session):
+    names = db_session.info.pop("bumped", None)
+    if not names:
+        return
+    try:
+        ResourceVersion.write(names)
+    except Exception as e:
+        # данные уже зафиксированы: кэши увидят их при следующем увеличении версии или по TTL
+        logging.error(f"resource versions {sorted(names)} were not bumped: {e}")
+        return
+    # InvalidationBus этого процесса сразу перечитывает версии
+    bus.note_commit()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(db_session, transaction):
+    # после commit отметка уже снята в _after_commit; здесь сбрасываются откаты и close()
+    if transaction.parent is None:
+        db_session.info.pop("bumped", None)
@@ -1,27 +1,85 @@
-from sqlalchemy import create_engine, Column, Integer, Text, Boolean, ForeignKey, Date, String
+import logging
+import random
+
+from sqlalchemy import create_engine, event, Column, Integer, Text, Boolean, ForeignKey, Date, DateTime, String, Index, inspect, text, select, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import relationship, sessionmaker, scoped_session, Session as OrmSession
+from sqlalchemy.exc import NoResultFound, IntegrityError
 from .settings import DBSettings
 
 Base = declarative_base()
 
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Применяет DBSettings.sqlite_pragmas() к каждому новому соединению SQLite:
+    WAL и busy_timeout позволяют нескольким воркерам писать в один файл
+    без ошибок "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in DBSettings.sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def make_engine(uri: str):
+    """
+    Создаёт engine с параметрами пула из DBSettings; для SQLite подключает PRAGMA.
+    """
+    if uri.startswith("sqlite"):
+        new_engine = create_engine(uri, **DBSettings.engine_options())
+        event.listen(new_engine, "connect", set_sqlite_pragmas)
+        return new_engine
+    return create_engine(uri, **DBSettings.engine_options())
+
+
 # Настройка подключения к БД
 if DBSettings.DB_KIND == "sqlite":
-    engine = create_engine(f"sqlite:///src/{DBSettings.DB_NAME}.db")
+    engine = make_engine(f"sqlite:///src/{DBSettings.DB_NAME}.db")
 else:
-    engine = create_engine(DBSettings.uri)
+    engine = make_engine(DBSettings.uri)
+
+# Реплики только для чтения (DB_REPLICA_URIS)
+replica_engines = [make_engine(uri) for uri in DBSettings.replica_uris()]
+
+
+class RoutingSession(OrmSession):
+    """
+    Сессия, которая направляет чтение на реплики, а запись — на основную БД.
+
+    Реплики используются, только если это разрешено флагом `session.info["use_replicas"]`
+    (его ставит app.before_request для GET/HEAD-запросов), и только для SELECT.
+    После первой записи (flush или INSERT/UPDATE/DELETE) сессия до конца запроса
+    читает с основной БД, чтобы видеть свои изменения (read-your-writes).
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+            return engine
+        if (replica_engines
+                and self.info.get("use_replicas")
+                and not self.info.get("wrote")
+                and getattr(clause, "is_select", False)):
+            return random.choice(replica_engines)
+        return engine
+
 
-Session = sessionmaker(bind=engine)
-session = Session()
+Session = sessionmaker(bind=engine, class_=RoutingSession)
+# Своя сессия у каждого потока; в конце запроса она закрывается
+# (session.remove() в app.teardown_appcontext), соединение возвращается в пул
+session = scoped_session(Session)
 
 
 # Модель Tokens
+# Использованные и отозванные refresh-токены; выданные токены в БД не хранятся.
+# Хранится не сам JWT, а его sha256 (token_digest) — поиск по уникальному индексу.
+# Прежняя таблица tokens (полный JWT в Text) больше не используется.
 class Tokens(Base):
-    __tablename__ = "tokens"
+    __tablename__ = "auth_tokens"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    token = Column(Text, nullable=False)
+    token_digest = Column(String(64), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
     is_active = Column(Boolean, default=True)
 
 
@@ -35,6 +93,8 @@ class Users(Base):
     password_hash = Column(Text)
     full_name = Column(Text)
     is_superuser = Column(Boolean)
+    # Номер «поколения» токенов: входит в каждый JWT, выход и смена пароля увеличивают его
+    token_epoch = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 # Модель Institutes
@@ -49,6 +109,9 @@ class Institutes(Base):
 # Модель Groups
 class Groups(Base):
     __tablename__ = "groups"
+    __table_args__ = (
+        Index("ix_groups_institute_id_course", "institute_id", "course"),
+    )
 
     id = Column(Integer, primary_key=True, unique=True)
     institute_id = Column(Integer, ForeignKey('institutes.id'))
@@ -92,6 +155,21 @@ class BaseGTO(Base):
     year = Column(Integer)
 
 
+# Модель GTOLeaderboard
+# Счётчики знаков ГТО по институту, году и уровню.
+# Поддерживаются LeaderboardWriter в тех же транзакциях, что и записи gto/students.
+class GTOLeaderboard(Base):
+    __tablename__ = "gto_leaderboard"
+    __table_args__ = (
+        Index("ix_gto_leaderboard_year_level_count", "year", "level", "count"),
+    )
+
+    institute_id = Column(Integer, ForeignKey('institutes.id'), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    level = Column(Text, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 # Модель Standard
 class Standard(Base):
     __tablename__ = "standard"
@@ -104,6 +182,11 @@ class Standard(Base):
 # Модель StandardResults
 class StandardResults(Base):
     __tablename__ = "standard_results"
+    # Один результат студента по нормативу за семестр — ключ для upsert (ON CONFLICT)
+    __table_args__ = (
+        Index("ux_standard_results_student_standard_semester",
+              "student_id", "standard_id", "semester", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, unique=True)
     student_id = Column(Integer, ForeignKey('students.id'))
@@ -126,6 +209,11 @@ class Theory(Base):
 # Модель TheoryResults
 class TheoryResults(Base):
     __tablename__ = "theory_results"
+    # Один результат студента по теории за семестр — ключ для upsert (ON CONFLICT)
+    __table_args__ = (
+        Index("ux_theory_results_student_theory_semester",
+              "student_id", "theory_id", "semester", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, unique=True)
     theory_id = Column(Integer, ForeignKey('theory.id'))
@@ -136,6 +224,47 @@ class TheoryResults(Base):
     student = relationship("Students", back_populates="theory_results")
 
 
+# Модель ResourceVersions
+# Номер версии каждой таблицы, которую читают GET-эндпоинты (name — имя таблицы).
+# Писатели отмечают изменённые таблицы, версии увеличиваются короткой транзакцией после commit;
+# из версий строятся ETag и Last-Modified (см. versions_middleware).
+class ResourceVersions(Base):
+    __tablename__ = "resource_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+
 # Создание всех таблиц
 Base.metadata.create_all(engine)
 
+# create_all не добавляет новые столбцы в уже существующие таблицы
+if "token_epoch" not in {column["name"] for column in inspect(engine).get_columns("users")}:
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE users ADD COLUMN token_epoch INTEGER NOT NULL DEFAULT 0"))
+
+# create_all не добавляет новые индексы в уже существующие таблицы
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        try:
+            index.create(engine, checkfirst=True)
+        except IntegrityError:
+            # Уникальный индекс не создаётся, пока в таблице есть повторяющиеся строки.
+            # Без него upsert (ON CONFLICT) и проверка повторов не работают, поэтому
+            # приложение не запускается, пока повторы не удалены вручную.
+            columns = [table.c[column.name] for column in index.columns]
+            with engine.connect() as connection:
+                duplicates = connection.execute(
+                    select(*columns, func.count()).group_by(*columns).having(func.count() > 1).limit(20)
+                ).all()
+            keys = "; ".join(
+                ", ".join(f"{column.name}={value}" for column, value in zip(columns, row)) + f" ({row[-1]} rows)"
+                for row in duplicates
+            )
+            logging.error(f"index {index.name} was not created: table {table.name} has duplicate rows: {keys}")
+            raise RuntimeError(
+                f"unique index {index.name} cannot be created: table {table.name} has duplicate rows "
+                f"({keys}); remove the duplicates and restart"
+            )
+
@@ -5,6 +5,8 @@ from flask import jsonify
 
 from src.middleware.JWT_processor import Token
 from src.middleware.groups_middleware import GroupsList
+from src.middleware.pagination import page_args
+from src.middleware.versions_middleware import conditional
 from src.origin import app, request, cross_origin
 from src.settings import ServerSettings
 
@@ -12,21 +14,35 @@ from src.settings import ServerSettings
 @app.route(ServerSettings.API_PATH+"/groups", methods=["GET"])
 @cross_origin()
 @Token.token_required
+@conditional("groups")
 def get_groups(*, _email):
     try:
-        skip = int(request.args.get("skip"))
-        limit = int(request.args.get("limit"))
+        skip, limit = page_args(request.args)
         institute_id = int(request.args.get("institute_id"))
         course= int(request.args.get("course"))
-        groups = GroupsList(
+    except (ValueError, TypeError) as e:
+        return jsonify({
+                    "detail": [{
+                                "loc": [
+                                    f"{e.__class__.__name__}",
+                                    0
+                                        ],
+                                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                                       f"{traceback.format_exc()}",
+                                "type": f"{e.__class__.__name__}"
+                                }]
+                        }), 400
+    try:
+        groups_list = GroupsList(
             skip=skip,
             limit=limit,
             institute_id=institute_id,
             course=course
-        ).get
+        )
+        groups = groups_list.get
         return jsonify({
             "data":groups,
-            "count":len(groups)
+            "count":groups_list.count
         }), 200
     except Exception as e:
         return jsonify({
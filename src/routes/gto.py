@@ -7,6 +7,8 @@ from werkzeug.routing import ValidationError
 
 from ..middleware.JWT_processor import Token
 from ..middleware.gto_middleware import AssemblerGTO, GTOWriter
+from ..middleware.versions_middleware import conditional
+from ..middleware.singleflight import single_flight
 from ..origin import (
     app, traceback
 )
@@ -15,6 +17,8 @@ from ..settings import ServerSettings
 @app.route(ServerSettings.API_PATH+'/gto', methods=['GET'])
 @cross_origin()
 @Token.token_required
+@conditional("gto", "gto_leaderboard", "students", "groups")
+@single_flight
 def get_gto(*, _email):
     try:
         institute_id = int(request.args.get('institute_id'))
@@ -3,6 +3,8 @@ from audioop import cross
 
 
 from ..middleware.institute_middleware import InstitutesList
+from ..middleware.pagination import page_args
+from ..middleware.versions_middleware import conditional
 from ..origin import (
     app, request, jsonify, traceback, cross_origin
 )
@@ -10,15 +12,30 @@ from ..settings import ServerSettings
 
 
 @app.route(ServerSettings.API_PATH+'/institutes', methods=['GET'])
-@cross_origin
+@cross_origin()
+@conditional("institutes")
 def get_institutes():
     try:
-        skip = int(request.json.get("skip"))
-        limit = int(request.json.get("limit"))
-        institutes = InstitutesList(skip=skip, limit=limit).get
+        skip, limit = page_args(request.args)
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    try:
+        name = request.args.get("name")
+        institutes_list = InstitutesList(skip=skip, limit=limit, name=name)
+        institutes = institutes_list.get
         res = {
             "data": list(institutes),
-            "count": len(institutes)
+            "count": institutes_list.count
         }
         return jsonify(res), 200
     except Exception as e:
@@ -15,10 +15,12 @@ def access_token():
         email = str(request.args.get("email"))
         password = str(request.args.get("password"))
         if PasswordManager.match_password(email, password):
-            token = Token(email).get_token
+            token = Token(email)
             return jsonify({
-                    "access_token": token,
-                    "token_type": "bearer"
+                    "access_token": token.get_token,
+                    "refresh_token": token.refresh_token,
+                    "token_type": "bearer",
+                    "expires_in": ServerSettings.ACCESS_TOKEN_TTL
             }), 200
         else:
             return jsonify({
@@ -45,6 +47,88 @@ def access_token():
         }), 422
 
 
+@app.route(ServerSettings.API_PATH+"/login/refresh-token", methods=["POST"])
+@cross_origin()
+def refresh_token():
+    try:
+        token = Token.refresh(str(request.args.get("refresh_token")))
+        return jsonify({
+                "access_token": token.get_token,
+                "refresh_token": token.refresh_token,
+                "token_type": "bearer",
+                "expires_in": ServerSettings.ACCESS_TOKEN_TTL
+        }), 200
+    except (ValueError, jwt.InvalidTokenError) as e:
+        return jsonify({
+                "detail": [
+                {
+                  "loc": [
+                    "refresh_token",
+                    0
+                  ],
+                  "msg": f"{e}",
+                  "type": "string"
+                }]}), 401
+    except Exception as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/login/logout", methods=["POST"])
+@cross_origin()
+@Token.token_required
+def logout(*, _email):
+    try:
+        refresh = request.args.get("refresh_token")
+        if refresh:
+            Token(token=refresh).deactivate(email=_email)
+        Token.revoke_all(_email)
+        return jsonify({"message": "success"}), 200
+    except PermissionError as e:
+        return jsonify({
+                "detail": [
+                {
+                  "loc": [
+                    "refresh_token",
+                    0
+                  ],
+                  "msg": f"{e}",
+                  "type": "string"
+                }]}), 403
+    except jwt.InvalidTokenError as e:
+        return jsonify({
+                "detail": [
+                {
+                  "loc": [
+                    "refresh_token",
+                    0
+                  ],
+                  "msg": f"{e}",
+                  "type": "string"
+                }]}), 401
+    except Exception as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
 @app.route(ServerSettings.API_PATH+"/login/test-token", methods=["POST"])
 @cross_origin()
 @Token.token_required
@@ -4,15 +4,17 @@ from ..middleware.JWT_processor import Token
 from ..origin import app
 
 from ..middleware.standard_middleware import *
+from ..middleware.import_middleware import StandardResultsImporter
+from ..middleware.versions_middleware import conditional
+from flask import Response, stream_with_context
 from ..settings import ServerSettings
 
 
 @app.route(ServerSettings.API_PATH+'/standard', methods=['GET'])
 @cross_origin()
 @Token.token_required
-def get_standard(
-        #_email
-):
+@conditional("standard")
+def get_standard(*, _email):
     res = StandardReader().get_standard
     return jsonify(res), 200
 
@@ -236,3 +238,137 @@ def delete_result(student_ud, theory_result_id, *, _email):
         }), 422
 
 
+@app.route(ServerSettings.API_PATH+'/groups/<int:group_id>/standards', methods=['PUT'])
+@cross_origin()
+@Token.token_required
+def write_group_standard_results(group_id, *, _email):
+    try:
+        res = StandardGridWriter(
+            group_id=group_id,
+            standard_id=request.json.get('standard_id'),
+            semester=request.json.get('semester'),
+            results=request.json.get('results')
+        ).write()
+        return jsonify(res), 200
+    except NoResultFound as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/standard/results/export", methods=["GET"])
+@cross_origin()
+@Token.token_required
+def export_standard_results(*, _email):
+    try:
+        exporter = StandardResultsExporter(
+            group_id=request.args.get("group_id", type=int),
+            standard_id=request.args.get("standard_id", type=int),
+            semester=request.args.get("semester", type=int)
+        )
+        return Response(
+            stream_with_context(exporter.stream()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=standard_results.csv"}
+        )
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/standard/results/import", methods=["POST"])
+@cross_origin()
+@Token.token_required
+def import_standard_results(*, _email):
+    try:
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify({
+                "detail": [{
+                    "loc": [
+                        "file",
+                        0
+                    ],
+                    "msg": "file is required (multipart/form-data, field 'file')",
+                    "type": "string"
+                }]
+            }), 400
+        report = StandardResultsImporter(file=upload.stream, filename=upload.filename).get
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
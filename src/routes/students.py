@@ -5,13 +5,19 @@ from werkzeug.routing import ValidationError
 
 from src.settings import ServerSettings
 from ..middleware.JWT_processor import Token
-from ..middleware.students_middleware import StudentsReader, StudentWriter
+from flask import Response, stream_with_context
+
+from ..middleware.students_middleware import StudentsReader, StudentsList, StudentWriter, StudentsExporter
+from ..middleware.import_middleware import StudentsImporter
+from ..middleware.pagination import Cursor, page_args
+from ..middleware.versions_middleware import conditional
 from ..origin import *
 
 
 @app.route(ServerSettings.API_PATH+"/students/<int:student_id>", methods=["GET"])
 @cross_origin()
 @Token.token_required
+@conditional("students", "groups", "institutes")
 def get_student(student_id: int, *, _email):
     try:
         student_id = int(student_id)
@@ -32,6 +38,61 @@ def get_student(student_id: int, *, _email):
         }), 422
 
 
+@app.route(ServerSettings.API_PATH+"/students/", methods=["GET"])
+@cross_origin()
+@Token.token_required
+def get_students(*, _email):
+    try:
+        skip, limit = page_args(request.args)
+        after_id = request.args.get("after_id")
+        Cursor.decode(after_id)
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    try:
+        institute_id = request.args.get("institute_id", type=int)
+        group_id = request.args.get("group_id", type=int)
+        course = request.args.get("course", type=int)
+        name = request.args.get("name")
+        students_list = StudentsList(
+            institute_id=institute_id,
+            group_id=group_id,
+            course=course,
+            name=name,
+            skip=skip,
+            limit=limit,
+            after_id=after_id
+        )
+        students = students_list.get
+        return jsonify({
+            "data": students,
+            "count": students_list.count,
+            "next_after_id": students_list.next_after_id
+        }), 200
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
 @app.route(ServerSettings.API_PATH+"/students/", methods=["POST"])
 @cross_origin()
 def write_student():
@@ -103,6 +164,95 @@ def write_student():
 
 
 
+@app.route(ServerSettings.API_PATH+"/students/import", methods=["POST"])
+@cross_origin()
+@Token.token_required
+def import_students(*, _email):
+    try:
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify({
+                "detail": [{
+                    "loc": [
+                        "file",
+                        0
+                    ],
+                    "msg": "file is required (multipart/form-data, field 'file')",
+                    "type": "string"
+                }]
+            }), 400
+        report = StudentsImporter(
+            file=upload.stream,
+            filename=upload.filename,
+            institute_id=request.args.get("institute_id", type=int)
+        ).get
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/students/export", methods=["GET"])
+@cross_origin()
+@Token.token_required
+def export_students(*, _email):
+    try:
+        exporter = StudentsExporter(
+            institute_id=request.args.get("institute_id", type=int),
+            group_id=request.args.get("group_id", type=int)
+        )
+        return Response(
+            stream_with_context(exporter.stream()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=students.csv"}
+        )
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
 @app.route(ServerSettings.API_PATH+"/students/<int:student_id>", methods=["PATCH"])
 @cross_origin()
 @Token.token_required
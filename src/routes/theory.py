@@ -0,0 +1,144 @@
+from flask import Response, stream_with_context
+
+from ..middleware.JWT_processor import Token
+from ..middleware.theoty_middleware import TheoryGridWriter, TheoryResultsExporter
+from ..middleware.import_middleware import TheoryResultsImporter
+from ..models import NoResultFound
+from ..origin import *
+from ..settings import ServerSettings
+
+
+@app.route(ServerSettings.API_PATH+'/groups/<int:group_id>/theory', methods=['PUT'])
+@cross_origin()
+@Token.token_required
+def write_group_theory_results(group_id, *, _email):
+    try:
+        res = TheoryGridWriter(
+            group_id=group_id,
+            standard_id=request.json.get('theory_id'),
+            semester=request.json.get('semester'),
+            results=request.json.get('results')
+        ).write()
+        return jsonify(res), 200
+    except NoResultFound as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/theory/results/export", methods=["GET"])
+@cross_origin()
+@Token.token_required
+def export_theory_results(*, _email):
+    try:
+        exporter = TheoryResultsExporter(
+            group_id=request.args.get("group_id", type=int),
+            theory_id=request.args.get("theory_id", type=int),
+            semester=request.args.get("semester", type=int)
+        )
+        return Response(
+            stream_with_context(exporter.stream()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=theory_results.csv"}
+        )
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
+
+
+@app.route(ServerSettings.API_PATH+"/theory/results/import", methods=["POST"])
+@cross_origin()
+@Token.token_required
+def import_theory_results(*, _email):
+    try:
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify({
+                "detail": [{
+                    "loc": [
+                        "file",
+                        0
+                    ],
+                    "msg": "file is required (multipart/form-data, field 'file')",
+                    "type": "string"
+                }]
+            }), 400
+        report = TheoryResultsImporter(file=upload.stream, filename=upload.filename).get
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    except Exception as e:
+        logging.error(e)
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 422
@@ -6,6 +6,7 @@ from peewee import DoesNotExist
 from werkzeug.routing import ValidationError
 
 from ..middleware.JWT_processor import Token, PasswordManager
+from ..middleware.pagination import page_args
 from ..middleware.users_middleware import (
     UserWriter, UsersList, UserReader
 )
@@ -73,12 +74,27 @@ def create_user(*, _email):
 @Token.token_required
 def get_users(*, _email):
     try:
-        skip = int(request.args.get("skip"))
-        limit = int(request.args.get("limit"))
-        users = UsersList(skip=skip, limit=limit).get
+        skip, limit = page_args(request.args)
+        after_id = request.args.get("after_id")
+        users_list = UsersList(skip=skip, limit=limit, after_id=after_id)
+    except ValueError as e:
+        return jsonify({
+            "detail": [{
+                "loc": [
+                    f"{e.__class__.__name__}",
+                    0
+                ],
+                "msg": f"{e} {e.__cause__} {e.__doc__} \n "
+                       f"{traceback.format_exc()}",
+                "type": f"{e.__class__.__name__}"
+            }]
+        }), 400
+    try:
+        users = users_list.get
         res = {
             "data": list(users),
-            "count": len(users)
+            "count": users_list.count,
+            "next_after_id": users_list.next_after_id
         }
         return jsonify(res), 200
     except Exception as e:
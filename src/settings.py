@@ -26,6 +26,17 @@ class ServerSettings:
     SUPERUSER_EMAIL = os.getenv('SUPERUSER_EMAIL')
     SUPERUSER_PASSWORD = os.getenv('SUPERUSER_PASSWORD')
     SUPERUSER_FULL_NAME = os.getenv('SUPERUSER_FULL_NAME')
+    ACCESS_TOKEN_TTL = int(os.getenv('ACCESS_TOKEN_TTL', 900)) # срок действия access-токена, секунды
+    REFRESH_TOKEN_TTL = int(os.getenv('REFRESH_TOKEN_TTL', 60*60*60)) # срок действия refresh-токена, секунды
+    TOKEN_PURGE_INTERVAL = int(os.getenv('TOKEN_PURGE_INTERVAL', 3600)) # период очистки истёкших токенов, 0 — не очищать
+    AUTH_MODE = os.getenv('AUTH_MODE', 'token') # token — учёт refresh-токенов в auth_tokens, epoch — отзыв по users.token_epoch
+    EPOCH_CACHE_SIZE = int(os.getenv('EPOCH_CACHE_SIZE', 10000)) # сколько token_epoch пользователей держать в памяти процесса
+    EPOCH_CACHE_TTL = float(os.getenv('EPOCH_CACHE_TTL', 30)) # сколько секунд доверять закэшированному token_epoch
+    RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'memory') # memory — в процессе, file — общий файл SQLite, none — выключен
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 1000)) # сколько отчётов хранить
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 3600)) # страховочный срок жизни отчёта, секунды
+    RESULT_CACHE_PATH = os.getenv('RESULT_CACHE_PATH', 'src/result_cache.db') # файл кэша для RESULT_CACHE_BACKEND=file
+    REFERENCE_CHECK_INTERVAL = float(os.getenv('REFERENCE_CHECK_INTERVAL', 5)) # как часто сверять версии справочников, секунды
 
 
 class DBSettings:
@@ -38,6 +49,22 @@ class DBSettings:
     DB_USER: str = os.getenv("DB_USER", "postgres") # пользователь
     DB_NAME: str = os.getenv("DB_NAME", "postgres") # название базы
     DB_KIND: str = os.getenv("DB_KIND", "sqlite") # вид базы данных: Postgres | SQLite
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5)) # постоянных соединений в пуле на процесс
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10)) # дополнительных соединений сверх пула
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30)) # сколько секунд ждать свободное соединение
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800)) # пересоздавать соединения старше N секунд
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes") # проверять соединение перед выдачей
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL") # WAL: читатели не блокируют писателя
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") # NORMAL в режиме WAL не теряет целостность
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)) # сколько мс ждать блокировку вместо "database is locked"
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)) # байт файла БД, читаемых через mmap
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024)) # кэш страниц; отрицательное — в КиБ
+    DB_REPLICA_URIS: str = os.getenv("DB_REPLICA_URIS", "") # URI реплик только для чтения через запятую
+    WRITE_COALESCING: bool = os.getenv("WRITE_COALESCING", "false").lower() in ("1", "true", "yes") # объединять записи результатов в общие транзакции
+    WRITE_COALESCING_WINDOW: float = float(os.getenv("WRITE_COALESCING_WINDOW", 5)) # сколько мс собирать пачку записей
+    WRITE_COALESCING_MAX_BATCH: int = int(os.getenv("WRITE_COALESCING_MAX_BATCH", 200)) # максимум записей в одной транзакции
+    INVALIDATION_POLL_INTERVAL: float = float(os.getenv("INVALIDATION_POLL_INTERVAL", 1)) # как часто воркер перечитывает resource_versions, секунды; 0 — не запускать
+    INVALIDATION_LISTEN: bool = os.getenv("INVALIDATION_LISTEN", "true").lower() in ("1", "true", "yes") # в PostgreSQL узнавать об изменениях через LISTEN/NOTIFY
 
     @classmethod
     @property
@@ -53,3 +80,40 @@ class DBSettings:
             uri += "?sslmode=require"
         return uri
 
+    @classmethod
+    def engine_options(cls) -> dict:
+        """
+        Данный метод возвращает параметры пула соединений
+        для create_engine
+        :return: options: dict
+        """
+        return {
+            "pool_size": cls.DB_POOL_SIZE,
+            "max_overflow": cls.DB_MAX_OVERFLOW,
+            "pool_timeout": cls.DB_POOL_TIMEOUT,
+            "pool_recycle": cls.DB_POOL_RECYCLE,
+            "pool_pre_ping": cls.DB_POOL_PRE_PING,
+        }
+
+    @classmethod
+    def replica_uris(cls) -> list:
+        """
+        Данный метод возвращает список URI реплик для чтения
+        :return: uris: list
+        """
+        return [uri.strip() for uri in cls.DB_REPLICA_URIS.split(",") if uri.strip()]
+
+    @classmethod
+    def sqlite_pragmas(cls) -> dict:
+        """
+        Данный метод возвращает PRAGMA, которые выполняются
+        на каждом новом соединении SQLite
+        :return: pragmas: dict
+        """
+        return {
+            "journal_mode": cls.SQLITE_JOURNAL_MODE,
+            "synchronous": cls.SQLITE_SYNCHRONOUS,
+            "busy_timeout": cls.SQLITE_BUSY_TIMEOUT,
+            "mmap_size": cls.SQLITE_MMAP_SIZE,
+            "cache_size": cls.SQLITE_CACHE_SIZE,
+        }
@@ -2,7 +2,9 @@
 
 export HOST=127.0.0.1
 export PORT=8888
+export WORKERS=${WORKERS:-2}
+export THREADS=${THREADS:-4}
 
 pip install -r src/requirements.txt
 
-gunicorn --bind=$HOST:$PORT "src.app:app"
\ No newline at end of file
+gunicorn --bind=$HOST:$PORT --worker-class=gthread --workers=$WORKERS --threads=$THREADS "src.app:app"
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Общие настройки тестов: временная база SQLite и очистка таблиц после каждого теста.
+
+Настройки читаются из окружения при импорте `src`, поэтому окружение задаётся здесь,
+до импорта модулей приложения. База создаётся по пути src/<DB_NAME>.db относительно
+текущего каталога, поэтому тесты работают во временном каталоге.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="herzen-tests-")
+os.makedirs(os.path.join(WORKDIR, "src"))
+os.chdir(WORKDIR)
+os.environ.update({
+    "DB_KIND": "sqlite",
+    "DB_NAME": "test_api",
+    "SECRET_KEY": "test-secret-key-used-only-by-the-test-suite",
+    "AUTH_MODE": "token",
+    "RESULT_CACHE_BACKEND": "memory",
+    "INVALIDATION_POLL_INTERVAL": "0",
+    "WRITE_COALESCING": "false",
+    "DB_REPLICA_URIS": "",
+    "TOKEN_PURGE_INTERVAL": "0",
+    "REFERENCE_CHECK_INTERVAL": "0",
+})
+
+from src.app import app  # noqa: E402
+from src.models import Base, Users, session  # noqa: E402
+from src.middleware.JWT_processor import Token, epoch_cache  # noqa: E402
+from src.middleware.reference_middleware import reference  # noqa: E402
+from src.middleware.result_cache import result_cache  # noqa: E402
+from src.middleware.validator import Password  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    yield
+    session.rollback()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    session.remove()
+    # версии в resource_versions начинаются заново, поэтому кэши процесса сбрасываются
+    reference.snapshot = None
+    result_cache.backend.clear()
+    epoch_cache.clear()
+
+
+@pytest.fixture
+def email() -> str:
+    """
+    Создаёт активного пользователя и возвращает его email.
+    """
+    session.add(Users(email="user@example.com", password_hash=Password("password").get,
+                      is_active=True, is_superuser=False, full_name="Иванов Иван"))
+    session.commit()
+    session.remove()
+    return "user@example.com"
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(email) -> dict:
+    """
+    Заголовок авторизации с access-токеном пользователя `email`.
+    """
+    return {"Authorization": f"Bearer {Token(email=email).get_token}"}
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from src.models import Institutes, session
+from src.middleware import coalescer as coalescer_module
+from src.middleware.coalescer import WriteCoalescer, run_write
+
+
+def add_institute(_id: int, fail: bool = False):
+    def job():
+        session.add(Institutes(id=_id, name=f"Институт {_id}"))
+        session.flush()
+        if fail:
+            raise ValueError(f"job {_id} failed")
+        return _id
+    return job
+
+
+def institute_ids() -> list:
+    ids = [row.id for row in session.query(Institutes.id).order_by(Institutes.id)]
+    session.remove()
+    return ids
+
+
+def test_batch_is_replayed_without_failing_job():
+    coalescer = WriteCoalescer(window=0.2, max_batch=10)
+    futures = [
+        coalescer.submit(add_institute(1)),
+        coalescer.submit(add_institute(2, fail=True)),
+        coalescer.submit(add_institute(3)),
+    ]
+
+    assert futures[0].result(timeout=5) == 1
+    assert futures[2].result(timeout=5) == 3
+    with pytest.raises(ValueError, match="job 2 failed"):
+        futures[1].result(timeout=5)
+    # изменения упавшей записи откатились вместе с первой попыткой пачки
+    assert institute_ids() == [1, 3]
+
+
+def test_commit_error_is_reported_only_to_failing_job():
+    session.add(Institutes(id=1, name="Институт 1"))
+    session.commit()
+    session.remove()
+    coalescer = WriteCoalescer(window=0.2, max_batch=10)
+
+    def duplicate():
+        # повтор первичного ключа обнаруживается только при commit
+        session.add(Institutes(id=1, name="Повтор"))
+        return "duplicate"
+
+    futures = [coalescer.submit(add_institute(2)), coalescer.submit(add_institute(3)), coalescer.submit(duplicate)]
+
+    assert futures[0].result(timeout=5) == 2
+    assert futures[1].result(timeout=5) == 3
+    with pytest.raises(Exception):
+        futures[2].result(timeout=5)
+    assert institute_ids() == [1, 2, 3]
+
+
+def test_coalesced_write_marks_caller_session_as_written(monkeypatch):
+    coalescer = WriteCoalescer(window=0.001, max_batch=1)
+    monkeypatch.setattr(coalescer_module, "coalescer", coalescer)
+    session.info["use_replicas"] = True
+
+    assert run_write(add_institute(1)) == 1
+    # дальнейшие чтения запроса не должны уйти на отстающую реплику
+    assert session.info["wrote"] is True
+
+
+def test_timed_out_write_is_cancelled_and_never_committed(monkeypatch):
+    coalescer = WriteCoalescer(window=0.001, max_batch=1)
+    coalescer.timeout = 0.2
+    monkeypatch.setattr(coalescer_module, "coalescer", coalescer)
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return add_institute(1)()
+
+    blocker = coalescer.submit(slow)
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError):
+        run_write(add_institute(2))
+    release.set()
+
+    assert blocker.result(timeout=5) == 1
+    time.sleep(0.1)
+    assert institute_ids() == [1]
+
+
+def test_started_write_is_awaited_past_timeout(monkeypatch):
+    coalescer = WriteCoalescer(window=0.001, max_batch=1)
+    coalescer.timeout = 0.1
+    monkeypatch.setattr(coalescer_module, "coalescer", coalescer)
+
+    def slow():
+        time.sleep(0.3)
+        return add_institute(1)()
+
+    assert run_write(slow) == 1
+    assert institute_ids() == [1]
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy.exc import NoResultFound
+
+from src.models import Institutes, Groups, Students, Standard, StandardResults, session
+from src.middleware.standard_middleware import StandardGridWriter
+
+
+@pytest.fixture
+def group():
+    """
+    Группа 1 со студентами 1 и 2, группа 2 со студентом 3 и норматив 1.
+    """
+    session.add(Institutes(id=1, name="Институт"))
+    session.add(Groups(id=1, institute_id=1, course=1, name="Группа 1"))
+    session.add(Groups(id=2, institute_id=1, course=1, name="Группа 2"))
+    for _id, group_id in ((1, 1), (2, 1), (3, 2)):
+        session.add(Students(id=_id, group_id=group_id, course=1, first_name="Иван",
+                             last_name=f"Иванов {_id}", email=f"s{_id}@example.com", phone_number=f"+7{_id}"))
+    session.add(Standard(id=1, name="Бег 100 м"))
+    session.commit()
+    session.remove()
+
+
+def write(results: dict, standard_id: int = 1) -> dict:
+    return StandardGridWriter(group_id=1, standard_id=standard_id, semester=1, results=results).write()
+
+
+def saved() -> dict:
+    rows = session.query(StandardResults).all()
+    result = {row.student_id: row.result for row in rows}
+    session.remove()
+    return result
+
+
+def test_results_are_written_and_returned(group):
+    res = write({"1": 42, "2": 37})
+
+    assert res["count"] == 2
+    assert [row["result"] for row in res["data"]] == [42, 37]
+    assert saved() == {1: 42, 2: 37}
+
+
+def test_second_write_updates_existing_rows(group):
+    write({1: 42, 2: 37})
+    write({1: 40})
+
+    assert saved() == {1: 40, 2: 37}
+    assert session.query(StandardResults).count() == 2
+
+
+def test_student_from_other_group_rejects_whole_grid(group):
+    with pytest.raises(ValueError, match=r"students \[3\] are not in group 1"):
+        write({1: 42, 3: 37})
+
+    assert saved() == {}
+
+
+def test_non_integer_result_is_rejected(group):
+    with pytest.raises(ValueError, match="must be integers"):
+        write({1: "42", 2: True})
+
+    assert saved() == {}
+
+
+def test_missing_standard(group):
+    with pytest.raises(NoResultFound):
+        write({1: 42}, standard_id=99)
+
+
+def test_endpoint_reports_foreign_student(group, client, auth):
+    response = client.put("/api/v1/groups/1/standards", headers=auth,
+                          json={"standard_id": 1, "semester": 1, "results": {"1": 42, "3": 37}})
+
+    assert response.status_code == 400
+    assert saved() == {}
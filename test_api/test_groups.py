@@ -0,0 +1,47 @@
+import pytest
+
+from src.models import Institutes, Groups, session
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def groups():
+    session.add_all([Institutes(id=1, name="Институт физики"), Institutes(id=2, name="Институт химии")])
+    session.add_all([
+        Groups(id=1, institute_id=1, course=1, name="Ф-11"),
+        Groups(id=2, institute_id=1, course=2, name="Ф-21"),
+        Groups(id=3, institute_id=1, course=1, name="Ф-12"),
+        Groups(id=4, institute_id=2, course=1, name="Х-11"),
+        Groups(id=5, institute_id=1, course=1, name="Ф-13"),
+    ])
+    ResourceVersion.bump("institutes", "groups")
+    session.commit()
+    session.remove()
+
+
+def test_groups_of_institute_and_course_with_institute(client, auth, groups):
+    response = client.get("/api/v1/groups", query_string={"institute_id": 1, "course": 1}, headers=auth)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [group["name"] for group in body["data"]] == ["Ф-11", "Ф-12", "Ф-13"]
+    assert body["count"] == 3
+    assert body["data"][0]["institute"]["name"] == "Институт физики"
+
+
+def test_groups_are_paged_after_filtering(client, auth, groups):
+    response = client.get("/api/v1/groups", query_string={"institute_id": 1, "course": 1, "skip": 1, "limit": 1},
+                          headers=auth)
+
+    assert [group["id"] for group in response.get_json()["data"]] == [3]
+    assert response.get_json()["count"] == 3
+
+
+@pytest.mark.parametrize("query", [
+    {"institute_id": 1, "course": 1, "skip": "a"},
+    {"institute_id": 1, "course": 1, "skip": -1},
+    {"institute_id": "x", "course": 1},
+    {"course": 1},
+])
+def test_bad_parameters_are_rejected(client, auth, query):
+    assert client.get("/api/v1/groups", query_string=query, headers=auth).status_code == 400
@@ -0,0 +1,127 @@
+import io
+
+import pytest
+
+from src.models import Institutes, Groups, Students, session
+from src.middleware.import_middleware import StudentsImporter
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def groups():
+    session.add_all([Institutes(id=1, name="Институт физики"), Institutes(id=2, name="Институт химии")])
+    session.add_all([
+        Groups(id=1, institute_id=1, course=1, name="Ф-11"),
+        Groups(id=2, institute_id=1, course=1, name="Общая"),
+        Groups(id=3, institute_id=2, course=1, name="ОБЩАЯ"),
+    ])
+    ResourceVersion.bump("institutes", "groups")
+    session.commit()
+    session.remove()
+
+
+def upload(client, auth, content: str, filename: str = "students.csv", **query):
+    return client.post("/api/v1/students/import", query_string=query, headers=auth,
+                       data={"file": (io.BytesIO(content.encode("utf-8")), filename)},
+                       content_type="multipart/form-data")
+
+
+def student_emails() -> list:
+    emails = [email for email, in session.query(Students.email).order_by(Students.id)]
+    session.remove()
+    return emails
+
+
+def test_each_bad_row_is_reported_with_its_line_number(client, auth, groups):
+    content = (
+        "first_name;last_name;email;group\n"
+        "Иван;Иванов;ivan@example.com;Ф-11\n"
+        "Пётр;Петров;not-an-email;Ф-11\n"
+        "Анна;;anna@example.com;Ф-11\n"
+        "Олег;Орлов;oleg@example.com;Нет такой\n"
+        "Юлия;Юрьева;julia@example.com;Общая\n"
+    )
+
+    report = upload(client, auth, content).get_json()
+
+    assert report["total"] == 5
+    assert report["inserted"] == 1
+    assert report["failed"] == 4
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert set(errors) == {3, 4, 5, 6}
+    assert "email" in errors[3]
+    assert errors[4] == {"last_name": "field required"}
+    assert errors[5] == {"group": "unknown group: Нет такой"}
+    assert "ambiguous" in errors[6]["group"]
+    assert student_emails() == ["ivan@example.com"]
+
+
+def test_institute_resolves_ambiguous_group_names(client, auth, groups):
+    content = "first_name,last_name,group\nЮлия,Юрьева,общая\n"
+
+    report = upload(client, auth, content, institute_id=2).get_json()
+
+    assert report["inserted"] == 1
+    assert session.query(Students.group_id).scalar() == 3
+
+
+def test_xlsx_rows_are_imported(client, auth, groups):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["first_name", "last_name", "group_id", "height"])
+    sheet.append(["Иван", "Иванов", 1, 180])
+    sheet.append(["Пётр", "Петров", 1, -5])
+    data = io.BytesIO()
+    workbook.save(data)
+
+    response = client.post("/api/v1/students/import", headers=auth,
+                           data={"file": (io.BytesIO(data.getvalue()), "students.xlsx")},
+                           content_type="multipart/form-data")
+
+    report = response.get_json()
+    assert (report["inserted"], report["failed"]) == (1, 1)
+    assert list(report["errors"][0]["errors"]) == ["height"]
+
+
+def test_error_list_is_capped_but_failures_are_counted(groups, monkeypatch):
+    monkeypatch.setattr(StudentsImporter, "max_errors", 2)
+    content = "first_name,last_name,group_id\n" + "Иван,,1\n" * 5
+
+    report = StudentsImporter(file=io.BytesIO(content.encode()), filename="students.csv").get
+
+    assert report["failed"] == 5
+    assert len(report["errors"]) == 2
+
+
+@pytest.mark.parametrize("filename, content", [("students.txt", "a,b\n"), ("students.csv", "")])
+def test_unreadable_file_is_rejected(client, auth, filename, content):
+    assert upload(client, auth, content, filename=filename).status_code == 400
+
+
+def test_missing_file_is_rejected(client, auth):
+    assert client.post("/api/v1/students/import", headers=auth).status_code == 400
+
+
+def test_failed_chunk_is_inserted_row_by_row(groups):
+    session.add(Students(id=1, group_id=1, course=1, first_name="Олег", last_name="Орлов",
+                         email="taken@example.com", phone_number="+71"))
+    session.commit()
+    session.remove()
+    content = (
+        "first_name,last_name,email,group_id\n"
+        "Иван,Иванов,ivan@example.com,1\n"
+        "Пётр,Петров,taken@example.com,1\n"
+        "Анна,Петрова,anna@example.com,1\n"
+        "Иван,Повтор,ivan@example.com,1\n"
+        "Юлия,Юрьева,julia@example.com,1\n"
+    )
+
+    # одна пачка: повтор email внутри неё и email из базы обнаруживаются только при вставке
+    report = StudentsImporter(file=io.BytesIO(content.encode()), filename="students.csv", chunk_size=10).get
+
+    assert (report["total"], report["inserted"], report["failed"]) == (5, 3, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 5]
+    assert "already exists" in report["errors"][0]["errors"]["row"]
+    assert student_emails() == ["taken@example.com", "ivan@example.com", "anna@example.com", "julia@example.com"]
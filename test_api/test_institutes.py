@@ -0,0 +1,48 @@
+import pytest
+
+from src.models import Institutes, session
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def institutes():
+    names = ["Институт физики", "Институт химии", "Институт истории", "Факультет права", "Институт 100%"]
+    session.add_all([Institutes(id=_id, name=name) for _id, name in enumerate(names, start=1)])
+    ResourceVersion.bump("institutes")
+    session.commit()
+    session.remove()
+
+
+def names(response) -> list:
+    return [institute["name"] for institute in response.get_json()["data"]]
+
+
+def test_page_and_count_in_one_response(client, institutes):
+    response = client.get("/api/v1/institutes", query_string={"skip": 1, "limit": 2})
+
+    assert response.status_code == 200
+    assert names(response) == ["Институт химии", "Институт истории"]
+    assert response.get_json()["count"] == 5
+
+
+def test_name_filters_by_prefix_before_paging(client, institutes):
+    response = client.get("/api/v1/institutes", query_string={"name": "Институт", "skip": 3})
+
+    assert names(response) == ["Институт 100%"]
+    assert response.get_json()["count"] == 4
+
+
+def test_name_wildcards_are_literal(client, institutes):
+    response = client.get("/api/v1/institutes", query_string={"name": "Институт 100%"})
+
+    assert names(response) == ["Институт 100%"]
+    assert client.get("/api/v1/institutes", query_string={"name": "%"}).get_json()["count"] == 0
+
+
+@pytest.mark.parametrize("query", [{"skip": "x"}, {"limit": "ten"}, {"skip": -3}])
+def test_bad_paging_parameters_are_rejected(client, query):
+    assert client.get("/api/v1/institutes", query_string=query).status_code == 400
+
+
+def test_negative_limit_is_clamped(client, institutes):
+    assert names(client.get("/api/v1/institutes", query_string={"limit": -1})) == ["Институт физики"]
@@ -0,0 +1,85 @@
+import pytest
+
+from src.models import Institutes, session
+from src.middleware import invalidation, result_cache as result_cache_module, versions_middleware
+from src.middleware.cache import TTLCache
+from src.middleware.invalidation import InvalidationBus
+from src.middleware.result_cache import ResultCache
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def bus(monkeypatch) -> InvalidationBus:
+    # фоновый опрос не мешает тестам: версии перечитываются только после commit или явным poll
+    bus = InvalidationBus(interval=3600, listen=False)
+    monkeypatch.setattr(invalidation, "bus", bus)
+    monkeypatch.setattr(result_cache_module, "bus", bus)
+    monkeypatch.setattr(versions_middleware, "bus", bus)
+    bus.start()
+    return bus
+
+
+def bump(*names: str):
+    ResourceVersion.bump(*names)
+    session.commit()
+    session.remove()
+
+
+def test_first_bump_on_empty_table_is_reported(bus):
+    changes = []
+    bus.subscribe(changes.append)
+
+    bump("groups")
+
+    assert changes == [{"groups"}]
+    assert bus.versions(["groups", "gto"]) == {"groups": 1, "gto": 0}
+
+
+def test_versions_do_not_go_backwards(bus):
+    bump("groups")
+    # более новый опрос уже закончился, а медленный вернул старые строки
+    bus.generations = {"groups": 5}
+
+    assert bus.poll() == set()
+    assert bus.versions(["groups"]) == {"groups": 5}
+
+
+def test_failing_subscriber_does_not_stop_others(bus):
+    changes = []
+
+    def fail(changed):
+        raise RuntimeError("subscriber failed")
+
+    bus.subscribe(fail)
+    bus.subscribe(changes.append)
+
+    bump("standard")
+
+    assert changes == [{"standard"}]
+
+
+def test_rolled_back_bump_is_not_polled(bus):
+    changes = []
+    bus.subscribe(changes.append)
+
+    ResourceVersion.bump("groups")
+    session.rollback()
+    session.remove()
+
+    assert changes == []
+    assert bus.versions(["groups"]) == {"groups": 0}
+
+
+def test_result_cache_sees_own_write_without_waiting(bus):
+    cache = ResultCache(TTLCache(maxsize=100, ttl=60))
+    session.add(Institutes(id=1, name="old"))
+    bump("institutes")
+
+    def compute():
+        return session.get(Institutes, 1).name
+
+    assert cache.get_or_set("institute", 1, compute, depends=("institutes",)) == "old"
+    session.merge(Institutes(id=1, name="new"))
+    bump("institutes")
+
+    assert cache.get_or_set("institute", 1, compute, depends=("institutes",)) == "new"
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from src.models import Institutes, Groups, Students, BaseGTO, GTOLeaderboard, session
+from src.middleware.leaderboard_middleware import LeaderboardReader, LeaderboardWriter
+
+YEAR = 2024
+
+
+@pytest.fixture
+def institutes():
+    """
+    Четыре института, в каждом по одной группе (id группы = id института).
+    """
+    for _id in range(1, 5):
+        session.add(Institutes(id=_id, name=f"Институт {_id}"))
+        session.add(Groups(id=_id, institute_id=_id, course=1, name=f"Группа {_id}"))
+    session.commit()
+    session.remove()
+
+
+def add_student(_id: int, group_id: int, level: str):
+    session.add(Students(id=_id, group_id=group_id, course=1, first_name="Иван",
+                         last_name=f"Иванов {_id}", email=f"s{_id}@example.com", phone_number=f"+7{_id}"))
+    session.add(BaseGTO(student_id=_id, level=level, year=YEAR))
+    session.flush()
+    LeaderboardWriter.add_result(_id, YEAR, level)
+    session.commit()
+    session.remove()
+
+
+def counters() -> dict:
+    rows = session.query(GTOLeaderboard).filter(GTOLeaderboard.count != 0).all()
+    result = {(row.institute_id, row.level): row.count for row in rows}
+    session.remove()
+    return result
+
+
+def test_ties_share_competition_rank(institutes):
+    # золото: институт 1 — 2 знака, 2 и 3 — по 1, 4 — 0
+    for _id, group_id in ((1, 1), (2, 1), (3, 2), (4, 3)):
+        add_student(_id, group_id, "gold")
+
+    ranks = {_id: LeaderboardReader(institute_id=_id, year=YEAR).get["rating"]["gold"] for _id in range(1, 5)}
+
+    assert ranks == {1: 1, 2: 2, 3: 2, 4: 4}
+    assert LeaderboardReader(institute_id=4, year=YEAR).get["count"]["gold"] == 0
+
+
+def test_moving_student_shifts_both_counters(institutes):
+    add_student(1, 1, "silver")
+    add_student(2, 1, "silver")
+
+    LeaderboardWriter.move_student(1, 2)
+    session.query(Students).filter(Students.id == 1).update({"group_id": 2})
+    session.commit()
+    session.remove()
+
+    assert counters() == {(1, "silver"): 1, (2, "silver"): 1}
+    assert LeaderboardReader(institute_id=1, year=YEAR).get["rating"]["silver"] == 1
+    assert LeaderboardReader(institute_id=2, year=YEAR).get["rating"]["silver"] == 1
+
+
+def test_move_within_institute_keeps_counters(institutes):
+    session.add(Groups(id=10, institute_id=1, course=2, name="Группа 10"))
+    session.commit()
+    add_student(1, 1, "bronze")
+
+    LeaderboardWriter.move_student(1, 10)
+    session.commit()
+
+    assert counters() == {(1, "bronze"): 1}
+
+
+def test_removing_student_subtracts_results(institutes):
+    add_student(1, 1, "gold")
+    add_student(2, 1, "gold")
+
+    LeaderboardWriter.remove_student(1)
+    session.commit()
+
+    assert counters() == {(1, "gold"): 1}
+
+
+def test_concurrent_first_results_are_counted(institutes):
+    errors = []
+
+    def first_result():
+        try:
+            LeaderboardWriter.shift(1, YEAR, "gold", 1)
+            session.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.remove()
+
+    threads = [threading.Thread(target=first_result) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert errors == []
+    assert counters() == {(1, "gold"): 8}
+
+
+def test_negative_shift_on_missing_row_is_kept_for_rebuild(institutes):
+    add_student(1, 2, "gold")
+    LeaderboardWriter.shift(1, YEAR, "gold", -1)
+    session.commit()
+
+    assert counters() == {(1, "gold"): -1, (2, "gold"): 1}
+    LeaderboardWriter.rebuild()
+    assert counters() == {(2, "gold"): 1}
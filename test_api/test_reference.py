@@ -0,0 +1,38 @@
+import pytest
+
+from src.models import Standard, session
+from src.middleware.reference_middleware import reference
+from src.middleware.standard_middleware import StandardWriter
+from src.middleware.theoty_middleware import TheoryWriter
+
+
+@pytest.fixture
+def cached_reference(monkeypatch):
+    """
+    Снимок сверяется с версиями раз в час: без `expire` новые записи не видны.
+    """
+    monkeypatch.setattr(reference, "interval", 3600)
+    reference.snapshot = None
+    reference.checked_at = 0.0
+    reference.current
+    session.remove()
+
+
+def test_snapshot_is_not_reloaded_within_interval(cached_reference):
+    session.add(Standard(id=1, name="Бег 100 м"))
+    session.commit()
+    session.remove()
+
+    assert dict(reference.current.standard) == {}
+
+
+def test_write_standard_refreshes_snapshot(cached_reference):
+    res = StandardWriter(name="Бег 100 м").write_standard()
+
+    assert reference.current.standard[res["id"]]["name"] == "Бег 100 м"
+
+
+def test_write_theory_refreshes_snapshot(cached_reference):
+    res = TheoryWriter(name="История спорта").write_standard()
+
+    assert reference.current.theory[res["id"]]["name"] == "История спорта"
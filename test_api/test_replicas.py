@@ -0,0 +1,60 @@
+import pytest
+
+from src import models
+from src.models import Base, Institutes, make_engine, session
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """
+    Отстающая реплика: отдельная база SQLite, где институт 1 ещё называется «Реплика».
+    В основной БД он называется «Основная».
+    """
+    replica_engine = make_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(replica_engine)
+    with replica_engine.begin() as connection:
+        connection.execute(Institutes.__table__.insert().values(id=1, name="Реплика"))
+    session.add(Institutes(id=1, name="Основная"))
+    session.commit()
+    session.remove()
+    monkeypatch.setattr(models, "replica_engines", [replica_engine])
+    yield
+    session.remove()
+    replica_engine.dispose()
+
+
+def institute_name() -> str:
+    return session.query(Institutes.name).filter(Institutes.id == 1).scalar()
+
+
+def test_reads_go_to_primary_without_flag(replica):
+    assert institute_name() == "Основная"
+
+
+def test_allowed_reads_go_to_replica(replica):
+    session.info["use_replicas"] = True
+
+    assert institute_name() == "Реплика"
+
+
+def test_reads_after_flush_go_to_primary(replica):
+    session.info["use_replicas"] = True
+    session.add(Institutes(id=2, name="Новый"))
+    session.flush()
+
+    assert institute_name() == "Основная"
+    assert session.get(Institutes, 2).name == "Новый"
+
+
+def test_reads_after_dml_go_to_primary(replica):
+    session.info["use_replicas"] = True
+    session.execute(Institutes.__table__.update().where(Institutes.id == 1).values(name="Изменена"))
+
+    assert institute_name() == "Изменена"
+
+
+def test_get_request_reads_from_replica(replica, client, auth):
+    response = client.get("/api/v1/institutes", headers=auth)
+
+    assert response.status_code == 200
+    assert [row["name"] for row in response.get_json()["data"]] == ["Реплика"]
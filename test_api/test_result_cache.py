@@ -0,0 +1,94 @@
+import pytest
+
+from src.models import Institutes, session
+from src.middleware.cache import TTLCache
+from src.middleware.result_cache import ResultCache
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def cache() -> ResultCache:
+    return ResultCache(TTLCache(maxsize=100, ttl=60))
+
+
+def institute_name(calls: list):
+    def compute():
+        calls.append(1)
+        return session.get(Institutes, 1).name
+    return compute
+
+
+def rename_institute(name: str, bump: bool = True):
+    session.merge(Institutes(id=1, name=name))
+    if bump:
+        ResourceVersion.bump(Institutes.__tablename__)
+    session.commit()
+    session.remove()
+
+
+def test_value_is_cached_until_version_bump(cache):
+    rename_institute("old")
+    calls = []
+
+    assert cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",)) == "old"
+    assert cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",)) == "old"
+    assert len(calls) == 1
+
+    rename_institute("new")
+
+    assert cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",)) == "new"
+    assert len(calls) == 2
+
+
+def test_write_without_bump_is_not_seen(cache):
+    rename_institute("old")
+    calls = []
+    cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",))
+
+    rename_institute("new", bump=False)
+
+    assert cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",)) == "old"
+
+
+def test_bump_of_other_table_keeps_value(cache):
+    rename_institute("old")
+    calls = []
+    cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",))
+
+    ResourceVersion.bump("students")
+    session.commit()
+
+    cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",))
+    assert len(calls) == 1
+
+
+def test_keys_are_separate(cache):
+    assert cache.get_or_set("report", 1, lambda: "first", depends=("gto",)) == "first"
+    assert cache.get_or_set("report", 2, lambda: "second", depends=("gto",)) == "second"
+    assert cache.get_or_set("other", 1, lambda: "third", depends=("gto",)) == "third"
+
+
+def test_disabled_cache_always_computes():
+    cache = ResultCache(None)
+    calls = []
+    rename_institute("old")
+
+    cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",))
+    cache.get_or_set("institute", 1, institute_name(calls), depends=("institutes",))
+
+    assert len(calls) == 2
+
+
+def test_miss_is_computed_on_primary(cache):
+    # реплика может отставать от версий в ключе, поэтому промах читает с основной БД
+    session.info["use_replicas"] = True
+    seen = []
+
+    def compute():
+        seen.append(session.info.get("use_replicas"))
+        return "value"
+
+    cache.get_or_set("report", 1, compute, depends=("gto",))
+
+    assert not seen[0]
+    assert session.info["use_replicas"] is True
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from src.middleware.singleflight import SingleFlight
+
+
+def run_concurrently(flights: SingleFlight, key, fn, count: int) -> list:
+    """
+    Запускает `count` вызовов `flights.do(key, fn)` в потоках и возвращает
+    результат или исключение каждого вызова.
+    """
+    outcomes = [None] * count
+
+    def call(i):
+        try:
+            outcomes[i] = flights.do(key, fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_followers_receive_leader_result():
+    flights = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"rating": 1}
+
+    outcomes = run_concurrently(flights, "gto", compute, 5)
+
+    assert len(calls) == 1
+    assert outcomes == [{"rating": 1}] * 5
+
+
+def test_followers_receive_leader_exception():
+    flights = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError("report failed")
+
+    outcomes = run_concurrently(flights, "gto", compute, 5)
+
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+def test_result_is_not_remembered_after_failure():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("report failed")
+
+    with pytest.raises(ValueError):
+        flights.do("gto", fail)
+
+    assert flights.do("gto", lambda: "ok") == "ok"
+
+
+def test_different_keys_are_not_coalesced():
+    flights = SingleFlight()
+    calls = []
+
+    def compute(key):
+        def fn():
+            calls.append(key)
+            time.sleep(0.1)
+            return key
+        return fn
+
+    threads = [threading.Thread(target=flights.do, args=(key, compute(key))) for key in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_follower_computes_itself_after_timeout():
+    flights = SingleFlight()
+    flights.timeout = 0.05
+    release = threading.Event()
+    leader = threading.Thread(target=flights.do, args=("gto", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.02)
+
+    assert flights.do("gto", lambda: "own") == "own"
+    release.set()
+    leader.join(5)
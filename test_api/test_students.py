@@ -0,0 +1,73 @@
+import pytest
+
+from src.models import Institutes, Groups, Students, session
+from src.middleware.pagination import Cursor
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def students():
+    """
+    Студенты 1..12: нечётные — в группе 1 (институт 1), чётные — в группе 2 (институт 2).
+    """
+    session.add_all([Institutes(id=1, name="Институт физики"), Institutes(id=2, name="Институт химии")])
+    session.add_all([
+        Groups(id=1, institute_id=1, course=1, name="Ф-11"),
+        Groups(id=2, institute_id=2, course=3, name="Х-31"),
+    ])
+    session.add_all([
+        Students(id=_id, group_id=1 if _id % 2 else 2, course=1, first_name="Анна" if _id < 4 else "Иван",
+                 last_name=f"Петрова{_id}" if _id < 4 else f"Иванов{_id}",
+                 email=f"s{_id}@example.com", phone_number=f"+7{_id}")
+        for _id in range(1, 13)
+    ])
+    ResourceVersion.bump("institutes", "groups", "students")
+    session.commit()
+    session.remove()
+
+
+def get(client, auth, **query):
+    response = client.get("/api/v1/students/", query_string=query, headers=auth)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def ids(body) -> list:
+    return [student["id"] for student in body["data"]]
+
+
+def test_keyset_pages_of_filtered_list(client, auth, students):
+    seen = []
+    body = get(client, auth, institute_id=1, limit=2)
+    while True:
+        seen += ids(body)
+        assert body["count"] == 6
+        if body["next_after_id"] is None:
+            break
+        body = get(client, auth, institute_id=1, limit=2, after_id=body["next_after_id"])
+
+    assert seen == [1, 3, 5, 7, 9, 11]
+
+
+def test_after_id_boundary_is_exclusive(client, auth, students):
+    body = get(client, auth, group_id=2, limit=2, after_id=Cursor.encode(8))
+
+    assert ids(body) == [10, 12]
+    assert body["next_after_id"] is None
+
+
+def test_cursor_of_deleted_student_still_pages(client, auth, students):
+    session.query(Students).filter(Students.id == 5).delete()
+    session.commit()
+
+    assert ids(get(client, auth, institute_id=1, limit=2, after_id=Cursor.encode(5))) == [7, 9]
+
+
+def test_filters_by_course_and_name(client, auth, students):
+    assert ids(get(client, auth, course=3, name="Иван Иванов1")) == [10, 12]
+    assert ids(get(client, auth, name="Петрова")) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("query", [{"limit": "x"}, {"skip": -1}, {"after_id": "%%%"}])
+def test_bad_paging_parameters_are_rejected(client, auth, query):
+    assert client.get("/api/v1/students/", query_string=query, headers=auth).status_code == 400
@@ -0,0 +1,130 @@
+import pytest
+
+from src.models import Users, session
+from src.settings import ServerSettings
+from src.middleware.JWT_processor import Token, PasswordManager, TokenStore, epoch_cache
+from src.middleware.validator import Password
+
+
+@pytest.fixture
+def epoch_mode(monkeypatch):
+    monkeypatch.setattr(ServerSettings, "AUTH_MODE", "epoch")
+    epoch_cache.clear()
+    yield
+    epoch_cache.clear()
+
+
+def test_refresh_rotates_token_pair(email):
+    issued = Token(email=email)
+
+    rotated = Token.refresh(issued.refresh_token)
+
+    assert rotated.refresh_token != issued.refresh_token
+    assert Token.check(rotated.get_token)["is_active"] is True
+    assert TokenStore.find(issued.refresh_token) is not None
+
+
+def test_refresh_token_reuse_is_detected(email):
+    issued = Token(email=email)
+    Token.refresh(issued.refresh_token)
+
+    with pytest.raises(ValueError, match="already used"):
+        Token.refresh(issued.refresh_token)
+
+
+def test_logout_revokes_refresh_token(email):
+    issued = Token(email=email)
+    Token(token=issued.refresh_token).deactivate()
+
+    with pytest.raises(ValueError, match="already used"):
+        Token.refresh(issued.refresh_token)
+
+
+def test_access_token_is_not_a_refresh_token(email):
+    issued = Token(email=email)
+
+    with pytest.raises(ValueError, match="not a refresh token"):
+        Token.refresh(issued.get_token)
+
+
+def test_password_change_revokes_refresh_token(email):
+    issued = Token(email=email)
+    PasswordManager.update_password(email, "new-password")
+    session.remove()
+
+    with pytest.raises(ValueError, match="revoked"):
+        Token.refresh(issued.refresh_token)
+
+
+def test_epoch_revocation_rejects_access_and_refresh_tokens(email, epoch_mode):
+    issued = Token(email=email)
+    assert Token.check(issued.get_token)["is_active"] is True
+
+    Token.revoke_all(email)
+    session.remove()
+
+    assert Token.check(issued.get_token)["is_active"] is False
+    with pytest.raises(ValueError, match="revoked"):
+        Token.refresh(issued.refresh_token)
+    assert Token.check(Token(email=email).get_token)["is_active"] is True
+
+
+def test_epoch_mode_refresh_does_not_write_token_store(email, epoch_mode):
+    issued = Token(email=email)
+
+    Token.refresh(issued.refresh_token)
+    Token.refresh(issued.refresh_token)
+
+    assert TokenStore.find(issued.refresh_token) is None
+
+
+def test_logout_revokes_every_refresh_token_in_token_mode(email):
+    first = Token(email=email)
+    second = Token(email=email)
+
+    Token.revoke_all(email)
+    session.remove()
+
+    for issued in (first, second):
+        with pytest.raises(ValueError, match="revoked"):
+            Token.refresh(issued.refresh_token)
+    Token.refresh(Token(email=email).refresh_token)
+
+
+def test_logout_endpoint_revokes_other_sessions(client, email):
+    other_session = Token(email=email)
+    current = Token(email=email)
+
+    response = client.post("/api/v1/login/logout", query_string={"refresh_token": current.refresh_token},
+                           headers={"Authorization": f"Bearer {current.get_token}"})
+
+    assert response.status_code == 200
+    refreshed = client.post("/api/v1/login/refresh-token", query_string={"refresh_token": other_session.refresh_token})
+    assert refreshed.status_code == 401
+
+
+def test_logout_cannot_revoke_another_users_refresh_token(client, email):
+    session.add(Users(email="other@example.com", password_hash=Password("password").get,
+                      is_active=True, is_superuser=False))
+    session.commit()
+    session.remove()
+    victim = Token(email="other@example.com")
+    attacker = Token(email=email)
+
+    response = client.post("/api/v1/login/logout", query_string={"refresh_token": victim.refresh_token},
+                           headers={"Authorization": f"Bearer {attacker.get_token}"})
+
+    assert response.status_code == 403
+    assert TokenStore.find(victim.refresh_token) is None
+    # отказ не завершает и сессии самого пользователя
+    Token.refresh(attacker.refresh_token)
+    Token.refresh(victim.refresh_token)
+
+
+def test_logout_rejects_forged_refresh_token(client, email):
+    current = Token(email=email)
+
+    response = client.post("/api/v1/login/logout", query_string={"refresh_token": "not-a-jwt"},
+                           headers={"Authorization": f"Bearer {current.get_token}"})
+
+    assert response.status_code == 401
@@ -0,0 +1,80 @@
+import pytest
+
+from src.models import Users, session
+from src.middleware.pagination import Cursor, MAX_LIMIT, page_args
+
+
+@pytest.fixture
+def users(email):
+    # пользователь из `email` имеет id 1, добавляются ещё 10
+    session.add_all([
+        Users(id=_id, email=f"user{_id}@example.com", is_active=True, is_superuser=False)
+        for _id in range(2, 12)
+    ])
+    session.commit()
+    session.remove()
+
+
+def ids(response) -> list:
+    return [user["id"] for user in response.get_json()["data"]]
+
+
+def test_keyset_pages_cover_all_users_once(client, auth, users):
+    seen = []
+    after_id = None
+    while True:
+        query = {"limit": 4} if after_id is None else {"limit": 4, "after_id": after_id}
+        response = client.get("/api/v1/users/", query_string=query, headers=auth)
+        assert response.status_code == 200
+        seen += ids(response)
+        after_id = response.get_json()["next_after_id"]
+        if after_id is None:
+            break
+
+    assert seen == list(range(1, 12))
+
+
+def test_after_id_is_exclusive_and_last_page_has_no_cursor(client, auth, users):
+    response = client.get("/api/v1/users/", query_string={"limit": 3, "after_id": Cursor.encode(8)}, headers=auth)
+
+    assert ids(response) == [9, 10, 11]
+    assert response.get_json()["next_after_id"] is None
+
+
+def test_full_page_at_the_end_has_no_cursor(client, auth, users):
+    response = client.get("/api/v1/users/", query_string={"limit": 11}, headers=auth)
+
+    assert len(ids(response)) == 11
+    assert response.get_json()["next_after_id"] is None
+
+
+def test_skip_pages_without_cursor(client, auth, users):
+    response = client.get("/api/v1/users/", query_string={"skip": 9, "limit": 5}, headers=auth)
+
+    assert ids(response) == [10, 11]
+
+
+@pytest.mark.parametrize("query", [
+    {"limit": "abc"},
+    {"skip": "1.5"},
+    {"skip": -1},
+    {"after_id": "not-a-cursor"},
+    {"after_id": Cursor.encode(-5)},
+])
+def test_bad_paging_parameters_are_rejected(client, auth, query):
+    response = client.get("/api/v1/users/", query_string=query, headers=auth)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("limit, expected", [(-1, 1), (0, 1), (100000, MAX_LIMIT)])
+def test_limit_is_clamped(client, auth, users, limit, expected):
+    response = client.get("/api/v1/users/", query_string={"limit": limit}, headers=auth)
+
+    assert response.status_code == 200
+    assert len(ids(response)) == min(expected, 11)
+
+
+def test_page_args_clamps_limit():
+    assert page_args({"skip": "20", "limit": "10000"}) == (20, MAX_LIMIT)
+    assert page_args({}) == (0, 100)
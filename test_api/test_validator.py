@@ -0,0 +1,71 @@
+import pytest
+
+from src.middleware.validator import Schema, SchemaError, Email, Phone, STUDENT_SCHEMA, STANDARD_RESULT_SCHEMA
+
+
+def errors_of(schema: Schema, data: dict, partial: bool = True) -> dict:
+    with pytest.raises(SchemaError) as error:
+        schema.validate(data, partial=partial)
+    return error.value.errors
+
+
+def test_valid_record_is_converted():
+    result = STUDENT_SCHEMA.validate({"first_name": "Иван", "last_name": "Иванов", "phone_number": "89990001122",
+                                      "group_id": 3})
+
+    assert result["phone_number"] == "+79990001122"
+    assert result["group_id"] == 3
+
+
+def test_errors_of_all_fields_are_collected():
+    errors = errors_of(STUDENT_SCHEMA, {"email": "bad", "height": -1, "sex": "?", "nickname": "x"})
+
+    assert set(errors) == {"email", "height", "sex", "nickname"}
+    assert errors["nickname"] == "unknown field"
+    assert "Invalid email" in errors["email"]
+
+
+def test_partial_record_does_not_need_required_fields():
+    assert STUDENT_SCHEMA.validate({"height": 180}) == {"height": 180}
+
+
+def test_full_record_reports_missing_required_fields():
+    errors = errors_of(STUDENT_SCHEMA, {"first_name": "Иван"}, partial=False)
+
+    assert errors == {"last_name": "field required", "group_id": "field required"}
+
+
+def test_required_and_field_errors_are_reported_together():
+    errors = errors_of(STANDARD_RESULT_SCHEMA, {"student_id": 1, "standard_id": "x", "semester": 1}, partial=False)
+
+    assert set(errors) == {"standard_id", "result"}
+    assert errors["result"] == "field required"
+
+
+def test_error_message_lists_fields():
+    error = SchemaError({"email": "Invalid email: bad", "phone": "unknown field"})
+
+    assert str(error) == "email: Invalid email: bad; phone: unknown field"
+
+
+def test_validate_many_splits_valid_and_invalid_rows():
+    schema = Schema({"email": Email(), "phone_number": Phone()}, required=("email",))
+
+    valid, errors = schema.validate_many([
+        {"email": "a@example.com"},
+        {"phone_number": "89990001122"},
+        {"email": "bad"},
+    ], partial=False)
+
+    assert valid == [(0, {"email": "a@example.com"})]
+    assert set(errors) == {1, 2}
+    assert errors[1] == {"email": "field required"}
+
+
+def test_student_endpoint_returns_all_field_errors(client):
+    response = client.post("/api/v1/students/", json={"first_name": "Иван", "email": "bad", "height": 0})
+
+    # ValidationError отвечает 403, как и до появления схем
+    assert response.status_code == 403
+    body = str(response.get_json())
+    assert "email" in body and "height" in body
@@ -0,0 +1,57 @@
+from src.models import Institutes, engine, session
+from src.middleware.versions_middleware import ResourceVersion
+
+
+def stored_version(name: str) -> int:
+    # читаем мимо сессии, как другой воркер
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(
+            "SELECT version FROM resource_versions WHERE name = ?", (name,)
+        ).scalar() or 0
+
+
+def test_version_is_written_after_commit():
+    session.add(Institutes(id=1, name="Институт"))
+    ResourceVersion.bump("institutes")
+    session.flush()
+
+    # бизнес-транзакция не держит строку resource_versions
+    assert stored_version("institutes") == 0
+    session.commit()
+    session.remove()
+
+    assert stored_version("institutes") == 1
+
+
+def test_rolled_back_bump_keeps_version():
+    ResourceVersion.bump("institutes")
+    session.rollback()
+    session.commit()
+    session.remove()
+
+    assert stored_version("institutes") == 0
+
+
+def test_names_of_one_transaction_are_bumped_once():
+    ResourceVersion.bump("groups", "students")
+    ResourceVersion.bump("groups")
+    session.commit()
+    session.remove()
+
+    assert (stored_version("groups"), stored_version("students")) == (1, 1)
+
+
+def test_not_modified_until_write(client, auth):
+    first = client.get("/api/v1/standard", headers=auth)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/v1/standard", headers={**auth, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    assert client.post("/api/v1/standard", headers=auth, json={"name": "Бег 100 м"}).status_code == 200
+
+    fresh = client.get("/api/v1/standard", headers={**auth, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert [row["name"] for row in fresh.get_json()["data"]] == ["Бег 100 м"]
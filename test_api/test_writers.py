@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy.exc import NoResultFound
+
+from src.models import Institutes, Groups, Students, Standard, StandardResults, session
+from src.middleware.standard_middleware import StandardWriter
+from src.middleware.students_middleware import StudentWriter
+from src.middleware.versions_middleware import ResourceVersion
+
+
+@pytest.fixture
+def student():
+    """
+    Студент 1 в группе 1 и его результат 1 по нормативу 1.
+    """
+    session.add(Institutes(id=1, name="Институт"))
+    session.add(Groups(id=1, institute_id=1, course=1, name="Группа 1"))
+    session.add(Students(id=1, group_id=1, course=1, first_name="Иван", last_name="Иванов",
+                         email="s1@example.com", phone_number="+71"))
+    session.add(Standard(id=1, name="Бег 100 м"))
+    session.add(StandardResults(id=1, student_id=1, standard_id=1, semester=1, result=42))
+    session.commit()
+    session.remove()
+
+
+def version(name: str) -> int:
+    result = ResourceVersion.read([name])[name][0]
+    session.remove()
+    return result
+
+
+def test_student_update_returns_updated_row(student):
+    res = StudentWriter(_id=1, data={"first_name": "Пётр"}).update()
+
+    assert res["id"] == 1
+    assert res["first_name"] == "Пётр"
+    assert res["group"]["id"] == 1
+
+
+def test_update_of_missing_student_raises_key_error(student):
+    with pytest.raises(KeyError):
+        StudentWriter(_id=99, data={"first_name": "Пётр"}).update()
+
+    assert version("students") == 0
+
+
+def test_endpoint_returns_404_for_missing_student(student, client, auth):
+    response = client.patch("/api/v1/students/99", headers=auth, json={"first_name": "Пётр"})
+
+    assert response.status_code == 404
+
+
+def test_delete_of_missing_student_does_not_bump_version(student):
+    with pytest.raises(KeyError):
+        StudentWriter(_id=99).delete()
+
+    assert version("students") == 0
+    assert session.get(Students, 1) is not None
+
+
+def test_result_update_returns_updated_row(student):
+    res = StandardWriter(student_id=1, result_id=1, result=40).update_result()
+
+    assert res == {"id": 1, "student_id": 1, "standard_id": 1, "semester": 1, "result": 40}
+    assert version("standard_results") == 1
+
+
+def test_result_update_of_other_student_is_not_found(student):
+    with pytest.raises(NoResultFound):
+        StandardWriter(student_id=2, result_id=1, result=40).update_result()
+
+    assert session.get(StandardResults, 1).result == 42
+    assert version("standard_results") == 0
+
+
+def test_delete_of_missing_result_is_not_found(student):
+    with pytest.raises(NoResultFound):
+        StandardWriter(result_id=99).delete_result()
+
+    assert version("standard_results") == 0